@@ -1,13 +1,68 @@
+import json
+import os
 from functools import lru_cache
-from typing import Dict
+from pathlib import Path
+from typing import Any, Dict, List, Literal
 
-from pydantic import Field
+from dotenv import dotenv_values
+from pydantic import BaseModel, Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from sqlalchemy.engine import make_url
+
+_URL_PREFIX = "DATABASE_URL_"
+
+
+class PoolSettings(BaseModel):
+    pool_size: int = Field(default=5, ge=1)
+    max_overflow: int = Field(default=10, ge=0)
+    pool_recycle: int = Field(default=1800, description="Seconds before a connection is recycled (-1 disables)")
+    pool_pre_ping: bool = True
+    pool_timeout: float = Field(default=30.0, gt=0)
+    warm_size: int = Field(default=0, ge=0, description="Connections opened at startup (0 = lazy)")
+
+
+class DatabaseSettings(BaseModel):
+    url: str
+    dialect: str = Field(default="", description="SQLAlchemy backend name, derived from the URL when empty")
+    pool: PoolSettings = Field(default_factory=PoolSettings)
+    statement_timeout: float | None = Field(default=None, ge=0)
+    max_rows: int | None = Field(default=None, ge=1, description="Upper bound applied to run_sql_query limits")
+    result_cache: bool = Field(default=False, description="Serve repeated read queries from the result cache")
+
+    @model_validator(mode="after")
+    def _derive_dialect(self) -> "DatabaseSettings":
+        if not self.dialect:
+            self.dialect = make_url(self.url).get_backend_name()
+        return self
 
 
 class Settings(BaseSettings):
     postgres_url: str | None = Field(default=None, alias="DATABASE_URL_POSTGRES")
     mysql_url: str | None = Field(default=None, alias="DATABASE_URL_MYSQL")
+    databases_file: str | None = Field(default=None, alias="DATABASES_FILE")
+    schema_cache_ttl_seconds: float = Field(default=300.0, ge=0, alias="SCHEMA_CACHE_TTL_SECONDS")
+    schema_cache_max_entries: int = Field(default=1024, ge=0, alias="SCHEMA_CACHE_MAX_ENTRIES")
+    result_cache_ttl_seconds: float = Field(default=30.0, ge=0, alias="RESULT_CACHE_TTL_SECONDS")
+    result_cache_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0, alias="RESULT_CACHE_MAX_BYTES")
+    result_cache_databases: List[str] = Field(default_factory=list, alias="RESULT_CACHE_DATABASES")
+    statement_timeout_seconds: float = Field(default=30.0, ge=0, alias="STATEMENT_TIMEOUT_SECONDS")
+    statement_timeouts: Dict[str, float] = Field(default_factory=dict, alias="STATEMENT_TIMEOUTS")
+    db_pool_size: int = Field(default=5, ge=1, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, ge=0, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle_seconds: int = Field(default=1800, alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    db_pool_timeout_seconds: float = Field(default=30.0, gt=0, alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pool_warm_size: int = Field(default=0, ge=0, alias="DB_POOL_WARM_SIZE")
+    db_pool_overrides: Dict[str, Dict[str, Any]] = Field(default_factory=dict, alias="DB_POOL_OVERRIDES")
+    export_dir: str = Field(default="exports", alias="EXPORT_DIR")
+    export_batch_size: int = Field(default=5000, ge=1, alias="EXPORT_BATCH_SIZE")
+    export_preview_rows: int = Field(default=5, ge=0, alias="EXPORT_PREVIEW_ROWS")
+    export_ttl_seconds: float = Field(default=3600.0, ge=0, alias="EXPORT_TTL_SECONDS")
+    export_signing_key: str | None = Field(default=None, alias="EXPORT_SIGNING_KEY")
+    export_link_ttl_seconds: float = Field(default=900.0, gt=0, alias="EXPORT_LINK_TTL_SECONDS")
+    tracing_exporter: Literal["none", "otlp", "file"] = Field(default="none", alias="TRACING_EXPORTER")
+    tracing_otlp_endpoint: str = Field(default="http://localhost:4318/v1/traces", alias="TRACING_OTLP_ENDPOINT")
+    tracing_file: str = Field(default="traces.jsonl", alias="TRACING_FILE")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     log_json: bool = Field(default=True, alias="LOG_JSON")
     metrics_host: str = Field(default="0.0.0.0", alias="METRICS_HOST")
@@ -24,13 +79,61 @@ class Settings(BaseSettings):
         validate_assignment=True,
     )
 
-    def get_available_databases(self) -> Dict[str, str]:
-        dsn_by_name: Dict[str, str] = {}
+    def get_available_databases(self) -> Dict[str, DatabaseSettings]:
+        """Collect every configured database.
+
+        Sources, later ones winning: ``DATABASES_FILE`` (JSON), then any
+        ``DATABASE_URL_<NAME>`` variable from the environment or ``.env``, then the
+        per-database ``DB_POOL_OVERRIDES``, ``STATEMENT_TIMEOUTS`` and
+        ``RESULT_CACHE_DATABASES`` settings.
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+        if self.databases_file:
+            content = json.loads(Path(self.databases_file).read_text(encoding="utf-8"))
+            for name, entry in content.get("databases", content).items():
+                entries[name.lower()] = dict(entry)
+        for name, url in self._database_urls().items():
+            entries.setdefault(name, {})["url"] = url
+
+        databases: Dict[str, DatabaseSettings] = {}
+        for name, entry in entries.items():
+            pool = {**self._pool_defaults(), **entry.get("pool", {}), **self.db_pool_overrides.get(name, {})}
+            timeout = self.statement_timeouts.get(
+                name, entry.get("statement_timeout", self.statement_timeout_seconds)
+            )
+            result_cache = name in self.result_cache_databases or entry.get("result_cache", False)
+            databases[name] = DatabaseSettings(
+                **{**entry, "pool": pool, "statement_timeout": timeout, "result_cache": result_cache}
+            )
+        return databases
+
+    def _database_urls(self) -> Dict[str, str]:
+        candidates: Dict[str, str | None] = {}
+        env_file = self.model_config.get("env_file")
+        if isinstance(env_file, str) and Path(env_file).is_file():
+            candidates.update(dotenv_values(env_file))
+        candidates.update(os.environ)
+        urls = {
+            key[len(_URL_PREFIX):].lower(): value
+            for key, value in candidates.items()
+            if key.upper().startswith(_URL_PREFIX) and len(key) > len(_URL_PREFIX) and value
+        }
+        # Explicit fields also cover values passed directly to Settings(...).
         if self.postgres_url:
-            dsn_by_name["postgres"] = self.postgres_url
+            urls["postgres"] = self.postgres_url
         if self.mysql_url:
-            dsn_by_name["mysql"] = self.mysql_url
-        return dsn_by_name
+            urls["mysql"] = self.mysql_url
+        return urls
+
+    def _pool_defaults(self) -> Dict[str, Any]:
+        return {
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_recycle": self.db_pool_recycle_seconds,
+            "pool_pre_ping": self.db_pool_pre_ping,
+            "pool_timeout": self.db_pool_timeout_seconds,
+            "warm_size": self.db_pool_warm_size,
+        }
 
 
 @lru_cache(maxsize=1)
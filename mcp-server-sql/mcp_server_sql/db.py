@@ -1,69 +1,272 @@
 from __future__ import annotations
 
 import asyncio
+import json
+import re
+import sys
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Any, Dict, Iterable, Mapping
+from time import monotonic, perf_counter
+from typing import Any, AsyncIterator, Awaitable, Dict, Hashable, Iterable, Mapping, Sequence, TypeVar
 
+import anyio
 import structlog
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from .config import DatabaseSettings
+from .exports import ExportWriter
+from .results import ResultFormat, encode_result
+from .schema_index import IndexedTable, SchemaIndex
+from .tracing import trace_db
 
 logger = structlog.get_logger(__name__)
 
 _QUERY_COUNTER = Counter(
     "mcp_sql_queries_total",
     "Total number of SQL queries executed via MCP",
-    labelnames=("database", "status"),
+    labelnames=("database", "status", "cache"),
 )
 _QUERY_LATENCY = Histogram(
     "mcp_sql_query_latency_seconds",
     "Latency of SQL queries executed via MCP",
     labelnames=("database",),
 )
+_RESULT_CACHE_BYTES = Gauge(
+    "mcp_sql_result_cache_bytes",
+    "Estimated memory held by the query result cache",
+)
+_POOL_CHECKED_OUT = Gauge(
+    "mcp_sql_pool_checked_out",
+    "Connections currently checked out of the pool",
+    labelnames=("database",),
+)
+_POOL_OVERFLOW = Gauge(
+    "mcp_sql_pool_overflow",
+    "Overflow connections currently open beyond pool_size",
+    labelnames=("database",),
+)
+_POOL_SIZE = Gauge(
+    "mcp_sql_pool_size",
+    "Configured pool size",
+    labelnames=("database",),
+)
+_POOL_WAIT = Histogram(
+    "mcp_sql_pool_wait_seconds",
+    "Time spent acquiring a pooled connection",
+    labelnames=("database",),
+)
+_SCHEMA_CACHE_REQUESTS = Counter(
+    "mcp_sql_schema_cache_requests_total",
+    "Schema metadata lookups grouped by cache result",
+    labelnames=("database", "operation", "result"),
+)
+
+
+MAX_BULK_TABLES = 100
+MAX_SEARCH_RESULTS = 50
+_CLIENT_TIMEOUT_GRACE_SECONDS = 1.0
+
+_T = TypeVar("_T")
+# Literals, quoted identifiers and comments are matched whole, so their content is never code.
+_SQL_TOKEN = re.compile(
+    r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\$(\w*)\$.*?\$\1\$"
+    r"|--[^\n]*|/\*.*?\*/|\s+|[^'\"`$\-/;\s]+|.",
+    re.DOTALL,
+)
+
+
+class QueryTimeoutError(TimeoutError):
+    """Raised when a read query exceeds its statement timeout."""
+
+
+class SchemaCache:
+    """Size-bounded LRU of schema metadata with a per-entry TTL."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[Hashable, ...], tuple[float, Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._max_entries > 0
+
+    def get(self, key: tuple[Hashable, ...]) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: tuple[Hashable, ...], value: Any) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, database: str | None = None) -> int:
+        if database is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            return removed
+        keys = [key for key in self._entries if key[0] == database]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+
+class ResultCache:
+    """LRU of read query results bounded by their estimated memory, with a TTL.
+
+    Entries hold the raw column names and row tuples, so one cached result serves
+    every output format.
+    """
+
+    def __init__(self, ttl_seconds: float, max_bytes: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: OrderedDict[tuple[Hashable, ...], tuple[float, int, Any]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._max_bytes > 0
+
+    def get(self, key: tuple[Hashable, ...]) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, _, value = entry
+        if expires_at <= monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: tuple[Hashable, ...], columns: list[str], rows: list[tuple[Any, ...]], truncated: bool) -> None:
+        size = _estimate_size(columns, rows)
+        if not self.enabled or size > self._max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (monotonic() + self._ttl, size, (columns, rows, truncated))
+        self._size += size
+        while self._size > self._max_bytes:
+            self._remove(next(iter(self._entries)))
+        _RESULT_CACHE_BYTES.set(self._size)
+
+    def invalidate(self, database: str | None = None) -> int:
+        keys = [key for key in self._entries if database is None or key[0] == database]
+        for key in keys:
+            self._remove(key)
+        _RESULT_CACHE_BYTES.set(self._size)
+        return len(keys)
+
+    def _remove(self, key: tuple[Hashable, ...]) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
 
 
 class DatabaseManager:
-    def __init__(self, dsn_by_name: Mapping[str, str]):
-        self._engines: Dict[str, AsyncEngine] = {
-            name: create_async_engine(dsn, pool_pre_ping=True)
-            for name, dsn in dsn_by_name.items()
+    """Serve any number of named databases, creating each engine on first use."""
+
+    def __init__(
+        self,
+        databases: Mapping[str, DatabaseSettings | str],
+        *,
+        schema_cache_ttl: float = 0,
+        schema_cache_max_entries: int = 0,
+        result_cache_ttl: float = 0,
+        result_cache_max_bytes: int = 0,
+    ):
+        self._databases: Dict[str, DatabaseSettings] = {
+            name: config if isinstance(config, DatabaseSettings) else DatabaseSettings(url=config)
+            for name, config in databases.items()
         }
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._cancel_engines: Dict[str, AsyncEngine] = {}
+        self._schema_cache = SchemaCache(schema_cache_ttl, schema_cache_max_entries)
+        self._result_cache = ResultCache(result_cache_ttl, result_cache_max_bytes)
 
     @property
     def available_databases(self) -> Iterable[str]:
-        return self._engines.keys()
+        return self._databases.keys()
 
     async def close(self) -> None:
-        await asyncio.gather(*[engine.dispose() for engine in self._engines.values()])
+        engines = [*self._engines.values(), *self._cancel_engines.values()]
+        self._engines.clear()
+        self._cancel_engines.clear()
+        await asyncio.gather(*[engine.dispose() for engine in engines])
 
     async def test_connections(self) -> Dict[str, bool]:
-        results: Dict[str, bool] = {}
-        for name, engine in self._engines.items():
-            try:
-                async with engine.connect() as conn:
-                    await conn.execute(text("SELECT 1"))
-                results[name] = True
-            except SQLAlchemyError as exc:  # pragma: no cover - defensive
-                logger.warning("database_connection_failed", database=name, error=str(exc))
-                results[name] = False
-        return results
+        """Warm the pools that ask for it, concurrently, and report which answered.
+
+        Databases with ``warm_size`` 0 are left untouched: their engine is only
+        created when a tool first targets them.
+        """
+        names = [name for name, config in self._databases.items() if config.pool.warm_size > 0]
+        results = await asyncio.gather(*(self._warm_up(name) for name in names))
+        return dict(zip(names, results))
+
+    async def _warm_up(self, database: str) -> bool:
+        warm_size = self._databases[database].pool.warm_size
+
+        async def ping() -> None:
+            async with self._connect(database) as conn:
+                await conn.execute(text("SELECT 1"))
+
+        try:
+            # Hold the connections concurrently so the pool really opens warm_size of them.
+            await asyncio.gather(*(ping() for _ in range(warm_size)))
+        except SQLAlchemyError as exc:  # pragma: no cover - defensive
+            logger.warning("database_connection_failed", database=database, error=str(exc))
+            return False
+        return True
+
+    def invalidate_schema_cache(self, database: str | None = None) -> int:
+        if database is not None:
+            self._require_config(database)
+        removed = self._schema_cache.invalidate(database)
+        logger.info("schema_cache_invalidated", database=database, entries=removed)
+        return removed
+
+    def invalidate_result_cache(self, database: str | None = None) -> int:
+        if database is not None:
+            self._require_config(database)
+        removed = self._result_cache.invalidate(database)
+        logger.info("result_cache_invalidated", database=database, entries=removed)
+        return removed
 
     async def list_tables(self, database: str) -> list[dict[str, Any]]:
+        key = (database, "list_tables")
+        cached = self._cached_schema(key)
+        if cached is not None:
+            return cached
         query = text(
             "SELECT table_schema, table_name FROM information_schema.tables "
             "WHERE table_schema NOT IN (:ignore1, :ignore2, :ignore3, :ignore4) "
             "ORDER BY table_schema, table_name"
         )
         ignore = self._ignored_schemas(database)
-        return await self._fetch_all(database, query, ignore)
+        tables = await self._fetch_all(database, query, ignore)
+        self._schema_cache.set(key, tables)
+        return tables
 
     async def describe_table(self, database: str, schema: str | None, table: str) -> list[dict[str, Any]]:
-        if schema:
-            qualified = f"{schema}.{table}"
-        else:
-            qualified = table
+        key = (database, "describe_table", schema, table)
+        cached = self._cached_schema(key)
+        if cached is not None:
+            return cached
         query = text(
             "SELECT column_name, data_type, is_nullable, column_default "
             "FROM information_schema.columns "
@@ -74,7 +277,146 @@ class DatabaseManager:
         params: dict[str, Any] = {"table_name": table}
         if schema:
             params["schema"] = schema
-        return await self._fetch_all(database, query, params)
+        columns = await self._fetch_all(database, query, params)
+        self._schema_cache.set(key, columns)
+        return columns
+
+    async def describe_tables(
+        self, database: str, tables: Sequence[tuple[str | None, str]]
+    ) -> list[dict[str, Any]]:
+        """Describe several tables with a single ``information_schema.columns`` query.
+
+        Each ``(schema, table)`` pair yields the same columns as :meth:`describe_table`;
+        cached tables are served without touching the database.
+        """
+        if len(tables) > MAX_BULK_TABLES:
+            raise ValueError(f"At most {MAX_BULK_TABLES} tables can be described at once")
+        requested = list(dict.fromkeys(tables))
+        columns_by_table: dict[tuple[str | None, str], list[dict[str, Any]]] = {}
+        missing: list[tuple[str | None, str]] = []
+        for schema, table in requested:
+            cached = self._cached_schema((database, "describe_table", schema, table))
+            if cached is None:
+                missing.append((schema, table))
+            else:
+                columns_by_table[(schema, table)] = cached
+
+        if missing:
+            conditions: list[str] = []
+            params: dict[str, Any] = {}
+            for index, (schema, table) in enumerate(missing):
+                params[f"table_{index}"] = table
+                if schema:
+                    params[f"schema_{index}"] = schema
+                    conditions.append(f"(table_name = :table_{index} AND table_schema = :schema_{index})")
+                else:
+                    conditions.append(f"table_name = :table_{index}")
+            query = text(
+                "SELECT table_schema AS table_schema, table_name AS table_name, "
+                "column_name AS column_name, data_type AS data_type, "
+                "is_nullable AS is_nullable, column_default AS column_default "
+                "FROM information_schema.columns "
+                "WHERE " + " OR ".join(conditions)
+                + " ORDER BY table_schema, table_name, ordinal_position"
+            )
+            rows = await self._fetch_all(database, query, params)
+            for schema, table in missing:
+                columns = [
+                    {key: value for key, value in row.items() if key not in ("table_schema", "table_name")}
+                    for row in rows
+                    if row["table_name"] == table and (not schema or row["table_schema"] == schema)
+                ]
+                columns_by_table[(schema, table)] = columns
+                self._schema_cache.set((database, "describe_table", schema, table), columns)
+
+        return [
+            {"schema": schema, "table": table, "columns": columns_by_table[(schema, table)]}
+            for schema, table in requested
+        ]
+
+    async def search_schema(self, database: str, query: str, top_k: int = 10) -> list[dict[str, Any]]:
+        """Rank the tables of ``database`` against ``query`` and return the best ``top_k``.
+
+        The index is built from one metadata pass and cached like other schema
+        metadata, so the response size does not grow with the catalog.
+        """
+        top_k = max(1, min(top_k, MAX_SEARCH_RESULTS))
+        key = (database, "schema_index")
+        index = self._cached_schema(key)
+        if index is None:
+            index = await self._build_schema_index(database)
+            self._schema_cache.set(key, index)
+        return index.search(query, top_k)
+
+    async def _build_schema_index(self, database: str) -> SchemaIndex:
+        started = perf_counter()
+        query = text(
+            "SELECT table_schema AS table_schema, table_name AS table_name, "
+            "column_name AS column_name, data_type AS data_type "
+            "FROM information_schema.columns "
+            "WHERE table_schema NOT IN (:ignore1, :ignore2, :ignore3, :ignore4) "
+            "ORDER BY table_schema, table_name, ordinal_position"
+        )
+        rows = await self._fetch_all(database, query, self._ignored_schemas(database))
+        comments = await self._schema_comments(database)
+        tables: dict[tuple[str | None, str], IndexedTable] = {}
+        for row in rows:
+            schema, table = row["table_schema"], row["table_name"]
+            indexed = tables.get((schema, table))
+            if indexed is None:
+                indexed = tables[(schema, table)] = IndexedTable(
+                    schema, table, comment=comments.get((schema, table, None))
+                )
+            column = {"column_name": row["column_name"], "data_type": row["data_type"]}
+            comment = comments.get((schema, table, row["column_name"]))
+            if comment:
+                column["comment"] = comment
+            indexed.columns.append(column)
+        index = SchemaIndex(tables.values())
+        logger.info(
+            "schema_index_built",
+            database=database,
+            tables=len(index),
+            seconds=round(perf_counter() - started, 3),
+        )
+        return index
+
+    async def _schema_comments(self, database: str) -> dict[tuple[str, str, str | None], str]:
+        dialect = self._require_config(database).dialect
+        if dialect == "postgresql":
+            query = text(
+                "SELECT n.nspname AS table_schema, c.relname AS table_name, "
+                "a.attname AS column_name, d.description AS description "
+                "FROM pg_catalog.pg_description d "
+                "JOIN pg_catalog.pg_class c ON c.oid = d.objoid "
+                "JOIN pg_catalog.pg_namespace n ON n.oid = c.relnamespace "
+                "LEFT JOIN pg_catalog.pg_attribute a ON a.attrelid = c.oid AND a.attnum = d.objsubid "
+                "WHERE d.classoid = 'pg_catalog.pg_class'::regclass "
+                "AND n.nspname NOT IN (:ignore1, :ignore2, :ignore3, :ignore4)"
+            )
+        elif dialect == "mysql":
+            query = text(
+                "SELECT table_schema AS table_schema, table_name AS table_name, "
+                "NULL AS column_name, table_comment AS description "
+                "FROM information_schema.tables "
+                "WHERE table_comment <> '' AND table_schema NOT IN (:ignore1, :ignore2, :ignore3, :ignore4) "
+                "UNION ALL "
+                "SELECT table_schema, table_name, column_name, column_comment "
+                "FROM information_schema.columns "
+                "WHERE column_comment <> '' AND table_schema NOT IN (:ignore1, :ignore2, :ignore3, :ignore4)"
+            )
+        else:
+            return {}
+        try:
+            rows = await self._fetch_all(database, query, self._ignored_schemas(database))
+        except SQLAlchemyError as exc:  # pragma: no cover - comments are optional
+            logger.warning("schema_comments_failed", database=database, error=str(exc))
+            return {}
+        return {
+            (row["table_schema"], row["table_name"], row["column_name"]): row["description"]
+            for row in rows
+            if row["description"]
+        }
 
     async def execute_read_query(
         self,
@@ -82,48 +424,318 @@ class DatabaseManager:
         query_text: str,
         parameters: Mapping[str, Any] | None = None,
         limit: int | None = 100,
+        *,
+        result_format: ResultFormat = "records",
+        max_value_chars: int | None = None,
+        max_bytes: int | None = None,
     ) -> dict[str, Any]:
         _ensure_safe_query(query_text)
         params = dict(parameters or {})
-        engine = self._require_engine(database)
+        max_rows = self._require_config(database).max_rows
+        if max_rows is not None:
+            limit = max_rows if limit is None else min(limit, max_rows)
+        cache_key = self._result_cache_key(database, query_text, params, limit)
+        cache = "bypass" if cache_key is None else "miss"
+        if cache_key is not None:
+            cached = self._result_cache.get(cache_key)
+            if cached is not None:
+                _QUERY_COUNTER.labels(database=database, status="success", cache="hit").inc()
+                columns, rows, truncated = cached
+                return encode_result(
+                    database,
+                    columns,
+                    rows,
+                    truncated=truncated,
+                    result_format=result_format,
+                    max_value_chars=max_value_chars,
+                    max_bytes=max_bytes,
+                )
+        timeout = self.statement_timeout(database)
         histogram = _QUERY_LATENCY.labels(database=database)
-        counter = _QUERY_COUNTER.labels(database=database, status="success")
+        status: str | None = None
         with histogram.time():
             try:
-                async with engine.connect() as conn:
-                    stream = await conn.stream(text(query_text), params)
-                    rows: list[dict[str, Any]] = []
-                    columns: list[str] | None = None
-                    async for row in stream.mappings():
-                        if columns is None:
-                            columns = list(row.keys())
-                        rows.append(dict(row))
-                        if limit is not None and len(rows) >= limit:
-                            break
-                    await stream.close()
+                columns, rows = await self._fetch_rows(database, query_text, params, limit, timeout)
+                status = "success"
+            except asyncio.TimeoutError as exc:
+                status = "timeout"
+                logger.warning("sql_query_timeout", database=database, timeout=timeout)
+                raise QueryTimeoutError(f"Query exceeded the {timeout}s statement timeout") from exc
+            except asyncio.CancelledError:
+                status = "cancelled"
+                logger.info("sql_query_cancelled", database=database)
+                raise
             except SQLAlchemyError as exc:
-                _QUERY_COUNTER.labels(database=database, status="error").inc()
+                if _is_statement_timeout(exc):
+                    status = "timeout"
+                    logger.warning("sql_query_timeout", database=database, timeout=timeout)
+                    raise QueryTimeoutError(
+                        f"Query exceeded the {timeout}s statement timeout"
+                    ) from exc
+                status = "error"
                 logger.error("sql_query_failed", database=database, error=str(exc))
                 raise
-        counter.inc()
-        return {"columns": columns or [], "rows": rows, "row_count": len(rows)}
+            finally:
+                if status is not None:
+                    _QUERY_COUNTER.labels(database=database, status=status, cache=cache).inc()
+        truncated = limit is not None and len(rows) > limit
+        if truncated:
+            rows = rows[:limit]
+        if cache_key is not None:
+            self._result_cache.set(cache_key, columns, rows, truncated)
+        return encode_result(
+            database,
+            columns,
+            rows,
+            truncated=truncated,
+            result_format=result_format,
+            max_value_chars=max_value_chars,
+            max_bytes=max_bytes,
+        )
+
+    async def export_query(
+        self,
+        database: str,
+        query_text: str,
+        parameters: Mapping[str, Any] | None,
+        writer: ExportWriter,
+        *,
+        batch_size: int,
+    ) -> int:
+        """Stream every row of ``query_text`` into ``writer`` in batches of ``batch_size``.
+
+        Only one batch is held in memory at a time. The database statement timeout
+        still applies; the caller owns committing or discarding the written file.
+        """
+        _ensure_safe_query(query_text)
+        params = dict(parameters or {})
+        timeout = self.statement_timeout(database)
+        status: str | None = None
+
+        async def copy_rows(conn: AsyncConnection) -> None:
+            stream = await conn.stream(text(query_text).execution_options(yield_per=batch_size), params)
+            await writer.open(list(stream.keys()))
+            async for batch in stream.partitions(batch_size):
+                await writer.write([tuple(row) for row in batch])
+            await stream.close()
+
+        try:
+            async with self._connect(database) as conn:
+                await self._prepare_connection(conn, timeout)
+                await self._guard(database, conn, copy_rows(conn), None)
+            await writer.close()
+            status = "success"
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except SQLAlchemyError as exc:
+            if _is_statement_timeout(exc):
+                status = "timeout"
+                raise QueryTimeoutError(f"Export exceeded the {timeout}s statement timeout") from exc
+            status = "error"
+            logger.error("sql_export_failed", database=database, error=str(exc))
+            raise
+        finally:
+            if status is not None:
+                _QUERY_COUNTER.labels(database=database, status=status, cache="bypass").inc()
+        logger.info("sql_export_completed", database=database, rows=writer.row_count, format=writer.format)
+        return writer.row_count
+
+    def statement_timeout(self, database: str) -> float | None:
+        timeout = self._require_config(database).statement_timeout
+        return timeout if timeout and timeout > 0 else None
+
+    async def _fetch_rows(
+        self,
+        database: str,
+        query_text: str,
+        params: Mapping[str, Any],
+        limit: int | None,
+        timeout: float | None,
+    ) -> tuple[list[str], list[tuple[Any, ...]]]:
+        """Fetch at most ``limit + 1`` rows; the extra row only signals truncation."""
+        fetch_limit = None if limit is None else limit + 1
+        limited = _limit_query(query_text, fetch_limit)
+        if limited is None:
+            return await self._stream_rows(database, query_text, params, fetch_limit, timeout)
+        try:
+            return await self._stream_rows(database, limited, params, fetch_limit, timeout)
+        except SQLAlchemyError as exc:
+            if not _is_duplicate_column(exc):
+                raise
+            # MySQL rejects derived tables with duplicate column names: limit client-side.
+            return await self._stream_rows(database, query_text, params, fetch_limit, timeout)
+
+    async def _stream_rows(
+        self,
+        database: str,
+        query_text: str,
+        params: Mapping[str, Any],
+        limit: int | None,
+        timeout: float | None,
+    ) -> tuple[list[str], list[tuple[Any, ...]]]:
+        async def read_rows(conn: AsyncConnection) -> tuple[list[str], list[tuple[Any, ...]]]:
+            stream = await conn.stream(text(query_text), params)
+            # Plain tuples: column names are attached once, when the result is encoded.
+            columns = list(stream.keys())
+            rows: list[tuple[Any, ...]] = []
+            async for row in stream:
+                rows.append(tuple(row))
+                if limit is not None and len(rows) >= limit:
+                    break
+            await stream.close()
+            return columns, rows
+
+        # Client-side safety net for drivers that ignore the server-side timeout.
+        deadline = None if timeout is None else timeout + _CLIENT_TIMEOUT_GRACE_SECONDS
+        async with self._connect(database) as conn:
+            await self._prepare_connection(conn, timeout)
+            return await self._guard(database, conn, read_rows(conn), deadline)
+
+    async def _guard(
+        self, database: str, conn: AsyncConnection, work: Awaitable[_T], deadline: float | None
+    ) -> _T:
+        """Await ``work`` on ``conn``, stopping its statement on deadline or cancellation.
+
+        The server-side cancel goes out while ``conn`` is still checked out, so it can
+        only hit this statement, and ``conn`` is then discarded instead of pooled.
+        """
+        task = asyncio.ensure_future(work)
+        try:
+            done, _ = await asyncio.wait((task,), timeout=deadline)
+        except asyncio.CancelledError:
+            # Shielded: MCP request cancellation cancels every await in its scope.
+            with anyio.CancelScope(shield=True):
+                await self._abort(database, conn, task)
+            raise
+        if not done:
+            await self._abort(database, conn, task)
+            raise asyncio.TimeoutError
+        return task.result()
+
+    async def _abort(self, database: str, conn: AsyncConnection, task: asyncio.Future[Any]) -> None:
+        await self._cancel_backend(database, conn.info.get("backend_id"))
+        task.cancel()
+        await asyncio.wait((task,))
+        if not task.cancelled():
+            task.exception()  # retrieved so asyncio does not log it; the abort wins
+        await conn.invalidate()
+
+    async def _prepare_connection(self, conn: AsyncConnection, timeout: float | None) -> None:
+        """Record the server backend id and apply the statement timeout."""
+        dialect = conn.dialect.name
+        if dialect not in ("postgresql", "mysql"):
+            return
+        # The backend id is stable for a pooled DBAPI connection, so look it up once.
+        backend_id = conn.info.get("backend_id")
+        if backend_id is None:
+            lookup = "SELECT pg_backend_pid()" if dialect == "postgresql" else "SELECT CONNECTION_ID()"
+            backend_id = (await conn.execute(text(lookup))).scalar_one()
+            conn.info["backend_id"] = backend_id
+        if timeout is None:
+            return
+        milliseconds = max(int(timeout * 1000), 1)
+        if dialect == "postgresql":
+            # SET LOCAL only lasts for the transaction autobegun by this connection.
+            await conn.execute(text(f"SET LOCAL statement_timeout = {milliseconds}"))
+        else:
+            await conn.execute(text(f"SET SESSION max_execution_time = {milliseconds}"))
+
+    async def _cancel_backend(self, database: str, backend_id: Any) -> None:
+        if backend_id is None:
+            return
+        if self._require_config(database).dialect == "postgresql":
+            statement = f"SELECT pg_cancel_backend({int(backend_id)})"
+        else:
+            statement = f"KILL QUERY {int(backend_id)}"
+        try:
+            async with self._cancel_engine(database).connect() as conn:
+                await conn.execute(text(statement))
+            logger.info("sql_query_backend_cancelled", backend_id=backend_id)
+        except SQLAlchemyError as exc:  # pragma: no cover - best effort
+            logger.warning("sql_query_backend_cancel_failed", backend_id=backend_id, error=str(exc))
+
+    def _cancel_engine(self, database: str) -> AsyncEngine:
+        # Unpooled, so a cancel never queues behind the very queries it has to stop.
+        engine = self._cancel_engines.get(database)
+        if engine is None:
+            url = self._require_config(database).url
+            engine = self._cancel_engines[database] = create_async_engine(url, poolclass=NullPool)
+        return engine
+
+    def _result_cache_key(
+        self,
+        database: str,
+        query_text: str,
+        params: Mapping[str, Any],
+        limit: int | None,
+    ) -> tuple[Hashable, ...] | None:
+        if not self._result_cache.enabled or not self._require_config(database).result_cache:
+            return None
+        normalized = _normalize_query(query_text)
+        return (database, normalized, json.dumps(params, sort_keys=True, default=str), limit)
+
+    def _cached_schema(self, key: tuple[Hashable, ...]) -> Any | None:
+        if not self._schema_cache.enabled:
+            return None
+        database, operation = key[0], key[1]
+        cached = self._schema_cache.get(key)
+        _SCHEMA_CACHE_REQUESTS.labels(
+            database=database,
+            operation=operation,
+            result="miss" if cached is None else "hit",
+        ).inc()
+        return cached
 
     async def _fetch_all(
         self, database: str, query: Any, params: Mapping[str, Any] | None = None
     ) -> list[dict[str, Any]]:
-        engine = self._require_engine(database)
-        async with engine.connect() as conn:
+        async with self._connect(database) as conn:
             result = await conn.execute(query, params or {})
             return [dict(row) for row in result.mappings().all()]
 
-    def _require_engine(self, database: str) -> AsyncEngine:
+    @asynccontextmanager
+    async def _connect(self, database: str) -> AsyncIterator[AsyncConnection]:
+        engine = self._require_engine(database)
+        start = perf_counter()
+        with trace_db(database):
+            async with engine.connect() as conn:
+                _POOL_WAIT.labels(database=database).observe(perf_counter() - start)
+                yield conn
+
+    def _create_engine(self, name: str) -> AsyncEngine:
+        config = self._databases[name]
+        options = config.pool
+        engine = create_async_engine(
+            config.url,
+            pool_size=options.pool_size,
+            max_overflow=options.max_overflow,
+            pool_recycle=options.pool_recycle,
+            pool_pre_ping=options.pool_pre_ping,
+            pool_timeout=options.pool_timeout,
+        )
+        pool = engine.pool
+        _POOL_SIZE.labels(database=name).set(options.pool_size)
+        _POOL_CHECKED_OUT.labels(database=name).set_function(lambda: pool.checkedout())
+        _POOL_OVERFLOW.labels(database=name).set_function(lambda: max(pool.overflow(), 0))
+        logger.info("database_engine_created", database=name, dialect=config.dialect)
+        return engine
+
+    def _require_config(self, database: str) -> DatabaseSettings:
         try:
-            return self._engines[database]
+            return self._databases[database]
         except KeyError as exc:
-            raise ValueError(f"Unknown database '{database}'. Available: {list(self._engines)}") from exc
+            raise ValueError(f"Unknown database '{database}'. Available: {list(self._databases)}") from exc
+
+    def _require_engine(self, database: str) -> AsyncEngine:
+        engine = self._engines.get(database)
+        if engine is None:
+            self._require_config(database)
+            engine = self._engines[database] = self._create_engine(database)
+        return engine
 
     def _ignored_schemas(self, database: str) -> Mapping[str, str]:
-        if database == "mysql":
+        if self._require_config(database).dialect == "mysql":
             return {
                 "ignore1": "information_schema",
                 "ignore2": "mysql",
@@ -138,6 +750,71 @@ class DatabaseManager:
         }
 
 
+def _estimate_size(columns: Sequence[str], rows: Sequence[tuple[Any, ...]]) -> int:
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(column) for column in columns)
+    for row in rows:
+        size += sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+def _limit_query(query_text: str, limit: int | None) -> str | None:
+    """Wrap SELECT/WITH queries so the database enforces ``limit``.
+
+    Returns ``None`` for statements that cannot be used as a derived table
+    (SHOW, DESCRIBE, EXPLAIN), which keep the client-side limit.
+    """
+    if limit is None:
+        return None
+    body = _strip_statement_end(query_text).strip()
+    if not body or body.split()[0].upper() not in {"SELECT", "WITH"}:
+        return None
+    # Newlines keep a trailing "--" comment from swallowing the closing parenthesis.
+    return f"SELECT * FROM (\n{body}\n) AS mcp_limited LIMIT {int(limit)}"
+
+
+def _strip_statement_end(query_text: str) -> str:
+    """Drop the semicolons, comments and whitespace that end ``query_text``."""
+    end = 0
+    for match in _SQL_TOKEN.finditer(query_text):
+        token = match.group()
+        if token == ";" or token.isspace() or token.startswith(("--", "/*")):
+            continue
+        end = match.end()
+    return query_text[:end]
+
+
+def _normalize_query(query_text: str) -> str:
+    """``query_text`` without comments or its statement end, whitespace runs collapsed.
+
+    Literals and quoted identifiers are kept verbatim; a comment counts as whitespace.
+    """
+    parts: list[str] = []
+    for match in _SQL_TOKEN.finditer(_strip_statement_end(query_text)):
+        token = match.group()
+        if token.isspace() or token.startswith(("--", "/*")):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+        else:
+            parts.append(token)
+    return "".join(parts).strip()
+
+
+def _is_duplicate_column(exc: SQLAlchemyError) -> bool:
+    args = getattr(getattr(exc, "orig", None), "args", ())
+    return bool(args) and args[0] == 1060
+
+
+def _is_statement_timeout(exc: SQLAlchemyError) -> bool:
+    orig = getattr(exc, "orig", None)
+    if orig is None:
+        return False
+    # Postgres query_canceled (57014) / MySQL ER_QUERY_TIMEOUT (3024).
+    if getattr(orig, "sqlstate", None) == "57014" or getattr(orig, "pgcode", None) == "57014":
+        return True
+    args = getattr(orig, "args", ())
+    return bool(args) and args[0] == 3024
+
+
 def _ensure_safe_query(query_text: str) -> None:
     stripped = query_text.lstrip()
     if not stripped:
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import hashlib
+import hmac
+import re
+import secrets
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from pathlib import Path
+from time import time
+from typing import Any, Literal, Sequence
+from uuid import uuid4
+
+import structlog
+from prometheus_client import Counter
+
+logger = structlog.get_logger(__name__)
+
+ExportFormat = Literal["csv", "parquet"]
+
+_EXPORT_ROWS = Counter(
+    "mcp_sql_export_rows_total",
+    "Rows written to export files",
+    labelnames=("database", "format"),
+)
+_EXPORTS = Counter(
+    "mcp_sql_exports_total",
+    "Export runs grouped by outcome",
+    labelnames=("database", "format", "status"),
+)
+
+_EXPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class ExportWriter(ABC):
+    """Write batches of rows to a file without keeping them in memory.
+
+    File I/O runs in a worker thread so a large export does not stall the event
+    loop. The first ``preview_rows`` rows are kept for the tool response.
+    """
+
+    format: ExportFormat
+
+    def __init__(self, path: Path, *, database: str, preview_rows: int) -> None:
+        self.path = path
+        self.database = database
+        self.columns: list[str] = []
+        self.preview: list[list[Any]] = []
+        self.row_count = 0
+        self._preview_rows = preview_rows
+
+    async def open(self, columns: Sequence[str]) -> None:
+        self.columns = list(columns)
+        await asyncio.to_thread(self._open)
+
+    async def write(self, rows: Sequence[Sequence[Any]]) -> None:
+        missing = self._preview_rows - len(self.preview)
+        if missing > 0:
+            self.preview.extend(list(row) for row in rows[:missing])
+        await asyncio.to_thread(self._write, rows)
+        self.row_count += len(rows)
+        _EXPORT_ROWS.labels(database=self.database, format=self.format).inc(len(rows))
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def abort(self) -> None:
+        with suppress(Exception):
+            self._close()
+
+    @abstractmethod
+    def _open(self) -> None: ...
+
+    @abstractmethod
+    def _write(self, rows: Sequence[Sequence[Any]]) -> None: ...
+
+    @abstractmethod
+    def _close(self) -> None: ...
+
+
+class CsvExportWriter(ExportWriter):
+    format: ExportFormat = "csv"
+
+    def _open(self) -> None:
+        self._file = self.path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def _write(self, rows: Sequence[Sequence[Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def _close(self) -> None:
+        self._file.close()
+
+
+class ParquetExportWriter(ExportWriter):
+    format: ExportFormat = "parquet"
+
+    def _open(self) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("Parquet exports require the 'parquet' extra (pyarrow)") from exc
+        self._pa = pa
+        self._pq = pq
+        self._writer = None
+
+    def _write(self, rows: Sequence[Sequence[Any]]) -> None:
+        if not rows:
+            return
+        pa = self._pa
+        arrays = [pa.array(list(values)) for values in zip(*rows)]
+        if self._writer is None:
+            # Columns that are entirely NULL in the first batch get a string type so
+            # later batches holding values can still be written.
+            fields = [
+                pa.field(name, pa.string() if array.type == pa.null() else array.type)
+                for name, array in zip(self.columns, arrays)
+            ]
+            self._writer = self._pq.ParquetWriter(self.path, pa.schema(fields))
+        table = pa.Table.from_arrays(arrays, names=self.columns).cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def _close(self) -> None:
+        if self._writer is None:
+            pa = self._pa
+            schema = pa.schema([pa.field(name, pa.string()) for name in self.columns])
+            self._writer = self._pq.ParquetWriter(self.path, schema)
+        self._writer.close()
+
+
+_WRITERS: dict[str, type[ExportWriter]] = {
+    "csv": CsvExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+class ExportStore:
+    """Directory of finished export files addressed by an opaque id.
+
+    Files are written under a ``.part`` name and renamed once complete, so a
+    download never sees a partial export. Files older than the TTL are removed
+    whenever a new export starts. Downloads need a link signed with
+    ``signing_key`` (HMAC-SHA256 of the id and expiry); without a key, one is
+    generated and links only stay valid for the life of the process.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        ttl_seconds: float,
+        signing_key: str | None = None,
+        link_ttl_seconds: float = 900.0,
+    ) -> None:
+        self._directory = Path(directory)
+        self._ttl_seconds = ttl_seconds
+        if not signing_key:
+            logger.info("export_signing_key_generated")
+            signing_key = secrets.token_hex(32)
+        self._signing_key = signing_key.encode("utf-8")
+        self._link_ttl_seconds = link_ttl_seconds
+
+    def writer(self, export_format: ExportFormat, *, database: str, preview_rows: int) -> ExportWriter:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self.purge_expired()
+        path = self._directory / f"{uuid4().hex}.{export_format}.part"
+        return _WRITERS[export_format](path, database=database, preview_rows=preview_rows)
+
+    def commit(self, writer: ExportWriter) -> tuple[str, Path]:
+        final = writer.path.with_suffix("")
+        writer.path.rename(final)
+        _EXPORTS.labels(database=writer.database, format=writer.format, status="success").inc()
+        return final.name.split(".", 1)[0], final
+
+    def discard(self, writer: ExportWriter) -> None:
+        writer.abort()
+        writer.path.unlink(missing_ok=True)
+        _EXPORTS.labels(database=writer.database, format=writer.format, status="error").inc()
+
+    def sign(self, export_id: str) -> dict[str, str]:
+        """Query parameters authorizing a download of ``export_id`` until they expire."""
+        expires = str(int(time() + self._link_ttl_seconds))
+        return {"expires": expires, "signature": self._signature(export_id, expires)}
+
+    def verify(self, export_id: str, expires: str | None, signature: str | None) -> bool:
+        if not expires or not signature or not expires.isdigit() or int(expires) < time():
+            return False
+        return hmac.compare_digest(self._signature(export_id, expires), signature)
+
+    def _signature(self, export_id: str, expires: str) -> str:
+        message = f"{export_id}:{expires}".encode("utf-8")
+        return hmac.new(self._signing_key, message, hashlib.sha256).hexdigest()
+
+    def resolve(self, export_id: str) -> Path | None:
+        if not _EXPORT_ID.match(export_id):
+            return None
+        for export_format in _WRITERS:
+            path = self._directory / f"{export_id}.{export_format}"
+            if path.is_file():
+                return path
+        return None
+
+    def purge_expired(self) -> int:
+        if self._ttl_seconds <= 0 or not self._directory.is_dir():
+            return 0
+        cutoff = time() - self._ttl_seconds
+        removed = 0
+        for path in self._directory.iterdir():
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info("exports_purged", removed=removed)
+        return removed
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Literal, Sequence
+
+from prometheus_client import Counter, Histogram
+
+ResultFormat = Literal["records", "compact", "columnar"]
+
+_RESULT_BYTES = Histogram(
+    "mcp_sql_result_bytes",
+    "Estimated JSON size of run_sql_query results",
+    labelnames=("database", "format"),
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+_RESULT_BYTES_SAVED = Counter(
+    "mcp_sql_result_bytes_saved_total",
+    "Bytes saved by the result format and value truncation compared to full records",
+    labelnames=("database", "format"),
+)
+_RESULT_TOKENS_SAVED = Counter(
+    "mcp_sql_result_tokens_saved_total",
+    "Estimated LLM prompt tokens saved compared to full records",
+    labelnames=("database", "format"),
+)
+
+# Rough average for JSON-heavy text with common tokenizers.
+_BYTES_PER_TOKEN = 4
+_ELLIPSIS = "…"
+
+
+def encode_result(
+    database: str,
+    columns: Sequence[str],
+    rows: Sequence[Sequence[Any]],
+    *,
+    truncated: bool,
+    result_format: ResultFormat = "records",
+    max_value_chars: int | None = None,
+    max_bytes: int | None = None,
+) -> dict[str, Any]:
+    """Shape fetched rows into the requested payload.
+
+    ``records`` repeats the column names in every row; ``compact`` sends the names
+    once followed by row arrays; ``columnar`` sends one array per column. Strings
+    longer than ``max_value_chars`` are cut, and rows are dropped from the end once
+    the payload would exceed ``max_bytes``. Sizes are estimated row by row from the
+    compact JSON encoding, so the budget is approximate.
+    """
+    key_overhead = sum(_json_size(column) + 1 for column in columns)
+    kept: list[Sequence[Any]] = []
+    shortened = 0
+    values_size = 0
+    original_size = 0
+    reason = "limit" if truncated else None
+    for row in rows:
+        if max_value_chars is not None:
+            row, cut, saved = _shorten_row(row, max_value_chars)
+            shortened += cut
+            original_size += saved
+        row_size = _json_size(list(row)) + 1
+        if result_format == "records":
+            row_size += key_overhead
+        if max_bytes is not None and values_size + row_size > max_bytes and kept:
+            truncated = True
+            reason = "max_bytes"
+            break
+        kept.append(row)
+        values_size += row_size
+
+    payload: dict[str, Any] = {"columns": list(columns)}
+    if result_format == "records":
+        payload["rows"] = [dict(zip(columns, row)) for row in kept]
+    elif result_format == "compact":
+        payload["format"] = result_format
+        payload["rows"] = [list(row) for row in kept]
+    else:
+        payload["format"] = result_format
+        payload["values"] = [list(values) for values in zip(*kept)] if kept else [[] for _ in columns]
+    payload["row_count"] = len(kept)
+    payload["truncated"] = truncated
+    if truncated:
+        payload["truncated_reason"] = reason
+    if shortened:
+        payload["truncated_values"] = shortened
+
+    records_size = values_size + original_size
+    if result_format != "records":
+        records_size += len(kept) * key_overhead
+    _observe(database, result_format, emitted=values_size, saved=records_size - values_size)
+    return payload
+
+
+def _shorten_row(row: Sequence[Any], max_chars: int) -> tuple[tuple[Any, ...], int, int]:
+    values: list[Any] = []
+    shortened = 0
+    saved = 0
+    for value in row:
+        if isinstance(value, str) and len(value) > max_chars:
+            short = value[:max_chars] + _ELLIPSIS
+            saved += _json_size(value) - _json_size(short)
+            shortened += 1
+            value = short
+        values.append(value)
+    return tuple(values), shortened, saved
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+def _observe(database: str, result_format: str, *, emitted: int, saved: int) -> None:
+    _RESULT_BYTES.labels(database=database, format=result_format).observe(emitted)
+    if saved > 0:
+        _RESULT_BYTES_SAVED.labels(database=database, format=result_format).inc(saved)
+        _RESULT_TOKENS_SAVED.labels(database=database, format=result_format).inc(
+            saved / _BYTES_PER_TOKEN
+        )
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
+_IDENTIFIER_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+_TABLE_NAME_BOOST = 3
+_K1 = 1.2
+_B = 0.75
+
+
+@dataclass
+class IndexedTable:
+    schema: str | None
+    table: str
+    comment: str | None = None
+    columns: list[dict[str, Any]] = field(default_factory=list)
+
+    def terms(self) -> list[str]:
+        terms = tokenize(self.table) * _TABLE_NAME_BOOST
+        if self.schema:
+            terms += tokenize(self.schema)
+        if self.comment:
+            terms += tokenize(self.comment)
+        for column in self.columns:
+            terms += tokenize(column["column_name"])
+            if column.get("comment"):
+                terms += tokenize(column["comment"])
+        return terms
+
+    def to_dict(self, score: float) -> dict[str, Any]:
+        result: dict[str, Any] = {"schema": self.schema, "table": self.table, "score": round(score, 3)}
+        if self.comment:
+            result["comment"] = self.comment
+        result["columns"] = self.columns
+        return result
+
+
+class SchemaIndex:
+    """BM25 index over table names, column names and comments of one database.
+
+    Identifiers are split on underscores and camelCase; every word also indexes
+    its character trigrams so partial names ("tech" for "technicians") still match.
+    """
+
+    def __init__(self, tables: Iterable[IndexedTable]) -> None:
+        self._tables = list(tables)
+        self._postings: dict[str, dict[int, int]] = {}
+        self._lengths: list[int] = []
+        for doc_id, table in enumerate(self._tables):
+            counts = Counter(table.terms())
+            self._lengths.append(sum(counts.values()))
+            for term, count in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def search(self, query: str, top_k: int) -> list[dict[str, Any]]:
+        scores: dict[int, float] = {}
+        total = len(self._tables)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = _K1 * (1 - _B + _B * self._lengths[doc_id] / self._average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (_K1 + 1) / (frequency + norm)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        return [self._tables[doc_id].to_dict(score) for doc_id, score in ranked]
+
+
+def tokenize(value: str) -> list[str]:
+    decomposed = unicodedata.normalize("NFKD", value)
+    ascii_text = "".join(char for char in decomposed if not unicodedata.combining(char))
+    terms: list[str] = []
+    for part in _IDENTIFIER_PART.findall(ascii_text):
+        word = part.lower()
+        if len(word) > 3 and word.endswith("s"):
+            word = word[:-1]
+        terms.append(word)
+        padded = f" {word} "
+        terms.extend(f"#{padded[index:index + 3]}" for index in range(len(padded) - 2))
+    return terms
@@ -1,19 +1,39 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
-from typing import Any, Dict
+from typing import Any, Dict, Sequence
+from urllib.parse import urlencode
 
 import structlog
 from mcp.server.fastmcp import Context, FastMCP
+from mcp.server.lowlevel.server import request_ctx
+from mcp.types import ContentBlock
+from pydantic import BaseModel, ConfigDict, Field
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
 
 from .config import Settings, get_settings
 from .db import DatabaseManager
+from .exports import MEDIA_TYPES, ExportFormat, ExportStore
+from .results import ResultFormat
 from .logging_config import configure_logging
 from .metrics import launch_metrics_server
+from .tracing import TIMINGS_LOGGER, ToolTimings, configure_tracing, trace_tool
 
 logger = structlog.get_logger(__name__)
 
 
+class TableReference(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    table: str = Field(..., description="Table name")
+    schema_name: str | None = Field(
+        default=None,
+        alias="schema",
+        description="Optional schema name for the table",
+    )
+
+
 async def _log_context_message(ctx: Context | None, message: str) -> None:
     if ctx is None:
         return
@@ -23,6 +43,37 @@ async def _log_context_message(ctx: Context | None, message: str) -> None:
         logger.debug("context_log_failed", error=str(exc), message=message)
 
 
+class TracedFastMCP(FastMCP):
+    """FastMCP server running each tool call inside a span.
+
+    The span continues the W3C trace context found in the request ``_meta``.
+    When the caller also sends a ``call_id``, the call's tool and database
+    timings are sent back as a log notification before the response.
+    """
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]) -> Sequence[ContentBlock] | dict[str, Any]:
+        request = request_ctx.get(None)
+        meta = request.meta.model_dump() if request is not None and request.meta is not None else None
+        with trace_tool(name, meta) as timings:
+            try:
+                return await super().call_tool(name, arguments)
+            finally:
+                if request is not None and timings.call_id:
+                    await _report_timings(request, timings)
+
+
+async def _report_timings(request: Any, timings: ToolTimings) -> None:
+    try:
+        await request.session.send_log_message(
+            level="debug",
+            data=timings.to_dict(),
+            logger=TIMINGS_LOGGER,
+            related_request_id=request.request_id,
+        )
+    except Exception as exc:  # pragma: no cover - timings are best effort
+        logger.debug("timings_report_failed", error=str(exc))
+
+
 def build_server(
     settings: Settings | None = None,
     *,
@@ -32,11 +83,18 @@ def build_server(
     settings = settings or get_settings()
     configure_logging(settings)
     launch_metrics_server(settings)
+    configure_tracing(settings)
 
     available = settings.get_available_databases()
     if not available:
         logger.warning("no_databases_configured")
-    db_manager = DatabaseManager(available)
+    db_manager = DatabaseManager(
+        available,
+        schema_cache_ttl=settings.schema_cache_ttl_seconds,
+        schema_cache_max_entries=settings.schema_cache_max_entries,
+        result_cache_ttl=settings.result_cache_ttl_seconds,
+        result_cache_max_bytes=settings.result_cache_max_bytes,
+    )
 
     @asynccontextmanager
     async def lifespan(app: FastMCP):  # noqa: ARG001 - app reserved for future use
@@ -53,7 +111,7 @@ def build_server(
         " variables."
     )
 
-    server = FastMCP(
+    server = TracedFastMCP(
         name="mcp-server-sql",
         instructions=instructions,
         lifespan=lifespan,
@@ -61,11 +119,37 @@ def build_server(
         port=port or settings.mcp_port,
     )
 
-    _register_tools(server, db_manager)
+    export_store = ExportStore(
+        settings.export_dir,
+        ttl_seconds=settings.export_ttl_seconds,
+        signing_key=settings.export_signing_key,
+        link_ttl_seconds=settings.export_link_ttl_seconds,
+    )
+    _register_tools(server, db_manager, export_store, settings)
+    _register_routes(server, export_store)
     return server
 
 
-def _register_tools(server: FastMCP, db_manager: DatabaseManager) -> None:
+def _register_routes(server: FastMCP, export_store: ExportStore) -> None:
+    @server.custom_route("/exports/{export_id}", methods=["GET"])
+    async def download_export(request: Request) -> Response:
+        export_id = request.path_params["export_id"]
+        query = request.query_params
+        if not export_store.verify(export_id, query.get("expires"), query.get("signature")):
+            return JSONResponse({"detail": "Invalid or expired export link"}, status_code=403)
+        path = export_store.resolve(export_id)
+        if path is None:
+            return JSONResponse({"detail": "Export not found"}, status_code=404)
+        # FileResponse sends the file in fixed-size chunks; it is never loaded whole.
+        return FileResponse(path, media_type=MEDIA_TYPES[path.suffix[1:]], filename=path.name)
+
+
+def _register_tools(
+    server: FastMCP,
+    db_manager: DatabaseManager,
+    export_store: ExportStore,
+    settings: Settings,
+) -> None:
     @server.tool(name="list_databases", description="List configured database connections")
     async def list_databases() -> list[str]:
         return list(db_manager.available_databases)
@@ -114,11 +198,78 @@ def _register_tools(server: FastMCP, db_manager: DatabaseManager) -> None:
         )
         return details
 
+    @server.tool(
+        name="describe_tables",
+        description=(
+            "Describe the columns of several tables in one call. Prefer this over repeated"
+            " describe_table calls."
+        ),
+    )
+    async def describe_tables(
+        database: str,
+        tables: list[TableReference],
+        ctx: Context | None = None,
+    ) -> list[dict[str, Any]]:
+        details = await db_manager.describe_tables(
+            database, [(ref.schema_name, ref.table) for ref in tables]
+        )
+        await _log_context_message(
+            ctx,
+            f"describe_tables database={database} tables={len(details)}",
+        )
+        return details
+
+    @server.tool(
+        name="search_schema",
+        description=(
+            "Search table names, column names and comments of a database and return the"
+            " top_k most relevant tables with their columns. Prefer this over list_tables"
+            " on large catalogs."
+        ),
+    )
+    async def search_schema(
+        database: str,
+        query: str,
+        top_k: int = 10,
+        ctx: Context | None = None,
+    ) -> list[dict[str, Any]]:
+        matches = await db_manager.search_schema(database, query, top_k)
+        await _log_context_message(
+            ctx,
+            f"search_schema database={database} query={query} matches={len(matches)}",
+        )
+        return matches
+
+    @server.tool(
+        name="invalidate_schema_cache",
+        description=(
+            "Drop cached table and column metadata and cached query results, for one"
+            " database or all of them, after a schema change."
+        ),
+    )
+    async def invalidate_schema_cache(
+        database: str | None = None,
+        ctx: Context | None = None,
+    ) -> Dict[str, Any]:
+        removed = db_manager.invalidate_schema_cache(database)
+        removed_results = db_manager.invalidate_result_cache(database)
+        await _log_context_message(
+            ctx,
+            f"invalidate_schema_cache database={database} entries={removed} results={removed_results}",
+        )
+        return {
+            "database": database,
+            "invalidated_entries": removed,
+            "invalidated_results": removed_results,
+        }
+
     @server.tool(
         name="run_sql_query",
         description=(
             "Execute a read-only SQL query and return rows. Parameters may be passed as"
-            " a mapping."
+            " a mapping. result_format 'compact' returns the column names once and rows as"
+            " arrays, 'columnar' returns one array per column; max_value_chars and max_bytes"
+            " shorten long strings and cap the payload size."
         ),
     )
     async def run_sql_query(
@@ -126,15 +277,67 @@ def _register_tools(server: FastMCP, db_manager: DatabaseManager) -> None:
         query: str,
         parameters: Dict[str, Any] | None = None,
         limit: int | None = 100,
+        result_format: ResultFormat = "records",
+        max_value_chars: int | None = None,
+        max_bytes: int | None = None,
         ctx: Context | None = None,
     ) -> Dict[str, Any]:
-        result = await db_manager.execute_read_query(database, query, parameters, limit=limit)
+        result = await db_manager.execute_read_query(
+            database,
+            query,
+            parameters,
+            limit=limit,
+            result_format=result_format,
+            max_value_chars=max_value_chars,
+            max_bytes=max_bytes,
+        )
         await _log_context_message(
             ctx,
-            f"run_sql_query database={database} row_count={result['row_count']} limit={limit}",
+            f"run_sql_query database={database} row_count={result['row_count']} limit={limit}"
+            f" format={result_format}",
         )
         return result
 
+    @server.tool(
+        name="export_sql_query",
+        description=(
+            "Run a read-only SQL query without a row limit and write the full result to a"
+            " CSV or Parquet file. Returns an export id, the row count and a few preview rows;"
+            " the file is served at download_path, a signed link that expires."
+        ),
+    )
+    async def export_sql_query(
+        database: str,
+        query: str,
+        parameters: Dict[str, Any] | None = None,
+        export_format: ExportFormat = "csv",
+        ctx: Context | None = None,
+    ) -> Dict[str, Any]:
+        writer = export_store.writer(
+            export_format, database=database, preview_rows=settings.export_preview_rows
+        )
+        try:
+            row_count = await db_manager.export_query(
+                database, query, parameters, writer, batch_size=settings.export_batch_size
+            )
+            export_id, path = export_store.commit(writer)
+        except BaseException:
+            export_store.discard(writer)
+            raise
+        await _log_context_message(
+            ctx,
+            f"export_sql_query database={database} format={export_format} row_count={row_count}",
+        )
+        return {
+            "export_id": export_id,
+            "format": export_format,
+            "columns": writer.columns,
+            "row_count": row_count,
+            "size_bytes": path.stat().st_size,
+            "preview": writer.preview,
+            "download_path": f"/exports/{export_id}?{urlencode(export_store.sign(export_id))}",
+        }
+
 
 def run_server(
     transport: str | None = None,
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Iterator, Mapping
+
+import structlog
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind
+
+from .config import Settings
+
+logger = structlog.get_logger(__name__)
+
+tracer = trace.get_tracer("mcp_server_sql")
+
+# Logger name of the notifications carrying per-call timings back to the client.
+TIMINGS_LOGGER = "mcp_server_sql.timings"
+
+
+@dataclass
+class ToolTimings:
+    """Time spent by one tool call, and by the database work it triggered."""
+
+    call_id: str | None
+    started: float = field(default_factory=perf_counter)
+    db_seconds: float = 0.0
+    db_calls: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "call_id": self.call_id,
+            "tool_seconds": round(perf_counter() - self.started, 4),
+            "db_seconds": round(self.db_seconds, 4),
+            "db_calls": self.db_calls,
+        }
+
+
+_CURRENT_TOOL: ContextVar[ToolTimings | None] = ContextVar("mcp_tool_timings", default=None)
+
+_tracing_configured = False
+_tracing_lock = threading.Lock()
+
+
+def configure_tracing(settings: Settings) -> None:
+    global _tracing_configured
+    with _tracing_lock:
+        if _tracing_configured or settings.tracing_exporter == "none":
+            return
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("Tracing requires the 'tracing' extra (opentelemetry-sdk)") from exc
+        if settings.tracing_exporter == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError(
+                    "OTLP tracing requires the 'tracing' extra (opentelemetry-exporter-otlp-proto-http)"
+                ) from exc
+            exporter = OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+        else:
+            exporter = ConsoleSpanExporter(
+                out=open(settings.tracing_file, "a", encoding="utf-8"),  # noqa: SIM115 - lives with the process
+                formatter=lambda span: span.to_json(indent=None) + "\n",
+            )
+        provider = TracerProvider(resource=Resource.create({"service.name": "mcp-server-sql"}))
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        _tracing_configured = True
+        logger.info("tracing_configured", exporter=settings.tracing_exporter)
+
+
+@contextmanager
+def trace_tool(name: str, meta: Mapping[str, Any] | None) -> Iterator[ToolTimings]:
+    """Span for a tool call, continuing the trace context sent in the request ``_meta``."""
+    carrier = {key: value for key, value in (meta or {}).items() if isinstance(value, str)}
+    timings = ToolTimings(call_id=carrier.get("call_id"))
+    token = _CURRENT_TOOL.set(timings)
+    try:
+        with tracer.start_as_current_span(
+            f"tool {name}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"mcp.tool": name},
+        ):
+            yield timings
+    finally:
+        _CURRENT_TOOL.reset(token)
+
+
+@contextmanager
+def trace_db(database: str) -> Iterator[None]:
+    """Span for a database connection checkout and the statements run on it."""
+    start = perf_counter()
+    try:
+        with tracer.start_as_current_span(
+            "db", kind=SpanKind.CLIENT, attributes={"db.name": database}
+        ):
+            yield
+    finally:
+        timings = _CURRENT_TOOL.get()
+        if timings is not None:
+            timings.db_seconds += perf_counter() - start
+            timings.db_calls += 1
@@ -0,0 +1,169 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from mcp_server_sql.config import DatabaseSettings
+from mcp_server_sql.db import DatabaseManager, _limit_query, _normalize_query
+
+
+class _FakeConnection:
+    def __init__(self, events: list[str]) -> None:
+        self.info = {"backend_id": 42}
+        self._events = events
+
+    async def invalidate(self) -> None:
+        self._events.append("invalidate")
+
+
+def _manager(events: list[str]) -> DatabaseManager:
+    manager = DatabaseManager({"main": "sqlite+aiosqlite:///unused.sqlite"})
+
+    async def cancel_backend(database: str, backend_id: object) -> None:
+        events.append(f"cancel {backend_id}")
+
+    manager._cancel_backend = cancel_backend  # type: ignore[method-assign]
+    return manager
+
+
+async def _statement(events: list[str]) -> None:
+    try:
+        await asyncio.sleep(10)
+    except asyncio.CancelledError:
+        events.append("statement stopped")
+        raise
+
+
+def test_deadline_cancels_the_statement_before_releasing_the_connection():
+    events: list[str] = []
+    manager = _manager(events)
+
+    async def scenario() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await manager._guard("main", _FakeConnection(events), _statement(events), 0.01)
+
+    asyncio.run(scenario())
+    assert events == ["cancel 42", "statement stopped", "invalidate"]
+
+
+def test_request_cancellation_cancels_the_statement_before_releasing_the_connection():
+    events: list[str] = []
+    manager = _manager(events)
+
+    async def scenario() -> None:
+        async def request() -> None:
+            await manager._guard("main", _FakeConnection(events), _statement(events), None)
+            events.append("released")
+
+        task = asyncio.ensure_future(request())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert events == ["cancel 42", "statement stopped", "invalidate"]
+
+
+def test_finished_statement_keeps_its_connection():
+    events: list[str] = []
+    manager = _manager(events)
+
+    async def statement() -> str:
+        return "rows"
+
+    result = asyncio.run(manager._guard("main", _FakeConnection(events), statement(), 1.0))
+    assert result == "rows"
+    assert events == []
+
+
+def test_read_query_on_sqlite(tmp_path):
+    manager = DatabaseManager({"main": f"sqlite+aiosqlite:///{tmp_path / 'main.sqlite'}"})
+
+    async def scenario() -> dict:
+        try:
+            return await manager.execute_read_query("main", "SELECT 1 AS a, 'x' AS b")
+        finally:
+            await manager.close()
+
+    result = asyncio.run(scenario())
+    assert result["rows"] == [{"a": 1, "b": "x"}]
+
+
+@pytest.mark.parametrize(
+    ("query", "body"),
+    [
+        ("SELECT 1", "SELECT 1"),
+        ("  SELECT 1 ;\n", "SELECT 1"),
+        ("SELECT 1; -- note", "SELECT 1"),
+        ("SELECT 1 -- note\n;\n/* end */ ;", "SELECT 1"),
+        ("SELECT '--; x' AS a; -- note", "SELECT '--; x' AS a"),
+        ("SELECT \"a;b\" FROM t /* c */ WHERE x = 1;", "SELECT \"a;b\" FROM t /* c */ WHERE x = 1"),
+        ("SELECT $$a -- b$$;", "SELECT $$a -- b$$"),
+        ("WITH t AS (SELECT 1 AS a) SELECT a FROM t;", "WITH t AS (SELECT 1 AS a) SELECT a FROM t"),
+    ],
+)
+def test_limit_query_wraps_the_statement_without_its_end(query, body):
+    assert _limit_query(query, 10) == f"SELECT * FROM (\n{body}\n) AS mcp_limited LIMIT 10"
+
+
+@pytest.mark.parametrize("query", ["SHOW TABLES", "EXPLAIN SELECT 1", "-- only a comment", ";"])
+def test_limit_query_leaves_other_statements_alone(query):
+    assert _limit_query(query, 10) is None
+
+
+def test_limit_query_without_limit():
+    assert _limit_query("SELECT 1", None) is None
+
+
+def test_read_query_with_trailing_comment_on_sqlite(tmp_path):
+    manager = DatabaseManager({"main": f"sqlite+aiosqlite:///{tmp_path / 'main.sqlite'}"})
+
+    async def scenario() -> dict:
+        try:
+            return await manager.execute_read_query("main", "SELECT 1 AS a; -- note", limit=5)
+        finally:
+            await manager.close()
+
+    assert asyncio.run(scenario())["rows"] == [{"a": 1}]
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        ("SELECT a -- x\nFROM t", "SELECT a -- x FROM t"),
+        ("SELECT a /* FROM t */ FROM u", "SELECT a /* FROM u */ FROM t"),
+        ("SELECT 'a  b'", "SELECT 'a b'"),
+    ],
+)
+def test_cache_key_separates_queries_differing_in_comments_or_literals(first, second):
+    assert _normalize_query(first) != _normalize_query(second)
+
+
+def test_cache_key_ignores_comments_whitespace_and_statement_end():
+    assert _normalize_query("SELECT a -- x\nFROM t;") == "SELECT a FROM t"
+    assert _normalize_query("SELECT  a\n\tFROM /* c */ t ; -- end") == "SELECT a FROM t"
+
+
+def test_cached_result_is_not_shared_with_a_commented_out_clause(tmp_path):
+    path = tmp_path / "main.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (a INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(1,), (2,)])
+    manager = DatabaseManager(
+        {"main": DatabaseSettings(url=f"sqlite+aiosqlite:///{path}", result_cache=True)},
+        result_cache_ttl=60,
+        result_cache_max_bytes=1_000_000,
+    )
+
+    async def scenario() -> tuple[dict, dict]:
+        try:
+            from_t = await manager.execute_read_query("main", "SELECT 1 AS a -- x\nFROM t")
+            constant = await manager.execute_read_query("main", "SELECT 1 AS a -- x FROM t")
+            return from_t, constant
+        finally:
+            await manager.close()
+
+    from_t, constant = asyncio.run(scenario())
+    assert from_t["row_count"] == 2
+    assert constant["rows"] == [{"a": 1}]
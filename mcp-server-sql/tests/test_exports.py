@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from starlette.testclient import TestClient
+
+from mcp_server_sql.exports import ExportStore, ExportWriter
+from mcp_server_sql.server import _register_routes
+
+_EXPORT_ID = "0123456789abcdef0123456789abcdef"
+
+
+def test_export_writer_is_abstract(tmp_path: Path) -> None:
+    with pytest.raises(TypeError):
+        ExportWriter(tmp_path / "export.csv", database="main", preview_rows=0)  # type: ignore[abstract]
+
+
+def test_signed_link_is_verified() -> None:
+    store = ExportStore("unused", ttl_seconds=0, signing_key="secret")
+    params = store.sign(_EXPORT_ID)
+    assert store.verify(_EXPORT_ID, params["expires"], params["signature"])
+    assert not store.verify("f" * 32, params["expires"], params["signature"])
+    assert not store.verify(_EXPORT_ID, str(int(params["expires"]) + 1), params["signature"])
+    assert not store.verify(_EXPORT_ID, params["expires"], None)
+
+
+def test_expired_link_is_rejected() -> None:
+    store = ExportStore("unused", ttl_seconds=0, signing_key="secret", link_ttl_seconds=-1)
+    params = store.sign(_EXPORT_ID)
+    assert not store.verify(_EXPORT_ID, params["expires"], params["signature"])
+
+
+def test_links_from_another_key_are_rejected() -> None:
+    params = ExportStore("unused", ttl_seconds=0, signing_key="one").sign(_EXPORT_ID)
+    store = ExportStore("unused", ttl_seconds=0, signing_key="two")
+    assert not store.verify(_EXPORT_ID, params["expires"], params["signature"])
+
+
+def test_download_route_requires_a_signed_link(tmp_path: Path) -> None:
+    (tmp_path / f"{_EXPORT_ID}.csv").write_text("a\n1\n", encoding="utf-8")
+    store = ExportStore(tmp_path, ttl_seconds=0, signing_key="secret")
+    server = FastMCP(name="test")
+    _register_routes(server, store)
+    client = TestClient(server.sse_app())
+
+    assert client.get(f"/exports/{_EXPORT_ID}").status_code == 403
+    response = client.get(f"/exports/{_EXPORT_ID}", params=store.sign(_EXPORT_ID))
+    assert response.status_code == 200
+    assert response.text == "a\n1\n"
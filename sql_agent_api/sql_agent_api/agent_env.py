@@ -10,6 +10,31 @@ AGENT_ENV_KEYS = {
     "OPENAI_API_BASE": "openai_api_base",
     "MCP_SERVER_URL": "mcp_server_url",
     "MCP_SSE_PATH": "mcp_sse_path",
+    "MCP_POOL_SIZE": "mcp_pool_size",
+    "MCP_POOL_HEALTH_CHECK_SECONDS": "mcp_pool_health_check_seconds",
+    "MCP_POOL_CONNECT_RETRIES": "mcp_pool_connect_retries",
+    "MCP_PING_TIMEOUT_SECONDS": "mcp_ping_timeout_seconds",
+    "MCP_REQUEST_TIMEOUT_SECONDS": "mcp_request_timeout_seconds",
+    "MCP_TOOL_CONCURRENCY": "mcp_tool_concurrency",
+    "CHECKPOINTER_BACKEND": "checkpointer_backend",
+    "CHECKPOINTER_URL": "checkpointer_url",
+    "CHECKPOINTER_POOL_SIZE": "checkpointer_pool_size",
+    "HISTORY_MAX_MESSAGES": "history_max_messages",
+    "HISTORY_SUMMARY_MAX_CHARS": "history_summary_max_chars",
+    "SCHEMA_PRELOAD": "schema_preload",
+    "SCHEMA_PRELOAD_TTL_SECONDS": "schema_preload_ttl_seconds",
+    "SCHEMA_PRELOAD_CATALOG_MAX_TABLES": "schema_preload_catalog_max_tables",
+    "SCHEMA_PRELOAD_MAX_TABLES": "schema_preload_max_tables",
+    "SCHEMA_PRELOAD_MAX_CHARS": "schema_preload_max_chars",
+    "AGENT_MAX_ITERATIONS": "agent_max_iterations",
+    "AGENT_TIMEOUT_SECONDS": "agent_timeout_seconds",
+    "AGENT_MAX_TOKENS": "agent_max_tokens",
+    "AGENT_MAX_SQL_ROWS": "agent_max_sql_rows",
+    "TOOL_OUTPUT_MAX_TOKENS": "tool_output_max_tokens",
+    "TOOL_OUTPUT_MAX_STRING_CHARS": "tool_output_max_string_chars",
+    "TRACING_EXPORTER": "tracing_exporter",
+    "TRACING_OTLP_ENDPOINT": "tracing_otlp_endpoint",
+    "TRACING_FILE": "tracing_file",
     "LOG_LEVEL": "log_level",
     "LOG_JSON": "log_json",
     "LANGSMITH_API_KEY": "langsmith_api_key",
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import unicodedata
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import Settings
+from .metrics import record_answer_cache
+from .models import QueryRecord
+from .repository import find_answer_by_key, list_answer_candidates
+
+logger = structlog.get_logger(__name__)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop accents, collapse whitespace.
+
+    Punctuation is kept: operators, signs and decimal points change the answer.
+    """
+    decomposed = unicodedata.normalize("NFD", question.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+
+def question_key(question: str) -> str:
+    return hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()
+
+
+async def find_cached_answer(
+    session: AsyncSession, question: str, settings: Settings
+) -> QueryRecord | None:
+    """Return a fresh successful record answering ``question``, if any.
+
+    ``exact`` matches the normalized question; ``similar`` also accepts recent
+    questions whose normalized text is at least ``ANSWER_CACHE_MIN_SIMILARITY``
+    alike. Only records that ran the agent themselves are returned, so a cached
+    answer always links to the run that produced it.
+    """
+    if settings.answer_cache_mode == "off":
+        return None
+    since = datetime.utcnow() - timedelta(seconds=settings.answer_cache_ttl_seconds)
+    source = await find_answer_by_key(session, question_key(question), since=since)
+    if source is None and settings.answer_cache_mode == "similar":
+        source = await _find_similar(session, question, since, settings)
+    record_answer_cache(hit=source is not None)
+    if source is not None:
+        logger.info("answer_cache_hit", source_id=source.id)
+    return source
+
+
+async def _find_similar(
+    session: AsyncSession, question: str, since: datetime, settings: Settings
+) -> QueryRecord | None:
+    normalized = normalize_question(question)
+    candidates = await list_answer_candidates(
+        session, since=since, limit=settings.answer_cache_max_candidates
+    )
+    best: QueryRecord | None = None
+    best_score = settings.answer_cache_min_similarity
+    for candidate in candidates:
+        score = SequenceMatcher(None, normalized, normalize_question(candidate.question)).ratio()
+        if score >= best_score:
+            best, best_score = candidate, score
+    return best
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi import Path as PathParam
+from fastapi import Query
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from ..config import Settings, get_settings
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+_FORWARDED_HEADERS = ("content-type", "content-disposition")
+
+
+@router.get("/{export_id}")
+async def download_export(
+    export_id: str = PathParam(..., pattern="^[0-9a-f]{32}$"),
+    expires: str = Query(..., pattern="^[0-9]+$"),
+    signature: str = Query(..., pattern="^[0-9a-f]{64}$"),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    """Relay an export file written by the MCP server, chunk by chunk.
+
+    ``expires`` and ``signature`` come from the signed ``download_path`` returned by
+    ``export_sql_query``; the MCP server checks them.
+    """
+    client = httpx.AsyncClient(timeout=httpx.Timeout(settings.export_timeout_seconds, connect=10.0))
+    try:
+        upstream = await client.send(
+            client.build_request(
+                "GET",
+                f"{settings.mcp_base_url}/exports/{export_id}",
+                params={"expires": expires, "signature": signature},
+            ),
+            stream=True,
+        )
+    except httpx.HTTPError as exc:
+        await client.aclose()
+        raise HTTPException(status_code=502, detail="Export service unavailable") from exc
+
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        await client.aclose()
+        if upstream.status_code == 404:
+            raise HTTPException(status_code=404, detail="Export not found")
+        if upstream.status_code == 403:
+            raise HTTPException(status_code=403, detail="Invalid or expired export link")
+        raise HTTPException(status_code=502, detail="Export service error")
+
+    async def close() -> None:
+        await upstream.aclose()
+        await client.aclose()
+
+    headers = {name: upstream.headers[name] for name in _FORWARDED_HEADERS if name in upstream.headers}
+    # No Content-Length: the body is relayed with chunked transfer encoding.
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        headers=headers,
+        media_type=headers.get("content-type"),
+        background=BackgroundTask(close),
+    )
@@ -1,95 +1,241 @@
 from __future__ import annotations
 
-from functools import lru_cache
+import asyncio
+import base64
+import binascii
+import json
+from collections import Counter
+from datetime import datetime
 from time import time
+from typing import AsyncIterator
+from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from langchain_core.messages import BaseMessage
-from sql_agent_llm.config import Settings as AgentSettings
 from sql_agent_llm.runner import AgentRunner
 
-from ..agent_env import apply_agent_environment
+from ..answer_cache import find_cached_answer, question_key
 from ..config import get_settings
-from ..database import get_session
+from ..database import get_session, get_session_factory
+from ..execution import execute_query, get_agent_runner
+from ..jobs import JobQueueFullError, QueryJob, get_job_pool
 from ..metrics import observe_request
 from ..models import QueryStatus
-from ..repository import count_queries, create_query, get_query, list_queries, update_query
-from ..schemas import QueryCreate, QueryDetail, QueryList, QueryResponse
+from ..repository import (
+    cached_count_queries,
+    create_cached_query,
+    create_query,
+    get_query,
+    get_raw_result,
+    list_batch,
+    list_queries,
+    update_query,
+)
+from ..schemas import (
+    QueryBatch,
+    QueryBatchCreate,
+    QueryCreate,
+    QueryDetail,
+    QueryList,
+    QueryResponse,
+    QueryUsage,
+)
+from ..schemas import QueryStatus as QueryStatusFilter
+from ..streaming import format_sse, get_event_broker
 
 router = APIRouter(prefix="/queries", tags=["queries"])
 
+_TERMINAL_STATUSES = (
+    QueryStatus.SUCCESS.value,
+    QueryStatus.FAILED.value,
+    QueryStatus.BUDGET_EXCEEDED.value,
+)
 
-@lru_cache(maxsize=1)
-def _runner_factory() -> AgentRunner:
-    settings = get_settings()
-    agent_settings = AgentSettings(
-        _env_file=None,
-        OPENAI_API_KEY=settings.openai_api_key,
-        OPENAI_MODEL=settings.openai_model,
-        OPENAI_API_BASE=settings.openai_api_base,
-        MCP_SERVER_URL=str(settings.mcp_server_url),
-        MCP_SSE_PATH=settings.mcp_sse_path,
-        LOG_LEVEL=settings.log_level,
-        LOG_JSON=settings.log_json,
-        METRICS_HOST=settings.metrics_host,
-        METRICS_PORT=settings.metrics_port + 1,
-        LANGSMITH_API_KEY=settings.langsmith_api_key,
-        LANGSMITH_PROJECT=settings.langsmith_project,
-        LANGSMITH_ENDPOINT=settings.langsmith_endpoint,
-    )
-    apply_agent_environment(agent_settings)
-    return AgentRunner(settings=agent_settings)
-
-
-async def get_agent_runner() -> AgentRunner:
-    return _runner_factory()
 
-
-@router.post("", response_model=QueryDetail, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    response_model=QueryDetail,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": QueryDetail}},
+)
 async def create_query_endpoint(
     payload: QueryCreate,
+    response: Response,
+    async_mode: bool = Query(
+        False,
+        alias="async",
+        description="Queue the query and return 202 immediately instead of waiting for the agent.",
+    ),
     runner: AgentRunner = Depends(get_agent_runner),
     session: AsyncSession = Depends(get_session),
 ) -> QueryDetail:
     start = time()
-    record = await create_query(session, payload.question, payload.thread_id)
+    # Follow-ups in a thread depend on earlier turns, so only standalone questions are cached.
+    key = question_key(payload.question) if payload.thread_id is None else None
+    if key is not None and payload.use_cache:
+        source = await find_cached_answer(session, payload.question, get_settings())
+        if source is not None:
+            cached = await create_cached_query(
+                session, payload.question, source, question_key=key, latency_seconds=time() - start
+            )
+            await session.commit()
+            observe_request(start, status="cached")
+            return _to_detail(cached, await get_raw_result(session, cached.id))
+
+    if async_mode:
+        return await _enqueue_query(payload, response, session, question_key=key)
+
+    record = await create_query(session, payload.question, payload.thread_id, question_key=key)
     await session.commit()
 
     try:
-        result = await runner.run_query(payload.question, thread_id=payload.thread_id)
-        response_text = _extract_text(result)
-        sanitized_result = _sanitize_result(result)
-        thread_id = sanitized_result.get("config", {}).get("thread_id") if isinstance(sanitized_result, dict) else payload.thread_id
-        updated = await update_query(
-            session,
-            record,
-            status=QueryStatus.SUCCESS,
-            response_text=response_text,
-            raw_result=sanitized_result,
-            latency_seconds=time() - start,
-            thread_id=thread_id,
+        updated = await execute_query(session, runner, record, start=start)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail="Agent execution failed") from exc
+    return _to_detail(updated, await get_raw_result(session, updated.id))
+
+
+async def _enqueue_query(
+    payload: QueryCreate,
+    response: Response,
+    session: AsyncSession,
+    *,
+    question_key: str | None,
+) -> QueryDetail:
+    pool = get_job_pool()
+    record = await create_query(
+        session,
+        payload.question,
+        payload.thread_id,
+        status=QueryStatus.PENDING,
+        question_key=question_key,
+    )
+    await session.commit()
+    # Open the event channel now so stream subscribers do not miss the start of the run.
+    get_event_broker().open(record.id)
+    try:
+        pool.submit(QueryJob(query_id=record.id))
+    except JobQueueFullError as exc:
+        get_event_broker().close(record.id)
+        failed = await update_query(
+            session, record, status=QueryStatus.FAILED, error_message=str(exc)
         )
         await session.commit()
-        await session.refresh(updated)
-        observe_request(start, status="success")
-        return _to_detail(updated)
-    except Exception as exc:  # noqa: BLE001
-        await session.rollback()
-        refreshed = await get_query(session, record.id)
-        target = refreshed or record
-        failed_record = await update_query(
-            session,
-            target,
-            status=QueryStatus.FAILED,
-            error_message=str(exc),
-            latency_seconds=time() - start,
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Query queue is full (query {failed.id} marked as failed)",
+        ) from exc
+    response.status_code = status.HTTP_202_ACCEPTED
+    await session.refresh(record)
+    return _to_detail(record)
+
+
+@router.post("/batch", response_model=QueryBatch, status_code=status.HTTP_202_ACCEPTED)
+async def create_batch_endpoint(
+    payload: QueryBatchCreate, session: AsyncSession = Depends(get_session)
+) -> QueryBatch:
+    """Queue several standalone questions under one batch id.
+
+    Every question gets its own record. Cached answers are stored right away;
+    the other items go to the background job pool as a whole or not at all, and
+    run at most ``JOB_CONCURRENCY`` at a time on the shared agent runner (one
+    MCP session pool, one schema catalog).
+    """
+    settings = get_settings()
+    if len(payload.questions) > settings.batch_max_questions:
+        raise HTTPException(
+            status_code=422,
+            detail=f"A batch holds at most {settings.batch_max_questions} questions",
         )
+    pool = get_job_pool()
+    start = time()
+    batch_id = str(uuid4())
+    queued = []
+    for question in payload.questions:
+        key = question_key(question)
+        source = await find_cached_answer(session, question, settings) if payload.use_cache else None
+        if source is not None:
+            await create_cached_query(
+                session,
+                question,
+                source,
+                question_key=key,
+                latency_seconds=time() - start,
+                batch_id=batch_id,
+            )
+            observe_request(start, status="cached")
+            continue
+        queued.append(
+            await create_query(
+                session,
+                question,
+                None,
+                status=QueryStatus.PENDING,
+                question_key=key,
+                batch_id=batch_id,
+            )
+        )
+    await session.commit()
+
+    broker = get_event_broker()
+    for record in queued:
+        broker.open(record.id)
+    try:
+        pool.submit_many([QueryJob(query_id=record.id) for record in queued])
+    except JobQueueFullError as exc:
+        for record in queued:
+            broker.close(record.id)
+            await update_query(session, record, status=QueryStatus.FAILED, error_message=str(exc))
         await session.commit()
-        await session.refresh(failed_record)
-        observe_request(start, status="error")
-        raise HTTPException(status_code=500, detail="Agent execution failed") from exc
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Query queue is full (batch {batch_id} marked as failed)",
+        ) from exc
+    return _to_batch(batch_id, await list_batch(session, batch_id))
+
+
+@router.get("/batch/{batch_id}", response_model=QueryBatch)
+async def get_batch_endpoint(batch_id: str, session: AsyncSession = Depends(get_session)) -> QueryBatch:
+    records = await list_batch(session, batch_id)
+    if not records:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return _to_batch(batch_id, records)
+
+
+@router.get("/batch/{batch_id}/stream")
+async def stream_batch_endpoint(
+    batch_id: str, session: AsyncSession = Depends(get_session)
+) -> StreamingResponse:
+    if not await list_batch(session, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return StreamingResponse(
+        _stream_batch(batch_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_batch(batch_id: str) -> AsyncIterator[str]:
+    """Emit an ``item`` event as each query of the batch settles, then ``end``.
+
+    Items may run in any worker process, so the batch is polled from the database.
+    """
+    session_factory = await get_session_factory()
+    poll_seconds = get_settings().stream_poll_seconds
+    sent: set[str] = set()
+    while True:
+        async with session_factory() as session:
+            records = await list_batch(session, batch_id)
+        for record in records:
+            if record.id not in sent and record.status in _TERMINAL_STATUSES:
+                sent.add(record.id)
+                yield format_sse("item", _to_detail(record).model_dump(mode="json"))
+        if len(sent) == len(records):
+            break
+        await asyncio.sleep(poll_seconds)
+    yield format_sse("end", _to_batch(batch_id, records).model_dump(mode="json"))
 
 
 @router.get("/{query_id}", response_model=QueryDetail)
@@ -97,47 +243,102 @@ async def get_query_endpoint(query_id: str, session: AsyncSession = Depends(get_
     record = await get_query(session, query_id)
     if record is None:
         raise HTTPException(status_code=404, detail="Query not found")
-    return _to_detail(record)
+    return _to_detail(record, await get_raw_result(session, query_id))
+
+
+@router.get("/{query_id}/stream")
+async def stream_query_endpoint(
+    query_id: str, session: AsyncSession = Depends(get_session)
+) -> StreamingResponse:
+    record = await get_query(session, query_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Query not found")
+    return StreamingResponse(
+        _stream_events(query_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_events(query_id: str) -> AsyncIterator[str]:
+    """Relay live agent events, then finish with the persisted record.
+
+    When the run is not visible in this process (queued elsewhere or executed by
+    another worker) the record status is polled until it settles.
+    """
+    broker = get_event_broker()
+    session_factory = await get_session_factory()
+    poll_seconds = get_settings().stream_poll_seconds
+    last_status: str | None = None
+    while True:
+        subscription = broker.subscribe(query_id)
+        if subscription is not None:
+            async for event in subscription:
+                yield format_sse(event["event"], event["data"])
+            break
+        async with session_factory() as session:
+            record = await get_query(session, query_id)
+        if record is None:
+            break
+        if record.status != last_status:
+            last_status = record.status
+            yield format_sse("status", {"status": record.status})
+        if record.status in _TERMINAL_STATUSES:
+            break
+        await asyncio.sleep(poll_seconds)
+
+    async with session_factory() as session:
+        record = await get_query(session, query_id)
+        raw_result = await get_raw_result(session, query_id) if record is not None else None
+    if record is not None:
+        yield format_sse("end", _to_detail(record, raw_result).model_dump(mode="json"))
 
 
 @router.get("", response_model=QueryList)
 async def list_queries_endpoint(
-    limit: int = 20,
-    offset: int = 0,
+    limit: int = Query(20, ge=1, le=200),
+    cursor: str | None = Query(None, description="Opaque cursor returned as next_cursor"),
+    offset: int = Query(0, ge=0, description="Deprecated: use cursor instead"),
+    status_filter: QueryStatusFilter | None = Query(None, alias="status"),
+    thread_id: str | None = None,
     session: AsyncSession = Depends(get_session),
 ) -> QueryList:
-    records = await list_queries(session, limit=limit, offset=offset)
-    total = await count_queries(session)
+    status_value = QueryStatus(status_filter.value) if status_filter else None
+    before = _decode_cursor(cursor) if cursor else None
+    records = await list_queries(
+        session,
+        limit=limit + 1,
+        offset=0 if before else offset,
+        before=before,
+        status=status_value,
+        thread_id=thread_id,
+    )
+    page = list(records[:limit])
+    next_cursor = _encode_cursor(page[-1]) if len(records) > limit else None
+    total = await cached_count_queries(
+        session,
+        ttl_seconds=get_settings().query_count_cache_seconds,
+        status=status_value,
+        thread_id=thread_id,
+    )
     return QueryList(
-        items=[_to_response(record) for record in records],
+        items=[_to_response(record) for record in page],
         count=total,
+        next_cursor=next_cursor,
     )
 
 
-def _extract_text(result) -> str | None:
-    if isinstance(result, dict):
-        messages = result.get("messages") or []
-        if messages:
-            final = messages[-1]
-            content = getattr(final, "content", None)
-            if isinstance(content, str):
-                return content
-            if isinstance(content, list):
-                return "\n".join(
-                    part.get("text", "") if isinstance(part, dict) else str(part) for part in content
-                ).strip() or None
-        return result.get("answer")
-    return str(result) if result is not None else None
-
-
-def _sanitize_result(result):
-    if isinstance(result, dict):
-        return {key: _sanitize_result(value) for key, value in result.items()}
-    if isinstance(result, list):
-        return [_sanitize_result(item) for item in result]
-    if isinstance(result, BaseMessage):
-        return result.model_dump()
-    return result
+def _encode_cursor(record) -> str:
+    raw = json.dumps([record.created_at.isoformat(), record.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(record_id)
+    except (binascii.Error, ValueError, TypeError, UnicodeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
 
 
 def _to_response(record) -> QueryResponse:
@@ -150,13 +351,42 @@ def _to_response(record) -> QueryResponse:
         created_at=record.created_at,
         updated_at=record.updated_at,
         latency_seconds=record.latency_seconds,
+        cached_from_id=record.cached_from_id,
+        batch_id=record.batch_id,
     )
 
 
-def _to_detail(record) -> QueryDetail:
+def _to_batch(batch_id: str, records) -> QueryBatch:
+    counts = Counter(record.status for record in records)
+    return QueryBatch(
+        batch_id=batch_id,
+        total=len(records),
+        status_counts=dict(counts),
+        done=all(record.status in _TERMINAL_STATUSES for record in records),
+        items=[_to_response(record) for record in records],
+    )
+
+
+def _to_detail(record, raw_result=None) -> QueryDetail:
     base = _to_response(record)
     return QueryDetail(
         **base.model_dump(),
-        raw_result=record.raw_result,
+        raw_result=raw_result,
         error_message=record.error_message,
+        timings=record.timings,
+        usage=_to_usage(record),
+    )
+
+
+def _to_usage(record) -> QueryUsage | None:
+    if record.llm_calls is None:
+        return None
+    return QueryUsage(
+        model=record.model,
+        prompt_tokens=record.prompt_tokens,
+        completion_tokens=record.completion_tokens,
+        cached_tokens=record.cached_tokens,
+        llm_calls=record.llm_calls,
+        iterations=record.agent_iterations,
+        cost_usd=record.cost_usd,
     )
@@ -26,3 +26,10 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     assert _session_factory is not None
     async with _session_factory() as session:
         yield session
+
+
+async def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    if _session_factory is None:
+        await get_engine()
+    assert _session_factory is not None
+    return _session_factory
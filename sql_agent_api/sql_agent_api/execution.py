@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from time import time
+
+from langchain_core.messages import BaseMessage
+from opentelemetry import trace
+from sqlalchemy.ext.asyncio import AsyncSession
+from sql_agent_llm.config import Settings as AgentSettings
+from sql_agent_llm.runner import AgentRunner
+
+from .agent_env import apply_agent_environment
+from .config import get_settings
+from .metrics import observe_request
+from .models import QueryRecord, QueryStatus
+from .repository import get_query, save_raw_result, update_query
+from .streaming import get_event_broker
+
+tracer = trace.get_tracer("sql_agent_api")
+
+
+@lru_cache(maxsize=1)
+def _runner_factory() -> AgentRunner:
+    settings = get_settings()
+    agent_settings = AgentSettings(
+        _env_file=None,
+        OPENAI_API_KEY=settings.openai_api_key,
+        OPENAI_MODEL=settings.openai_model,
+        OPENAI_API_BASE=settings.openai_api_base,
+        MCP_SERVER_URL=str(settings.mcp_server_url),
+        MCP_SSE_PATH=settings.mcp_sse_path,
+        MCP_POOL_SIZE=settings.mcp_pool_size,
+        MCP_POOL_HEALTH_CHECK_SECONDS=settings.mcp_pool_health_check_seconds,
+        MCP_POOL_CONNECT_RETRIES=settings.mcp_pool_connect_retries,
+        MCP_PING_TIMEOUT_SECONDS=settings.mcp_ping_timeout_seconds,
+        MCP_REQUEST_TIMEOUT_SECONDS=settings.mcp_request_timeout_seconds,
+        MCP_TOOL_CONCURRENCY=settings.mcp_tool_concurrency,
+        CHECKPOINTER_BACKEND=settings.checkpointer_backend,
+        CHECKPOINTER_URL=settings.agent_checkpointer_url,
+        CHECKPOINTER_POOL_SIZE=settings.checkpointer_pool_size,
+        HISTORY_MAX_MESSAGES=settings.history_max_messages,
+        HISTORY_SUMMARY_MAX_CHARS=settings.history_summary_max_chars,
+        SCHEMA_PRELOAD=settings.schema_preload,
+        SCHEMA_PRELOAD_TTL_SECONDS=settings.schema_preload_ttl_seconds,
+        SCHEMA_PRELOAD_DATABASES=settings.schema_preload_databases,
+        SCHEMA_PRELOAD_CATALOG_MAX_TABLES=settings.schema_preload_catalog_max_tables,
+        SCHEMA_PRELOAD_MAX_TABLES=settings.schema_preload_max_tables,
+        SCHEMA_PRELOAD_MAX_CHARS=settings.schema_preload_max_chars,
+        AGENT_MAX_ITERATIONS=settings.agent_max_iterations,
+        AGENT_TIMEOUT_SECONDS=settings.agent_timeout_seconds,
+        AGENT_MAX_TOKENS=settings.agent_max_tokens,
+        AGENT_MAX_SQL_ROWS=settings.agent_max_sql_rows,
+        TOOL_OUTPUT_MAX_TOKENS=settings.tool_output_max_tokens,
+        TOOL_OUTPUT_TOKEN_BUDGETS=settings.tool_output_token_budgets,
+        TOOL_OUTPUT_MAX_STRING_CHARS=settings.tool_output_max_string_chars,
+        LLM_PRICING=settings.llm_pricing,
+        TRACING_EXPORTER=settings.tracing_exporter,
+        TRACING_OTLP_ENDPOINT=settings.tracing_otlp_endpoint,
+        TRACING_FILE=settings.tracing_file,
+        TRACING_SERVICE_NAME="sql-agent-api",
+        LOG_LEVEL=settings.log_level,
+        LOG_JSON=settings.log_json,
+        METRICS_HOST=settings.metrics_host,
+        METRICS_PORT=settings.metrics_port + 1,
+        LANGSMITH_API_KEY=settings.langsmith_api_key,
+        LANGSMITH_PROJECT=settings.langsmith_project,
+        LANGSMITH_ENDPOINT=settings.langsmith_endpoint,
+    )
+    apply_agent_environment(agent_settings)
+    return AgentRunner(settings=agent_settings)
+
+
+async def get_agent_runner() -> AgentRunner:
+    return _runner_factory()
+
+
+async def shutdown_agent_runner() -> None:
+    if _runner_factory.cache_info().currsize:
+        await _runner_factory().aclose()
+
+
+async def execute_query(
+    session: AsyncSession,
+    runner: AgentRunner,
+    record: QueryRecord,
+    *,
+    start: float,
+    queued_seconds: float | None = None,
+) -> QueryRecord:
+    """Run the agent for ``record`` and persist the outcome.
+
+    Progress events are relayed to the event broker while the agent runs. The
+    record ends up SUCCESS, FAILED, or BUDGET_EXCEEDED when a hard limit stopped
+    the agent with a partial answer; agent errors are re-raised after the failure
+    has been committed. The whole run is traced under a ``query`` span and its
+    per-phase timings are stored on the record.
+    """
+    record_id = record.id
+    broker = get_event_broker()
+    broker.open(record_id)
+    with tracer.start_as_current_span(
+        "query", attributes={"query.id": record_id, "query.thread_id": record.thread_id or ""}
+    ):
+        try:
+            result = None
+            async for event in runner.stream_query(record.question, thread_id=record.thread_id):
+                if event["event"] == "result":
+                    result = event["data"]
+                else:
+                    broker.publish(record_id, event)
+            timings = _run_timings(result, queued_seconds)
+            usage = result.pop("usage", None) if isinstance(result, dict) else None
+            budget = result.pop("budget_exceeded", None) if isinstance(result, dict) else None
+            response_text = extract_text(result)
+            sanitized_result = sanitize_result(result)
+            thread_id = sanitized_result.get("config", {}).get("thread_id") if isinstance(sanitized_result, dict) else record.thread_id
+            updated = await update_query(
+                session,
+                record,
+                status=QueryStatus.BUDGET_EXCEEDED if budget else QueryStatus.SUCCESS,
+                response_text=response_text,
+                error_message=budget["detail"] if budget else None,
+                latency_seconds=time() - start,
+                thread_id=thread_id,
+                timings=timings,
+                usage=usage,
+            )
+            await save_raw_result(
+                session,
+                record_id,
+                sanitized_result,
+                encoding=get_settings().raw_result_compression,
+            )
+            await session.commit()
+            await session.refresh(updated)
+            observe_request(start, status="budget_exceeded" if budget else "success")
+            return updated
+        except Exception as exc:  # noqa: BLE001
+            await session.rollback()
+            refreshed = await get_query(session, record_id)
+            target = refreshed or record
+            failed_record = await update_query(
+                session,
+                target,
+                status=QueryStatus.FAILED,
+                error_message=str(exc),
+                latency_seconds=time() - start,
+            )
+            await session.commit()
+            await session.refresh(failed_record)
+            observe_request(start, status="error")
+            raise
+        finally:
+            broker.close(record_id)
+
+
+def _run_timings(result, queued_seconds: float | None) -> dict | None:
+    # The agent reports its phases next to the final state; keep them out of raw_result.
+    timings = result.pop("timings", None) if isinstance(result, dict) else None
+    if timings is not None and queued_seconds is not None:
+        timings["phases"]["queue_wait"] = {"seconds": round(queued_seconds, 4), "count": 1}
+    return timings
+
+
+def extract_text(result) -> str | None:
+    if isinstance(result, dict):
+        messages = result.get("messages") or []
+        if messages:
+            final = messages[-1]
+            content = getattr(final, "content", None)
+            if isinstance(content, str):
+                return content
+            if isinstance(content, list):
+                return "\n".join(
+                    part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+                ).strip() or None
+        return result.get("answer")
+    return str(result) if result is not None else None
+
+
+def sanitize_result(result):
+    if isinstance(result, dict):
+        return {key: sanitize_result(value) for key, value in result.items()}
+    if isinstance(result, list):
+        return [sanitize_result(item) for item in result]
+    if isinstance(result, BaseMessage):
+        return result.model_dump()
+    return result
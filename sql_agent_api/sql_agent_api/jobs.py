@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+from dataclasses import dataclass, field
+from time import time
+from typing import Awaitable, Callable, Sequence
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sql_agent_llm.runner import AgentRunner
+
+from .config import Settings
+from .database import get_session_factory
+from .execution import execute_query, get_agent_runner
+from .metrics import observe_job_wait, record_job_rejected, set_job_limits, set_job_state
+from .models import QueryStatus
+from .repository import fail_unfinished_queries, get_query, update_query
+
+logger = structlog.get_logger(__name__)
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the asynchronous job queue cannot accept more work."""
+
+
+@dataclass
+class QueryJob:
+    query_id: str
+    enqueued_at: float = field(default_factory=time)
+
+
+class QueryJobPool:
+    """Bounded in-process worker pool running agent queries in the background.
+
+    Records move PENDING -> RUNNING -> SUCCESS/FAILED/BUDGET_EXCEEDED. Jobs running or still
+    queued when the pool stops are marked FAILED.
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int,
+        max_queue_size: int,
+        session_factory: async_sessionmaker[AsyncSession],
+        runner_factory: Callable[[], Awaitable[AgentRunner]],
+    ) -> None:
+        self._concurrency = concurrency
+        self._queue: asyncio.Queue[QueryJob] = asyncio.Queue(maxsize=max_queue_size)
+        self._session_factory = session_factory
+        self._runner_factory = runner_factory
+        self._workers: list[asyncio.Task[None]] = []
+        self._running = 0
+        self._active: set[str] = set()
+        set_job_limits(concurrency=concurrency, queue_size=max_queue_size)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"query-job-worker-{index}")
+            for index in range(self._concurrency)
+        ]
+        logger.info("job_pool_started", concurrency=self._concurrency, queue_size=self._queue.maxsize)
+
+    async def stop(self) -> None:
+        interrupted = list(self._active)
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+        abandoned: list[str] = []
+        while not self._queue.empty():
+            abandoned.append(self._queue.get_nowait().query_id)
+            self._queue.task_done()
+        self._report()
+        ids = interrupted + abandoned
+        if ids:
+            async with self._session_factory() as session:
+                await fail_unfinished_queries(session, "Interrupted by API shutdown", ids)
+                await session.commit()
+        logger.info("job_pool_stopped", interrupted=len(interrupted), abandoned=len(abandoned))
+
+    def submit(self, job: QueryJob) -> None:
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull as exc:
+            record_job_rejected()
+            raise JobQueueFullError("Query job queue is full") from exc
+        self._report()
+
+    def submit_many(self, jobs: Sequence[QueryJob]) -> None:
+        """Queue all ``jobs`` or, when the queue lacks room for them, none."""
+        free = self._queue.maxsize - self._queue.qsize()
+        if len(jobs) > free:
+            record_job_rejected()
+            raise JobQueueFullError(f"Query job queue has room for {free} of {len(jobs)} jobs")
+        for job in jobs:
+            self._queue.put_nowait(job)
+        self._report()
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            self._active.add(job.query_id)
+            self._report()
+            try:
+                await self._process(job)
+            except Exception as exc:  # noqa: BLE001 - keep the worker alive
+                logger.error("job_failed", query_id=job.query_id, worker=index, error=str(exc))
+            finally:
+                self._running -= 1
+                self._active.discard(job.query_id)
+                self._queue.task_done()
+                self._report()
+
+    async def _process(self, job: QueryJob) -> None:
+        observe_job_wait(job.enqueued_at)
+        queued_seconds = time() - job.enqueued_at
+        runner = await self._runner_factory()
+        async with self._session_factory() as session:
+            record = await get_query(session, job.query_id)
+            if record is None:
+                logger.warning("job_record_missing", query_id=job.query_id)
+                return
+            record = await update_query(
+                session,
+                record,
+                status=QueryStatus.RUNNING,
+                thread_id=record.thread_id,
+            )
+            await session.commit()
+            await execute_query(
+                session, runner, record, start=time(), queued_seconds=queued_seconds
+            )
+
+    def _report(self) -> None:
+        set_job_state(queued=self._queue.qsize(), running=self._running)
+
+
+_pool: QueryJobPool | None = None
+
+
+async def start_job_pool(settings: Settings) -> QueryJobPool:
+    global _pool
+    if _pool is None:
+        session_factory = await get_session_factory()
+        if settings.job_startup_sweep:
+            await sweep_stale_jobs(session_factory)
+        _pool = QueryJobPool(
+            concurrency=settings.job_concurrency,
+            max_queue_size=settings.job_queue_max_size,
+            session_factory=session_factory,
+            runner_factory=get_agent_runner,
+        )
+        _pool.start()
+    return _pool
+
+
+async def sweep_stale_jobs(session_factory: async_sessionmaker[AsyncSession]) -> int:
+    """Fail the PENDING/RUNNING records a previous process left behind."""
+    async with session_factory() as session:
+        swept = await fail_unfinished_queries(
+            session, "Interrupted: the API restarted before it finished"
+        )
+        await session.commit()
+    if swept:
+        logger.warning("job_stale_records_failed", count=swept)
+    return swept
+
+
+async def stop_job_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.stop()
+        _pool = None
+
+
+def get_job_pool() -> QueryJobPool:
+    if _pool is None:
+        raise RuntimeError("Query job pool is not running")
+    return _pool
@@ -7,9 +7,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from .api.exports import router as exports_router
 from .api.queries import router as queries_router
 from .config import Settings, get_settings
 from .database import get_engine, get_session
+from .execution import shutdown_agent_runner
+from .jobs import start_job_pool, stop_job_pool
 from .logging_config import configure_logging
 from .metrics import launch_metrics_server
 from .models import Base
@@ -33,6 +36,13 @@ async def on_startup() -> None:
     engine = await get_engine(settings)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    await start_job_pool(settings)
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await stop_job_pool()
+    await shutdown_agent_runner()
 
 
 @app.get("/health")
@@ -42,6 +52,7 @@ async def healthcheck(session: AsyncSession = Depends(get_session)) -> dict[str,
 
 
 app.include_router(queries_router)
+app.include_router(exports_router)
 
 
 @app.get("/")
@@ -4,7 +4,7 @@ import threading
 from time import time
 
 import structlog
-from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 
 from .config import Settings
 
@@ -19,6 +19,32 @@ _LATENCY = Histogram(
     "sql_agent_api_request_latency_seconds",
     "Latency of agent executions",
 )
+_JOB_QUEUE_DEPTH = Gauge(
+    "sql_agent_api_job_queue_depth",
+    "Asynchronous query jobs waiting for a worker",
+)
+_JOB_RUNNING = Gauge(
+    "sql_agent_api_jobs_running",
+    "Asynchronous query jobs currently executing",
+)
+_JOB_LIMITS = Gauge(
+    "sql_agent_api_job_limits",
+    "Configured limits of the asynchronous job pool",
+    labelnames=("limit",),
+)
+_JOB_REJECTED = Counter(
+    "sql_agent_api_jobs_rejected_total",
+    "Asynchronous query jobs rejected because the queue was full",
+)
+_JOB_QUEUE_WAIT = Histogram(
+    "sql_agent_api_job_queue_wait_seconds",
+    "Time asynchronous query jobs spend queued before a worker picks them up",
+)
+_ANSWER_CACHE = Counter(
+    "sql_agent_api_answer_cache_requests_total",
+    "Answer cache lookups grouped by result",
+    labelnames=("result",),
+)
 
 _metrics_started = False
 _metrics_lock = threading.Lock()
@@ -42,3 +68,25 @@ def observe_request(start_time: float, *, status: str) -> None:
     duration = time() - start_time
     _LATENCY.observe(duration)
     _REQUEST_COUNTER.labels(status=status).inc()
+
+
+def set_job_limits(*, concurrency: int, queue_size: int) -> None:
+    _JOB_LIMITS.labels(limit="concurrency").set(concurrency)
+    _JOB_LIMITS.labels(limit="queue_size").set(queue_size)
+
+
+def set_job_state(*, queued: int, running: int) -> None:
+    _JOB_QUEUE_DEPTH.set(queued)
+    _JOB_RUNNING.set(running)
+
+
+def record_job_rejected() -> None:
+    _JOB_REJECTED.inc()
+
+
+def observe_job_wait(start_time: float) -> None:
+    _JOB_QUEUE_WAIT.observe(time() - start_time)
+
+
+def record_answer_cache(*, hit: bool) -> None:
+    _ANSWER_CACHE.labels(result="hit" if hit else "miss").inc()
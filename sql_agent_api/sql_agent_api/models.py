@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import JSON, String
+from sqlalchemy import JSON, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -17,18 +17,56 @@ class QueryStatus(str, Enum):
     RUNNING = "running"
     SUCCESS = "success"
     FAILED = "failed"
+    BUDGET_EXCEEDED = "budget_exceeded"
 
 
 class QueryRecord(Base):
     __tablename__ = "query_records"
+    # Keyset pagination walks (created_at, id) backwards, optionally within a status or thread.
+    __table_args__ = (
+        Index("ix_query_records_created_at_id", "created_at", "id"),
+        Index("ix_query_records_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_query_records_thread_created_at_id", "thread_id", "created_at", "id"),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     thread_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
     question: Mapped[str] = mapped_column(String(2000))
+    # Hash of the normalized question; only set for questions asked outside a thread.
+    question_key: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    # Record whose answer was reused when the answer cache served this question.
+    cached_from_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("query_records.id"), nullable=True
+    )
+    # Set on every record submitted through POST /queries/batch.
+    batch_id: Mapped[str | None] = mapped_column(String(36), nullable=True, index=True)
     status: Mapped[QueryStatus] = mapped_column(String(20), default=QueryStatus.PENDING.value)
     response_text: Mapped[str | None] = mapped_column(String(8000), nullable=True)
-    raw_result: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
     error_message: Mapped[str | None] = mapped_column(String(4000), nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
     latency_seconds: Mapped[float | None] = mapped_column(nullable=True)
+    # Seconds and call counts per phase of the run (queue, llm, mcp, tool, db...).
+    timings: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    # Token usage of the agent run; prompt_tokens includes cached_tokens.
+    model: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    prompt_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    completion_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    cached_tokens: Mapped[int | None] = mapped_column(nullable=True)
+    llm_calls: Mapped[int | None] = mapped_column(nullable=True)
+    agent_iterations: Mapped[int | None] = mapped_column(nullable=True)
+    cost_usd: Mapped[float | None] = mapped_column(nullable=True)
+
+
+class QueryResult(Base):
+    """Raw agent state of a query, kept apart so listings never read it."""
+
+    __tablename__ = "query_results"
+
+    query_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("query_records.id", ondelete="CASCADE"), primary_key=True
+    )
+    # "identity", "gzip" or "zstd": how ``payload`` (UTF-8 JSON) is compressed.
+    encoding: Mapped[str] = mapped_column(String(16))
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+    size_bytes: Mapped[int] = mapped_column(Integer)
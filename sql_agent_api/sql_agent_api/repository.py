@@ -1,20 +1,49 @@
 from __future__ import annotations
 
-from typing import Sequence
+import asyncio
+from datetime import datetime
+from time import monotonic
+from typing import Any, Sequence
 from uuid import uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 
-from .models import QueryRecord, QueryStatus
+from .models import QueryRecord, QueryResult, QueryStatus
+from .result_codec import ResultEncoding, decode_result, encode_result
 
+# Columns rendered by GET /queries; everything else stays unread.
+_LISTED_COLUMNS = (
+    QueryRecord.id,
+    QueryRecord.thread_id,
+    QueryRecord.question,
+    QueryRecord.cached_from_id,
+    QueryRecord.batch_id,
+    QueryRecord.status,
+    QueryRecord.response_text,
+    QueryRecord.created_at,
+    QueryRecord.updated_at,
+    QueryRecord.latency_seconds,
+)
 
-async def create_query(session: AsyncSession, question: str, thread_id: str | None) -> QueryRecord:
+
+async def create_query(
+    session: AsyncSession,
+    question: str,
+    thread_id: str | None,
+    *,
+    status: QueryStatus = QueryStatus.RUNNING,
+    question_key: str | None = None,
+    batch_id: str | None = None,
+) -> QueryRecord:
     record = QueryRecord(
         id=str(uuid4()),
         question=question,
         thread_id=thread_id,
-        status=QueryStatus.RUNNING.value,
+        status=status.value,
+        question_key=question_key,
+        batch_id=batch_id,
     )
     session.add(record)
     await session.flush()
@@ -27,38 +56,233 @@ async def update_query(
     *,
     status: QueryStatus,
     response_text: str | None = None,
-    raw_result: dict | None = None,
     error_message: str | None = None,
     latency_seconds: float | None = None,
     thread_id: str | None = None,
+    timings: dict[str, Any] | None = None,
+    usage: dict[str, Any] | None = None,
 ) -> QueryRecord:
     record.status = status.value
     record.response_text = response_text
-    record.raw_result = raw_result
     record.error_message = error_message
     record.latency_seconds = latency_seconds
+    record.timings = timings
+    if usage is not None:
+        record.model = usage.get("model")
+        record.prompt_tokens = usage.get("prompt_tokens")
+        record.completion_tokens = usage.get("completion_tokens")
+        record.cached_tokens = usage.get("cached_tokens")
+        record.llm_calls = usage.get("llm_calls")
+        record.agent_iterations = usage.get("iterations")
+        record.cost_usd = usage.get("cost_usd")
     if thread_id:
         record.thread_id = thread_id
     await session.flush()
     return record
 
 
+async def fail_unfinished_queries(
+    session: AsyncSession, error_message: str, ids: Sequence[str] | None = None
+) -> int:
+    """Mark PENDING/RUNNING records (all, or those in ``ids``) FAILED; returns how many."""
+    stmt = (
+        update(QueryRecord)
+        .where(QueryRecord.status.in_([QueryStatus.PENDING.value, QueryStatus.RUNNING.value]))
+        .values(
+            status=QueryStatus.FAILED.value,
+            error_message=error_message,
+            updated_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if ids is not None:
+        stmt = stmt.where(QueryRecord.id.in_(ids))
+    result = await session.execute(stmt)
+    return result.rowcount
+
+
+async def create_cached_query(
+    session: AsyncSession,
+    question: str,
+    source: QueryRecord,
+    *,
+    question_key: str,
+    latency_seconds: float,
+    batch_id: str | None = None,
+) -> QueryRecord:
+    record = QueryRecord(
+        id=str(uuid4()),
+        question=question,
+        status=QueryStatus.SUCCESS.value,
+        question_key=question_key,
+        cached_from_id=source.id,
+        batch_id=batch_id,
+        response_text=source.response_text,
+        latency_seconds=latency_seconds,
+    )
+    session.add(record)
+    await session.flush()
+    stored = await session.get(QueryResult, source.id)
+    if stored is not None:
+        # Share the already compressed payload instead of decoding it.
+        session.add(
+            QueryResult(
+                query_id=record.id,
+                encoding=stored.encoding,
+                payload=stored.payload,
+                size_bytes=stored.size_bytes,
+            )
+        )
+        await session.flush()
+    return record
+
+
+async def save_raw_result(
+    session: AsyncSession, query_id: str, result: Any, *, encoding: ResultEncoding
+) -> int:
+    """Store ``result`` compressed in ``query_results``; returns the stored payload size."""
+    payload, size_bytes = await asyncio.to_thread(encode_result, result, encoding)
+    await session.merge(
+        QueryResult(query_id=query_id, encoding=encoding, payload=payload, size_bytes=size_bytes)
+    )
+    await session.flush()
+    return len(payload)
+
+
+async def get_raw_result(session: AsyncSession, query_id: str) -> Any | None:
+    stored = await session.get(QueryResult, query_id)
+    if stored is None:
+        return None
+    return await asyncio.to_thread(decode_result, stored.payload, stored.encoding)
+
+
+def _answer_sources(since: datetime):
+    return select(QueryRecord).where(
+        QueryRecord.status == QueryStatus.SUCCESS.value,
+        QueryRecord.question_key.is_not(None),
+        QueryRecord.cached_from_id.is_(None),
+        QueryRecord.updated_at >= since,
+    )
+
+
+async def find_answer_by_key(
+    session: AsyncSession, question_key: str, *, since: datetime
+) -> QueryRecord | None:
+    stmt = (
+        _answer_sources(since)
+        .where(QueryRecord.question_key == question_key)
+        .order_by(QueryRecord.updated_at.desc())
+        .limit(1)
+    )
+    result = await session.execute(stmt)
+    return result.scalars().first()
+
+
+async def list_answer_candidates(
+    session: AsyncSession, *, since: datetime, limit: int
+) -> Sequence[QueryRecord]:
+    stmt = _answer_sources(since).order_by(QueryRecord.updated_at.desc()).limit(limit)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+
 async def get_query(session: AsyncSession, query_id: str) -> QueryRecord | None:
     return await session.get(QueryRecord, query_id)
 
 
-async def list_queries(session: AsyncSession, limit: int = 20, offset: int = 0) -> Sequence[QueryRecord]:
+async def list_queries(
+    session: AsyncSession,
+    limit: int = 20,
+    offset: int = 0,
+    *,
+    before: tuple[datetime, str] | None = None,
+    status: QueryStatus | None = None,
+    thread_id: str | None = None,
+) -> Sequence[QueryRecord]:
+    """Newest records first; ``before`` is the (created_at, id) of the last row already seen."""
+    stmt = _filtered(
+        select(QueryRecord).options(load_only(*_LISTED_COLUMNS, raiseload=True)),
+        status=status,
+        thread_id=thread_id,
+    )
+    if before is not None:
+        stmt = stmt.where(tuple_(QueryRecord.created_at, QueryRecord.id) < tuple_(*before))
+    stmt = stmt.order_by(QueryRecord.created_at.desc(), QueryRecord.id.desc()).limit(limit)
+    if offset:
+        stmt = stmt.offset(offset)
+    result = await session.execute(stmt)
+    return result.scalars().all()
+
+
+async def list_batch(session: AsyncSession, batch_id: str) -> Sequence[QueryRecord]:
+    """Records of a batch, in the order their questions were submitted."""
     stmt = (
         select(QueryRecord)
-        .order_by(QueryRecord.created_at.desc())
-        .offset(offset)
-        .limit(limit)
+        .where(QueryRecord.batch_id == batch_id)
+        .order_by(QueryRecord.created_at, QueryRecord.id)
     )
     result = await session.execute(stmt)
     return result.scalars().all()
 
 
-async def count_queries(session: AsyncSession) -> int:
-    stmt = select(func.count(QueryRecord.id))
+async def count_queries(
+    session: AsyncSession,
+    *,
+    status: QueryStatus | None = None,
+    thread_id: str | None = None,
+) -> int:
+    stmt = _filtered(select(func.count(QueryRecord.id)), status=status, thread_id=thread_id)
     result = await session.execute(stmt)
     return int(result.scalar_one())
+
+
+# One entry per status filter plus the unfiltered total, so the cache stays bounded.
+_count_cache: dict[str | None, tuple[float, int]] = {}
+
+
+async def cached_count_queries(
+    session: AsyncSession,
+    *,
+    ttl_seconds: float,
+    status: QueryStatus | None = None,
+    thread_id: str | None = None,
+) -> int:
+    """Total for a filter, recomputed at most every ``ttl_seconds``.
+
+    The unfiltered total on Postgres comes from the planner statistics instead of
+    a full ``COUNT(*)``, so it is approximate. Thread-filtered totals are small
+    indexed counts and are not cached: one entry per thread would grow forever.
+    """
+    if thread_id is not None:
+        return await count_queries(session, status=status, thread_id=thread_id)
+    key = status.value if status else None
+    cached = _count_cache.get(key)
+    if cached is not None and cached[0] > monotonic():
+        return cached[1]
+    total: int | None = None
+    if status is None:
+        total = await _estimated_count(session)
+    if total is None:
+        total = await count_queries(session, status=status)
+    _count_cache[key] = (monotonic() + ttl_seconds, total)
+    return total
+
+
+async def _estimated_count(session: AsyncSession) -> int | None:
+    if session.bind.dialect.name != "postgresql":
+        return None
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": QueryRecord.__tablename__},
+    )
+    estimate = result.scalar_one_or_none()
+    # reltuples is -1 (or 0) until the table has been analysed.
+    return int(estimate) if estimate and estimate > 0 else None
+
+
+def _filtered(stmt, *, status: QueryStatus | None, thread_id: str | None):
+    if status is not None:
+        stmt = stmt.where(QueryRecord.status == status.value)
+    if thread_id is not None:
+        stmt = stmt.where(QueryRecord.thread_id == thread_id)
+    return stmt
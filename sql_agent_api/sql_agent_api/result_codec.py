@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import gzip
+import json
+from typing import Any, Literal
+
+ResultEncoding = Literal["identity", "gzip", "zstd"]
+
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+
+def encode_result(result: Any, encoding: ResultEncoding) -> tuple[bytes, int]:
+    """Serialize ``result`` to JSON and compress it; returns (payload, uncompressed size)."""
+    raw = json.dumps(result, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=_GZIP_LEVEL), len(raw)
+    if encoding == "zstd":
+        return _zstd().ZstdCompressor(level=_ZSTD_LEVEL).compress(raw), len(raw)
+    return raw, len(raw)
+
+
+def decode_result(payload: bytes, encoding: str) -> Any:
+    if encoding == "gzip":
+        payload = gzip.decompress(payload)
+    elif encoding == "zstd":
+        payload = _zstd().ZstdDecompressor().decompress(payload)
+    elif encoding != "identity":
+        raise ValueError(f"Unknown raw result encoding: {encoding}")
+    return json.loads(payload)
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("zstd raw results require the 'zstd' extra (zstandard)") from exc
+    return zstandard
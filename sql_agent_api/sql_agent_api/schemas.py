@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from enum import Enum
-from typing import Any
+from typing import Annotated, Any
 
 from pydantic import BaseModel, Field
 
@@ -12,11 +12,26 @@ class QueryStatus(str, Enum):
     running = "running"
     success = "success"
     failed = "failed"
+    budget_exceeded = "budget_exceeded"
 
 
 class QueryCreate(BaseModel):
     question: str = Field(..., min_length=3, max_length=2000)
     thread_id: str | None = Field(default=None, description="Optional conversation identifier")
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse a recent answer to the same question instead of running the agent",
+    )
+
+
+class QueryBatchCreate(BaseModel):
+    questions: list[Annotated[str, Field(min_length=3, max_length=2000)]] = Field(
+        ..., min_length=1, description="Standalone questions, each stored as its own query"
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Reuse recent answers to the same questions instead of running the agent",
+    )
 
 
 class QueryResponse(BaseModel):
@@ -28,13 +43,40 @@ class QueryResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     latency_seconds: float | None
+    cached_from_id: str | None = None
+    batch_id: str | None = None
+
+
+class QueryUsage(BaseModel):
+    model: str | None
+    prompt_tokens: int | None = Field(description="Prompt tokens, cached ones included")
+    completion_tokens: int | None
+    cached_tokens: int | None
+    llm_calls: int | None
+    iterations: int | None = Field(description="ReAct iterations: model turns that called tools")
+    cost_usd: float | None = Field(description="Estimated from LLM_PRICING; null when not priced")
 
 
 class QueryDetail(QueryResponse):
     raw_result: dict[str, Any] | None
     error_message: str | None
+    timings: dict[str, Any] | None = Field(
+        default=None, description="Seconds and call counts per phase of the agent run"
+    )
+    usage: QueryUsage | None = None
+
+
+class QueryBatch(BaseModel):
+    batch_id: str
+    total: int
+    status_counts: dict[str, int] = Field(..., description="Number of items per status")
+    done: bool = Field(..., description="True once every item has reached a final status")
+    items: list[QueryResponse] = Field(..., description="Items in submission order")
 
 
 class QueryList(BaseModel):
     items: list[QueryResponse]
-    count: int
+    count: int = Field(..., description="Total matching records, cached and possibly approximate")
+    next_cursor: str | None = Field(
+        default=None, description="Pass as ?cursor= to fetch the next page; null on the last page"
+    )
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from functools import lru_cache
+from typing import Any, AsyncIterator
+
+from .config import get_settings
+
+_CLOSED = None
+
+
+class _Channel:
+    def __init__(self, buffer_size: int) -> None:
+        self.buffer: deque[dict[str, Any]] = deque(maxlen=buffer_size)
+        self.subscribers: list[asyncio.Queue[dict[str, Any] | None]] = []
+
+
+class QueryEventBroker:
+    """In-process fan-out of agent progress events keyed by query id.
+
+    Late subscribers first receive the buffered events of the run. Runs executed by
+    another process are not visible here; callers fall back to polling the record.
+    """
+
+    def __init__(self, buffer_size: int) -> None:
+        self._buffer_size = buffer_size
+        self._channels: dict[str, _Channel] = {}
+
+    def open(self, query_id: str) -> None:
+        self._channels.setdefault(query_id, _Channel(self._buffer_size))
+
+    def publish(self, query_id: str, event: dict[str, Any]) -> None:
+        channel = self._channels.get(query_id)
+        if channel is None:
+            return
+        channel.buffer.append(event)
+        for queue in channel.subscribers:
+            queue.put_nowait(event)
+
+    def close(self, query_id: str) -> None:
+        channel = self._channels.pop(query_id, None)
+        if channel is None:
+            return
+        for queue in channel.subscribers:
+            queue.put_nowait(_CLOSED)
+
+    def subscribe(self, query_id: str) -> AsyncIterator[dict[str, Any]] | None:
+        channel = self._channels.get(query_id)
+        if channel is None:
+            return None
+        queue: asyncio.Queue[dict[str, Any] | None] = asyncio.Queue()
+        for event in channel.buffer:
+            queue.put_nowait(event)
+        channel.subscribers.append(queue)
+        return self._drain(channel, queue)
+
+    async def _drain(
+        self, channel: _Channel, queue: asyncio.Queue[dict[str, Any] | None]
+    ) -> AsyncIterator[dict[str, Any]]:
+        try:
+            while True:
+                event = await queue.get()
+                if event is _CLOSED:
+                    return
+                yield event
+        finally:
+            if queue in channel.subscribers:
+                channel.subscribers.remove(queue)
+
+
+@lru_cache(maxsize=1)
+def get_event_broker() -> QueryEventBroker:
+    return QueryEventBroker(get_settings().stream_buffer_size)
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import pytest
+from sql_agent_llm.config import Settings as AgentSettings
+
+from sql_agent_api import execution
+from sql_agent_api.agent_env import AGENT_ENV_KEYS
+from sql_agent_api.config import Settings
+
+
+def test_agent_env_keys_match_both_settings() -> None:
+    for env_key, attr in AGENT_ENV_KEYS.items():
+        assert Settings.model_fields[attr].alias == env_key
+        assert AgentSettings.model_fields[attr].alias == env_key
+
+
+class _CapturingRunner:
+    def __init__(self, settings: AgentSettings) -> None:
+        self.settings = settings
+
+
+@pytest.fixture
+def runner_factory(monkeypatch: pytest.MonkeyPatch) -> Any:
+    # Keep the agent environment written by the factory out of the other tests.
+    monkeypatch.setattr(os, "environ", dict(os.environ))
+    monkeypatch.setattr(execution, "AgentRunner", _CapturingRunner)
+    execution._runner_factory.cache_clear()
+    yield execution._runner_factory
+    execution._runner_factory.cache_clear()
+
+
+def test_schema_preload_settings_reach_the_agent(
+    runner_factory: Any, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = Settings(
+        _env_file=None,
+        DATABASE_URL="sqlite+aiosqlite:///unused.sqlite",
+        OPENAI_API_KEY="test",
+        MCP_SERVER_URL="http://mcp:8080",
+        SCHEMA_PRELOAD=True,
+        SCHEMA_PRELOAD_DATABASES=["sales", "hr"],
+        SCHEMA_PRELOAD_CATALOG_MAX_TABLES=25,
+    )
+    monkeypatch.setattr(execution, "get_settings", lambda: settings)
+
+    agent_settings = runner_factory().settings
+
+    assert agent_settings.schema_preload is True
+    assert agent_settings.schema_preload_databases == ["sales", "hr"]
+    assert agent_settings.schema_preload_catalog_max_tables == 25
+    assert os.environ["SCHEMA_PRELOAD_CATALOG_MAX_TABLES"] == "25"
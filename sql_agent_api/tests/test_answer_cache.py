@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import pytest
+
+from sql_agent_api.answer_cache import normalize_question, question_key
+
+
+def test_case_accents_and_whitespace_are_normalized() -> None:
+    assert normalize_question("  Quel est le  CHIFFRE d'affaires\tpar RÉGION ?") == (
+        "quel est le chiffre d'affaires par region ?"
+    )
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [
+        ("Orders with total > 100", "Orders with total < 100"),
+        ("Customers with balance -5", "Customers with balance 5"),
+        ("Products priced 1.5", "Products priced 15"),
+        ("Revenue for x²", "Revenue for x2"),
+    ],
+)
+def test_operators_signs_and_decimals_are_kept(first: str, second: str) -> None:
+    assert normalize_question(first) != normalize_question(second)
+    assert question_key(first) != question_key(second)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sql_agent_api.api import exports as exports_module
+from sql_agent_api.config import Settings, get_settings
+
+_EXPORT_ID = "0123456789abcdef0123456789abcdef"
+_SIGNATURE = "ab" * 32
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> tuple[TestClient, list[httpx.Request]]:
+    seen: list[httpx.Request] = []
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b"a\n1\n"
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.params.get("signature") != _SIGNATURE:
+            return httpx.Response(403)
+        # A streamed body, like the MCP server's FileResponse.
+        return httpx.Response(200, content=body(), headers={"content-type": "text/csv"})
+
+    real_client = httpx.AsyncClient
+
+    def fake_client(**kwargs: Any) -> httpx.AsyncClient:
+        return real_client(transport=httpx.MockTransport(upstream), **kwargs)
+
+    monkeypatch.setattr(exports_module.httpx, "AsyncClient", fake_client)
+    app = FastAPI()
+    app.include_router(exports_module.router)
+    settings = Settings(
+        _env_file=None,
+        DATABASE_URL="sqlite+aiosqlite:///unused.sqlite",
+        OPENAI_API_KEY="test",
+        MCP_SERVER_URL="http://mcp:8080",
+    )
+    app.dependency_overrides[get_settings] = lambda: settings
+    return TestClient(app), seen
+
+
+def test_signed_link_is_forwarded(client: tuple[TestClient, list[httpx.Request]]) -> None:
+    test_client, seen = client
+    response = test_client.get(
+        f"/exports/{_EXPORT_ID}", params={"expires": "4102444800", "signature": _SIGNATURE}
+    )
+    assert response.status_code == 200
+    assert response.content == b"a\n1\n"
+    assert seen[0].url.params["expires"] == "4102444800"
+
+
+def test_unsigned_download_is_refused(client: tuple[TestClient, list[httpx.Request]]) -> None:
+    test_client, seen = client
+    assert test_client.get(f"/exports/{_EXPORT_ID}").status_code == 422
+    assert seen == []
+
+
+def test_rejected_signature_is_reported(client: tuple[TestClient, list[httpx.Request]]) -> None:
+    test_client, _ = client
+    response = test_client.get(
+        f"/exports/{_EXPORT_ID}", params={"expires": "4102444800", "signature": "cd" * 32}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from sql_agent_api.jobs import QueryJob, QueryJobPool, sweep_stale_jobs
+from sql_agent_api.models import Base, QueryStatus
+from sql_agent_api.repository import create_query, get_query
+
+
+async def _session_factory(tmp_path: Path) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def _create(factory: async_sessionmaker[AsyncSession], status: QueryStatus) -> str:
+    async with factory() as session:
+        record = await create_query(session, "question", None, status=status)
+        await session.commit()
+        return record.id
+
+
+async def _status(factory: async_sessionmaker[AsyncSession], query_id: str) -> str:
+    async with factory() as session:
+        record = await get_query(session, query_id)
+        assert record is not None
+        return record.status
+
+
+def test_stop_fails_running_and_queued_jobs(tmp_path: Path) -> None:
+    async def scenario() -> list[str]:
+        factory = await _session_factory(tmp_path)
+        started = asyncio.Event()
+
+        async def runner_factory():  # noqa: ANN202 - never returns
+            started.set()
+            await asyncio.sleep(10)
+
+        pool = QueryJobPool(
+            concurrency=1, max_queue_size=10, session_factory=factory, runner_factory=runner_factory
+        )
+        ids = [await _create(factory, QueryStatus.PENDING) for _ in range(3)]
+        pool.submit_many([QueryJob(query_id) for query_id in ids])
+        pool.start()
+        await started.wait()
+        await pool.stop()
+        return [await _status(factory, query_id) for query_id in ids]
+
+    assert asyncio.run(scenario()) == [QueryStatus.FAILED.value] * 3
+
+
+def test_startup_sweep_fails_only_unfinished_records(tmp_path: Path) -> None:
+    async def scenario() -> tuple[int, list[str]]:
+        factory = await _session_factory(tmp_path)
+        statuses = [QueryStatus.PENDING, QueryStatus.RUNNING, QueryStatus.SUCCESS]
+        ids = [await _create(factory, status) for status in statuses]
+        swept = await sweep_stale_jobs(factory)
+        return swept, [await _status(factory, query_id) for query_id in ids]
+
+    swept, statuses = asyncio.run(scenario())
+    assert swept == 2
+    assert statuses == [QueryStatus.FAILED.value, QueryStatus.FAILED.value, QueryStatus.SUCCESS.value]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from sql_agent_api import repository
+from sql_agent_api.models import Base, QueryStatus
+from sql_agent_api.repository import cached_count_queries, create_query
+
+
+async def _session_factory(tmp_path: Path) -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'api.sqlite'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+
+def test_thread_counts_are_not_cached(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(repository, "_count_cache", {})
+
+    async def scenario() -> tuple[list[int], int]:
+        factory = await _session_factory(tmp_path)
+        async with factory() as session:
+            for index in range(50):
+                await create_query(session, "question", f"thread-{index}")
+            await session.commit()
+            totals = [
+                await cached_count_queries(session, ttl_seconds=60, thread_id=f"thread-{index}")
+                for index in range(50)
+            ]
+            all_running = await cached_count_queries(
+                session, ttl_seconds=60, status=QueryStatus.RUNNING
+            )
+            return totals, all_running
+
+    totals, all_running = asyncio.run(scenario())
+    assert totals == [1] * 50
+    assert all_running == 50
+    assert set(repository._count_cache) == {QueryStatus.RUNNING.value}
+
+
+def test_status_totals_are_cached_for_the_ttl(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(repository, "_count_cache", {})
+
+    async def scenario() -> tuple[int, int]:
+        factory = await _session_factory(tmp_path)
+        async with factory() as session:
+            await create_query(session, "question", None)
+            await session.commit()
+            first = await cached_count_queries(session, ttl_seconds=60)
+            await create_query(session, "question", None)
+            await session.commit()
+            return first, await cached_count_queries(session, ttl_seconds=60)
+
+    assert asyncio.run(scenario()) == (1, 1)
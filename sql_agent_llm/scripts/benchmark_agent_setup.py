@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from statistics import mean, median
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+import structlog
+import typer
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from sql_agent_llm.agent import graph as graph_module
+from sql_agent_llm.agent.graph import AgentGraph
+from sql_agent_llm.budget import enforce_budget
+from sql_agent_llm.config import Settings
+from sql_agent_llm.usage import track_usage
+
+app = typer.Typer(help="Measure the per-query agent setup cost")
+
+
+class _ScriptedModel(BaseChatModel):
+    """Asks for one SQL query, then answers; stands in for the OpenAI model."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "_ScriptedModel":
+        return self
+
+    def _generate(self, *args: Any, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(
+        self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any
+    ) -> ChatResult:
+        if isinstance(messages[-1], ToolMessage):
+            message = AIMessage(content="answer")
+        else:
+            call = {"name": "run_sql_query", "args": {"database": "db", "query": "SELECT 1"}, "id": "call-1"}
+            message = AIMessage(content="", tool_calls=[call])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class _StubClient:
+    """Answers every MCP tool call at once with a one-row result."""
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> Any:
+        return {"columns": ["value"], "rows": [{"value": 1}], "row_count": 1, "truncated": False}
+
+
+def _settings() -> Settings:
+    return Settings(
+        _env_file=None,
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "sk-benchmark"),
+        MCP_SERVER_URL=os.environ.get("MCP_SERVER_URL", "http://127.0.0.1:8080"),
+    )
+
+
+async def _timed(label: str, iterations: int, fn: Callable[[], Awaitable[Any]]) -> list[float]:
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = perf_counter()
+        await fn()
+        samples.append((perf_counter() - start) * 1000)
+    typer.echo(
+        f"{label:<34} mean={mean(samples):8.3f} ms  median={median(samples):8.3f} ms  "
+        f"max={max(samples):8.3f} ms"
+    )
+    return samples
+
+
+async def _benchmark(iterations: int) -> None:
+    settings = _settings()
+    client = _StubClient()
+
+    async def run(agent: AgentGraph) -> None:
+        # Same per-run path as AgentRunner: run config, client binding, one tool turn.
+        with track_usage(settings.openai_model), enforce_budget(settings):
+            await agent.run("How many rows?", client=client)  # type: ignore[arg-type]
+
+    async def fresh() -> None:
+        await run(AgentGraph(settings))
+
+    shared = AgentGraph(settings)
+    await run(shared)  # warm-up, so the first sample does not pay one-off imports
+    per_request = await _timed("rebuild graph per query (before)", iterations, fresh)
+    reused = await _timed("reuse compiled graph (after)", iterations, lambda: run(shared))
+    saved = mean(per_request) - mean(reused)
+    typer.echo(f"setup saved per query: {saved:.3f} ms")
+
+
+@app.command()
+def main(iterations: int = typer.Option(50, help="Number of simulated queries")) -> None:
+    """Compare a full run on a fresh graph with the same run on a shared one.
+
+    Each sample is one ``AgentGraph.run`` (run config, client binding, one tool
+    call and the answer) against a scripted model and a stub MCP client, so no LLM
+    or MCP traffic is generated and the difference is the graph setup cost.
+    """
+    # Per-step debug logs would dwarf the timings.
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    graph_module.ChatOpenAI = lambda **kwargs: _ScriptedModel()  # type: ignore[assignment]
+    asyncio.run(_benchmark(iterations))
+
+
+if __name__ == "__main__":
+    app()
@@ -1,46 +1,314 @@
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import json
+from contextlib import suppress
+from time import perf_counter
+from typing import Any, AsyncIterator, TypeVar
 from uuid import uuid4
 
+import structlog
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.errors import GraphRecursionError
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
-from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt import ToolNode, create_react_agent
 
+from ..budget import BudgetCallbackHandler, BudgetExceededError
 from ..config import Settings
 from ..prompts import SYSTEM_PROMPT
-from ..tools import build_tools
+from ..tools import bind_client, build_tools
 from ..mcp_client import MCPToolClient
+from ..metrics import observe_tool_step, record_budget_exceeded
+from ..shaping import ToolOutputShaper
+from ..tracing import LLMTimingHandler, phase
+from ..usage import UsageCallbackHandler
+from .memory import build_history_compactor
+from .schema_context import SchemaCatalog, build_schema_prompt
+
+logger = structlog.get_logger(__name__)
+
+_STREAM_OUTPUT_MAX_CHARS = 2000
+# Graph steps per ReAct iteration: pre_model_hook, agent, tools.
+_STEPS_PER_ITERATION = 3
+
+_T = TypeVar("_T")
+
+
+class TimedToolNode(ToolNode):
+    """Tool node running all calls of a step concurrently and timing the step.
+
+    The step costs about as long as its slowest call; the concurrency cap lives
+    on the MCP client.
+    """
+
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        start = perf_counter()
+        try:
+            return await super().ainvoke(input, config, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            calls = _pending_tool_calls(input)
+            observe_tool_step(elapsed, calls=calls)
+            logger.debug("tool_step_completed", calls=calls, seconds=round(elapsed, 3))
 
 
 class AgentGraph:
-    def __init__(self, settings: Settings, client: MCPToolClient) -> None:
+    """ReAct graph compiled once and reused across runs.
+
+    The tools are not bound to a specific MCP session: each :meth:`run` binds the
+    client it was given, so a single graph can serve every pooled session.
+
+    A run that hits one of its hard limits (see :mod:`sql_agent_llm.budget`) is
+    closed with a partial answer and carries a ``budget_exceeded`` entry.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        *,
+        checkpointer: BaseCheckpointSaver | None = None,
+    ) -> None:
         self._settings = settings
-        self._client = client
-        self._memory = MemorySaver()
+        self._memory = checkpointer or MemorySaver()
+        self._schema_catalog = SchemaCatalog(settings) if settings.schema_preload else None
         self._graph = self._build_graph()
 
     def _build_graph(self):  # noqa: ANN202 - library typing noise
         llm = ChatOpenAI(
             model=self._settings.openai_model,
             temperature=0.1,
+            # Streamed responses only carry token usage when it is requested.
+            stream_usage=True,
             **self._settings.openai_kwargs(),
         )
-        tools = build_tools(self._client)
+        tools = TimedToolNode(build_tools(shaper=ToolOutputShaper(self._settings)))
         return create_react_agent(
             llm,
             tools,
-            prompt=SYSTEM_PROMPT,
+            prompt=build_schema_prompt() if self._schema_catalog else SYSTEM_PROMPT,
+            pre_model_hook=build_history_compactor(self._settings),
             checkpointer=self._memory,
+            # v1 hands every tool call of a step to one node, which gathers them.
+            version="v1",
         )
 
-    async def run(self, question: str, *, thread_id: str | None = None) -> dict[str, Any]:
+    async def run(
+        self,
+        question: str,
+        *,
+        client: MCPToolClient,
+        thread_id: str | None = None,
+    ) -> dict[str, Any]:
         thread = thread_id or str(uuid4())
-        result = await self._graph.ainvoke(
-            {"messages": [HumanMessage(content=question)]},
-            config={"configurable": {"thread_id": thread}},
-        )
+        with bind_client(client):
+            config = await self._run_config(question, client, thread)
+            try:
+                result = await asyncio.wait_for(
+                    self._graph.ainvoke({"messages": [HumanMessage(content=question)]}, config=config),
+                    self._settings.agent_timeout_seconds or None,
+                )
+            except (BudgetExceededError, GraphRecursionError, asyncio.TimeoutError) as exc:
+                result = await self._close_over_budget(config, self._budget_error(exc))
         result.setdefault("config", {})
         result["config"]["thread_id"] = thread
         return result
+
+    async def stream(
+        self,
+        question: str,
+        *,
+        client: MCPToolClient,
+        thread_id: str | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield progress events while the agent runs.
+
+        Emits ``token``, ``tool_start`` and ``tool_end`` events as they happen and
+        finishes with a ``result`` event carrying the same payload as :meth:`run`.
+        """
+        thread = thread_id or str(uuid4())
+        result: dict[str, Any] | None = None
+        with bind_client(client):
+            config = await self._run_config(question, client, thread)
+            events = self._graph.astream_events(
+                {"messages": [HumanMessage(content=question)]}, config=config, version="v2"
+            )
+            try:
+                async for event in _with_deadline(events, self._settings.agent_timeout_seconds):
+                    kind = event["event"]
+                    data = event.get("data", {})
+                    if kind == "on_chat_model_stream":
+                        text = _chunk_text(data.get("chunk"))
+                        if text:
+                            yield {"event": "token", "data": {"content": text}}
+                    elif kind == "on_tool_start":
+                        yield {
+                            "event": "tool_start",
+                            "data": {"tool": event["name"], "input": data.get("input")},
+                        }
+                    elif kind == "on_tool_end":
+                        yield {
+                            "event": "tool_end",
+                            "data": {"tool": event["name"], "output": _tool_output(data.get("output"))},
+                        }
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        result = data.get("output")
+            except (BudgetExceededError, GraphRecursionError, asyncio.TimeoutError) as exc:
+                result = await self._close_over_budget(config, self._budget_error(exc))
+        if not isinstance(result, dict):
+            raise RuntimeError("Agent stream ended without a final state")
+        result.setdefault("config", {})
+        result["config"]["thread_id"] = thread
+        yield {"event": "result", "data": result}
+
+    async def _run_config(self, question: str, client: MCPToolClient, thread: str) -> dict[str, Any]:
+        configurable: dict[str, Any] = {"thread_id": thread}
+        if self._schema_catalog is not None:
+            with phase("schema_preload"):
+                configurable["schema_context"] = await self._schema_catalog.context_for(question, client)
+        config: dict[str, Any] = {
+            "configurable": configurable,
+            "callbacks": [
+                LLMTimingHandler(self._settings.openai_model),
+                UsageCallbackHandler(),
+                BudgetCallbackHandler(),
+            ],
+        }
+        if self._settings.agent_max_iterations:
+            config["recursion_limit"] = self._recursion_limit()
+        return config
+
+    def _recursion_limit(self) -> int:
+        # Room for every allowed iteration plus the closing model turn; the
+        # budget callback normally stops the run first.
+        return _STEPS_PER_ITERATION * (self._settings.agent_max_iterations + 1) + 1
+
+    def _budget_error(self, exc: BaseException) -> BudgetExceededError:
+        if isinstance(exc, BudgetExceededError):
+            return exc
+        if isinstance(exc, GraphRecursionError):
+            return BudgetExceededError(
+                "iterations", f"recursion limit of {self._recursion_limit()} graph steps reached"
+            )
+        return BudgetExceededError(
+            "deadline", f"run exceeded {self._settings.agent_timeout_seconds:g} seconds"
+        )
+
+    async def _close_over_budget(
+        self, config: dict[str, Any], error: BudgetExceededError
+    ) -> dict[str, Any]:
+        """End the interrupted turn in the checkpoint and return the partial state.
+
+        Tool calls left unanswered get a cancellation result so that the thread
+        can be resumed by a later question.
+        """
+        record_budget_exceeded(error.limit)
+        logger.warning("agent_budget_exceeded", limit=error.limit, detail=error.detail)
+        snapshot = await self._graph.aget_state(config)
+        messages = list(snapshot.values.get("messages", []))
+        closing = _close_turn(messages, error)
+        if messages:
+            await self._graph.aupdate_state(config, {"messages": closing}, as_node="agent")
+        return {"messages": [*messages, *closing], "budget_exceeded": error.to_dict()}
+
+
+async def _with_deadline(events: AsyncIterator[_T], timeout: float) -> AsyncIterator[_T]:
+    """Relay ``events``, raising :class:`asyncio.TimeoutError` after ``timeout`` seconds.
+
+    The source is consumed by its own task, so that cancelling it on timeout
+    does not leave this generator half-closed. A timeout of 0 disables the deadline.
+    """
+    if not timeout:
+        async for item in events:
+            yield item
+        return
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    queue: asyncio.Queue[tuple[str, Any]] = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for item in events:
+                await queue.put(("item", item))
+        except Exception as exc:  # noqa: BLE001 - re-raised by the consumer
+            await queue.put(("error", exc))
+        else:
+            await queue.put(("done", None))
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            kind, value = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+            if kind == "done":
+                return
+            if kind == "error":
+                raise value
+            yield value
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+def _close_turn(messages: list[BaseMessage], error: BudgetExceededError) -> list[BaseMessage]:
+    """Messages answering dangling tool calls, then the partial answer of the turn."""
+    turn = messages[_last_question_index(messages):]
+    answered = {message.tool_call_id for message in turn if isinstance(message, ToolMessage)}
+    closing: list[BaseMessage] = [
+        ToolMessage(
+            content=f"Cancelled: run budget exhausted ({error.detail}).",
+            tool_call_id=call["id"],
+            name=call["name"],
+        )
+        for message in turn
+        if isinstance(message, AIMessage)
+        for call in message.tool_calls
+        if call["id"] not in answered
+    ]
+    closing.append(AIMessage(content=_partial_answer(turn, error)))
+    return closing
+
+
+def _partial_answer(turn: list[BaseMessage], error: BudgetExceededError) -> str:
+    parts = [f"The analysis was stopped before completion: {error.detail}."]
+    notes = [text for message in turn if isinstance(message, AIMessage) and (text := _chunk_text(message))]
+    if notes:
+        parts.append(notes[-1])
+    results = [message for message in turn if isinstance(message, ToolMessage)]
+    if results:
+        parts.append(f"Last tool result ({results[-1].name}): {_tool_output(results[-1])}")
+    return "\n\n".join(parts)
+
+
+def _last_question_index(messages: list[BaseMessage]) -> int:
+    for index in range(len(messages) - 1, -1, -1):
+        if isinstance(messages[index], HumanMessage):
+            return index
+    return 0
+
+
+def _pending_tool_calls(state: Any) -> int:
+    messages = state.get("messages", []) if isinstance(state, dict) else getattr(state, "messages", [])
+    for message in reversed(messages):
+        if isinstance(message, AIMessage):
+            return len(message.tool_calls)
+    return 0
+
+
+def _chunk_text(chunk: Any) -> str:
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return ""
+
+
+def _tool_output(output: Any) -> str:
+    content = getattr(output, "content", output)
+    text = content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, default=str)
+    if len(text) > _STREAM_OUTPUT_MAX_CHARS:
+        return text[:_STREAM_OUTPUT_MAX_CHARS] + "..."
+    return text
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Sequence
+
+import structlog
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from ..config import Settings
+
+logger = structlog.get_logger(__name__)
+
+SUMMARY_MESSAGE_NAME = "conversation_summary"
+_SUMMARY_HEADER = (
+    "Summary of earlier turns in this conversation. Reuse the schema details below"
+    " instead of calling the discovery tools again."
+)
+
+
+@asynccontextmanager
+async def open_checkpointer(settings: Settings) -> AsyncIterator[BaseCheckpointSaver]:
+    """Open the checkpointer selected by ``CHECKPOINTER_BACKEND``.
+
+    ``sqlite`` and ``postgres`` persist threads outside the process, so every
+    runner (and every uvicorn worker) pointing at the same URL shares them.
+    """
+    backend = settings.checkpointer_backend
+    if backend == "memory":
+        yield MemorySaver()
+        return
+    if not settings.checkpointer_url:
+        raise ValueError(f"CHECKPOINTER_URL is required for the {backend} checkpointer")
+
+    if backend == "sqlite":
+        try:
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError(
+                "SQLite checkpointer requires the 'sqlite' extra (langgraph-checkpoint-sqlite)"
+            ) from exc
+        async with AsyncSqliteSaver.from_conn_string(settings.checkpointer_url) as saver:
+            await saver.setup()
+            logger.info("checkpointer_opened", backend=backend)
+            yield saver
+        return
+
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "Postgres checkpointer requires the 'postgres' extra (langgraph-checkpoint-postgres)"
+        ) from exc
+    async with AsyncConnectionPool(
+        conninfo=settings.checkpointer_url,
+        max_size=settings.checkpointer_pool_size,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=False,
+    ) as pool:
+        saver = AsyncPostgresSaver(pool)
+        await saver.setup()
+        logger.info("checkpointer_opened", backend=backend)
+        yield saver
+
+
+def build_history_compactor(settings: Settings) -> Callable[[dict[str, Any]], dict[str, Any]]:
+    """Return a ``pre_model_hook`` keeping the stored history within a bounded window.
+
+    Whole turns older than the window are folded into a single summary message that
+    keeps each question, the tool results it relied on and the final answer.
+    """
+    max_messages = settings.history_max_messages
+    max_chars = settings.history_summary_max_chars
+
+    def compact_history(state: dict[str, Any]) -> dict[str, Any]:
+        messages: list[BaseMessage] = list(state["messages"])
+        if len(messages) <= max_messages:
+            return {}
+
+        previous_summary = ""
+        if _is_summary(messages[0]):
+            previous_summary = str(messages[0].content)
+            messages = messages[1:]
+
+        cut = _turn_boundary(messages, len(messages) - max_messages)
+        if cut <= 0:
+            return {}
+
+        summary = _summarize(messages[:cut], previous_summary, max_chars)
+        logger.info("history_compacted", compacted=cut, kept=len(messages) - cut)
+        return {
+            "messages": [
+                RemoveMessage(id=REMOVE_ALL_MESSAGES),
+                SystemMessage(content=summary, name=SUMMARY_MESSAGE_NAME),
+                *messages[cut:],
+            ]
+        }
+
+    return compact_history
+
+
+def _is_summary(message: BaseMessage) -> bool:
+    return isinstance(message, SystemMessage) and message.name == SUMMARY_MESSAGE_NAME
+
+
+def _turn_boundary(messages: Sequence[BaseMessage], start: int) -> int:
+    # Never split a turn: tool calls and their results must stay together.
+    human_indexes = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    for index in human_indexes:
+        if index >= start:
+            return index
+    return human_indexes[-1] if human_indexes else 0
+
+
+def _summarize(messages: Sequence[BaseMessage], previous: str, max_chars: int) -> str:
+    lines = previous.splitlines()[1:] if previous else []
+    tool_args: dict[str, str] = {}
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"Q: {_shorten(_text(message), 300)}")
+        elif isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                tool_args[call["id"]] = json.dumps(call["args"], ensure_ascii=False)
+            if not message.tool_calls and _text(message):
+                lines.append(f"A: {_shorten(_text(message), 500)}")
+        elif isinstance(message, ToolMessage):
+            args = tool_args.get(message.tool_call_id, "")
+            lines.append(f"- {message.name}({args}) -> {_shorten(_text(message), 600)}")
+
+    body: list[str] = []
+    size = len(_SUMMARY_HEADER)
+    for line in reversed(lines):
+        size += len(line) + 1
+        if size > max_chars:
+            break
+        body.append(line)
+    return "\n".join([_SUMMARY_HEADER, *reversed(body)])
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    parts = [part.get("text", "") if isinstance(part, dict) else str(part) for part in content]
+    return "\n".join(parts).strip()
+
+
+def _shorten(value: str, limit: int) -> str:
+    value = " ".join(value.split())
+    if len(value) <= limit:
+        return value
+    return value[: limit - 3] + "..."
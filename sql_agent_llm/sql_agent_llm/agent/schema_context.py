@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Callable, Sequence
+
+import structlog
+from langchain_core.messages import SystemMessage
+from langchain_core.runnables import RunnableConfig
+
+from ..config import Settings
+from ..mcp_client import MCPToolClient, unwrap_result
+from ..prompts import SCHEMA_CONTEXT_HEADER, SYSTEM_PROMPT
+
+logger = structlog.get_logger(__name__)
+
+_DESCRIBE_BATCH = 100
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+@dataclass
+class TableSummary:
+    database: str
+    schema: str | None
+    table: str
+    columns: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def qualified_name(self) -> str:
+        parts = [self.database, self.schema, self.table]
+        return ".".join(part for part in parts if part)
+
+    def render(self) -> str:
+        if not self.columns:
+            return self.qualified_name
+        columns = ", ".join(f"{name} {data_type}" for name, data_type in self.columns)
+        return f"{self.qualified_name}({columns})"
+
+    def words(self) -> set[str]:
+        names = [self.table, *(name for name, _ in self.columns)]
+        return {word for name in names for word in _words(name)}
+
+
+class SchemaCatalog:
+    """Compact schema summary loaded through the MCP tools and refreshed on a TTL.
+
+    The first ``SCHEMA_PRELOAD_CATALOG_MAX_TABLES`` tables are described with
+    their columns; beyond that only names are kept. When more tables exist than
+    fit in the prompt, the ones sharing the most words with the question win.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._ttl = settings.schema_preload_ttl_seconds
+        self._databases = settings.schema_preload_databases
+        self._catalog_max_tables = settings.schema_preload_catalog_max_tables
+        self._max_tables = settings.schema_preload_max_tables
+        self._max_chars = settings.schema_preload_max_chars
+        self._tables: list[TableSummary] = []
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def context_for(self, question: str, client: MCPToolClient) -> str | None:
+        try:
+            tables = await self._load(client)
+        except Exception as exc:  # noqa: BLE001 - the agent can still discover the schema itself
+            logger.warning("schema_preload_failed", error=str(exc))
+            return None
+        if not tables:
+            return None
+        return self.render(question, tables)
+
+    def render(self, question: str, tables: Sequence[TableSummary]) -> str:
+        selected = list(tables)
+        if len(selected) > self._max_tables:
+            selected = _most_relevant(question, selected, self._max_tables)
+        lines: list[str] = []
+        size = 0
+        for table in selected:
+            line = table.render()
+            size += len(line) + 1
+            if size > self._max_chars:
+                break
+            lines.append(line)
+        omitted = len(tables) - len(lines)
+        if omitted:
+            lines.append(f"... {omitted} more tables: use list_tables/describe_tables for them.")
+        return "\n".join(lines)
+
+    async def _load(self, client: MCPToolClient) -> list[TableSummary]:
+        async with self._lock:
+            if monotonic() < self._expires_at:
+                return self._tables
+            tables: list[TableSummary] = []
+            databases = unwrap_result(await client.call_tool("list_databases"))
+            for database in databases:
+                if self._databases and database not in self._databases:
+                    continue
+                listed = unwrap_result(await client.call_tool("list_tables", {"database": database}))
+                tables.extend(
+                    TableSummary(database, row.get("table_schema"), row["table_name"]) for row in listed
+                )
+            await self._describe(client, tables[: self._catalog_max_tables])
+            self._tables = tables
+            self._expires_at = monotonic() + self._ttl
+            logger.info("schema_preload_refreshed", tables=len(tables))
+            return tables
+
+    async def _describe(self, client: MCPToolClient, tables: Sequence[TableSummary]) -> None:
+        by_database: dict[str, list[TableSummary]] = {}
+        for table in tables:
+            by_database.setdefault(table.database, []).append(table)
+        for database, summaries in by_database.items():
+            for start in range(0, len(summaries), _DESCRIBE_BATCH):
+                batch = summaries[start : start + _DESCRIBE_BATCH]
+                payload = {
+                    "database": database,
+                    "tables": [
+                        {"table": table.table, **({"schema": table.schema} if table.schema else {})}
+                        for table in batch
+                    ],
+                }
+                described = unwrap_result(await client.call_tool("describe_tables", payload))
+                for table, details in zip(batch, described):
+                    table.columns = [
+                        (column["column_name"], column["data_type"]) for column in details["columns"]
+                    ]
+
+
+def build_schema_prompt() -> Callable[[dict[str, Any], RunnableConfig], list[Any]]:
+    """Return a prompt callable appending the run's schema summary to the system prompt.
+
+    The summary travels in ``config["configurable"]["schema_context"]`` so it is
+    applied to every model call of the run without being stored in the thread.
+    """
+
+    def prompt(state: dict[str, Any], config: RunnableConfig) -> list[Any]:
+        schema_context = config.get("configurable", {}).get("schema_context")
+        content = SYSTEM_PROMPT
+        if schema_context:
+            content = f"{SYSTEM_PROMPT}\n\n{SCHEMA_CONTEXT_HEADER}\n{schema_context}"
+        return [SystemMessage(content=content), *state["messages"]]
+
+    return prompt
+
+
+def _most_relevant(question: str, tables: Sequence[TableSummary], limit: int) -> list[TableSummary]:
+    wanted = {_singular(word) for word in _words(question)}
+    scored = []
+    for index, table in enumerate(tables):
+        score = len(wanted & {_singular(word) for word in table.words()})
+        if wanted & {_singular(word) for word in _words(table.table)}:
+            score += 2
+        scored.append((-score, index, table))
+    scored.sort(key=lambda item: item[:2])
+    return [table for _, _, table in scored[:limit]]
+
+
+def _words(value: str) -> set[str]:
+    return set(_WORD.findall(value.lower()))
+
+
+def _singular(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Literal
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from .config import Settings
+from .usage import RunUsage, current_usage
+
+BudgetLimit = Literal["iterations", "deadline", "tokens", "sql_rows"]
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when an agent run reaches one of its hard limits."""
+
+    def __init__(self, limit: BudgetLimit, detail: str) -> None:
+        super().__init__(detail)
+        self.limit = limit
+        self.detail = detail
+
+    def to_dict(self) -> dict[str, str]:
+        return {"limit": self.limit, "detail": self.detail}
+
+
+class RunBudget:
+    """Hard limits of one agent run; a limit set to 0 is disabled.
+
+    Tokens and SQL rows are checked before each model call, so the run stops at
+    the next turn once one is spent. Iterations are charged when a model response
+    asks for tools: up to ``AGENT_MAX_ITERATIONS`` tool turns run, and the turn
+    after them may still answer. ``AGENT_TIMEOUT_SECONDS`` is enforced by
+    :class:`~sql_agent_llm.agent.graph.AgentGraph`, which cancels the run.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.max_iterations = settings.agent_max_iterations
+        self.max_tokens = settings.agent_max_tokens
+        self.max_sql_rows = settings.agent_max_sql_rows
+        self.sql_rows = 0
+        self.iterations = 0
+
+    def charge_sql_rows(self, count: int) -> None:
+        self.sql_rows += count
+
+    def charge_iteration(self) -> None:
+        """Count a model response asking for tools; the one past the limit is refused."""
+        self.iterations += 1
+        if self.max_iterations and self.iterations > self.max_iterations:
+            raise BudgetExceededError(
+                "iterations",
+                f"tool iteration {self.iterations} requested, limit is {self.max_iterations}",
+            )
+
+    def check(self, usage: RunUsage | None) -> None:
+        if self.max_sql_rows and self.sql_rows > self.max_sql_rows:
+            raise BudgetExceededError(
+                "sql_rows", f"{self.sql_rows} SQL rows fetched, limit is {self.max_sql_rows}"
+            )
+        if usage is None:
+            return
+        tokens = usage.prompt_tokens + usage.completion_tokens
+        if self.max_tokens and tokens > self.max_tokens:
+            raise BudgetExceededError("tokens", f"{tokens} tokens used, limit is {self.max_tokens}")
+
+
+_CURRENT_BUDGET: ContextVar[RunBudget | None] = ContextVar("agent_run_budget", default=None)
+
+
+@contextmanager
+def enforce_budget(settings: Settings) -> Iterator[RunBudget]:
+    budget = RunBudget(settings)
+    token = _CURRENT_BUDGET.set(budget)
+    try:
+        yield budget
+    finally:
+        _CURRENT_BUDGET.reset(token)
+
+
+def current_budget() -> RunBudget | None:
+    return _CURRENT_BUDGET.get()
+
+
+def charge_sql_rows(result: Any) -> None:
+    """Count the rows a run_sql_query result hands to the model."""
+    budget = _CURRENT_BUDGET.get()
+    if budget is not None and isinstance(result, dict):
+        budget.charge_sql_rows(int(result.get("row_count") or 0))
+
+
+class BudgetCallbackHandler(AsyncCallbackHandler):
+    """Stop the run once its budget is spent.
+
+    Tokens and rows are checked before a model call. A response asking for one
+    tool turn too many is refused as it ends, so its tools never run.
+    """
+
+    # Without it LangChain would log the error and let the model call proceed.
+    raise_error = True
+
+    def __init__(self) -> None:
+        self._budget = _CURRENT_BUDGET.get()
+        self._usage = current_usage()
+
+    async def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        if self._budget is not None:
+            self._budget.check(self._usage)
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if self._budget is None:
+            return
+        for generations in response.generations:
+            for generation in generations[:1]:
+                if getattr(getattr(generation, "message", None), "tool_calls", None):
+                    self._budget.charge_iteration()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic import AnyUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -13,6 +14,61 @@ class Settings(BaseSettings):
 
     mcp_server_url: AnyUrl = Field(alias="MCP_SERVER_URL")
     mcp_sse_path: str = Field(default="/sse", alias="MCP_SSE_PATH")
+    mcp_pool_size: int = Field(default=4, ge=1, alias="MCP_POOL_SIZE")
+    mcp_pool_health_check_seconds: float = Field(
+        default=30.0, ge=0, alias="MCP_POOL_HEALTH_CHECK_SECONDS"
+    )
+    mcp_pool_connect_retries: int = Field(default=2, ge=0, alias="MCP_POOL_CONNECT_RETRIES")
+    mcp_ping_timeout_seconds: float = Field(default=5.0, gt=0, alias="MCP_PING_TIMEOUT_SECONDS")
+    mcp_request_timeout_seconds: float = Field(
+        default=300.0, ge=0, alias="MCP_REQUEST_TIMEOUT_SECONDS"
+    )
+    mcp_tool_concurrency: int = Field(default=4, ge=1, alias="MCP_TOOL_CONCURRENCY")
+
+    checkpointer_backend: Literal["memory", "sqlite", "postgres"] = Field(
+        default="memory", alias="CHECKPOINTER_BACKEND"
+    )
+    checkpointer_url: str | None = Field(default=None, alias="CHECKPOINTER_URL")
+    checkpointer_pool_size: int = Field(default=5, ge=1, alias="CHECKPOINTER_POOL_SIZE")
+    history_max_messages: int = Field(default=40, ge=2, alias="HISTORY_MAX_MESSAGES")
+    history_summary_max_chars: int = Field(default=4000, ge=200, alias="HISTORY_SUMMARY_MAX_CHARS")
+
+    schema_preload: bool = Field(default=False, alias="SCHEMA_PRELOAD")
+    schema_preload_ttl_seconds: float = Field(default=600.0, gt=0, alias="SCHEMA_PRELOAD_TTL_SECONDS")
+    schema_preload_databases: list[str] = Field(default_factory=list, alias="SCHEMA_PRELOAD_DATABASES")
+    schema_preload_catalog_max_tables: int = Field(
+        default=500, ge=0, alias="SCHEMA_PRELOAD_CATALOG_MAX_TABLES"
+    )
+    schema_preload_max_tables: int = Field(default=40, ge=1, alias="SCHEMA_PRELOAD_MAX_TABLES")
+    schema_preload_max_chars: int = Field(default=8000, ge=200, alias="SCHEMA_PRELOAD_MAX_CHARS")
+
+    tracing_exporter: Literal["none", "otlp", "file"] = Field(default="none", alias="TRACING_EXPORTER")
+    tracing_otlp_endpoint: str = Field(
+        default="http://localhost:4318/v1/traces", alias="TRACING_OTLP_ENDPOINT"
+    )
+    tracing_file: str = Field(default="traces.jsonl", alias="TRACING_FILE")
+    tracing_service_name: str = Field(default="sql-agent-llm", alias="TRACING_SERVICE_NAME")
+
+    agent_max_iterations: int = Field(default=12, ge=0, alias="AGENT_MAX_ITERATIONS")
+    agent_timeout_seconds: float = Field(default=120.0, ge=0, alias="AGENT_TIMEOUT_SECONDS")
+    agent_max_tokens: int = Field(default=200_000, ge=0, alias="AGENT_MAX_TOKENS")
+    agent_max_sql_rows: int = Field(default=100_000, ge=0, alias="AGENT_MAX_SQL_ROWS")
+
+    tool_output_max_tokens: int = Field(default=4000, ge=0, alias="TOOL_OUTPUT_MAX_TOKENS")
+    tool_output_token_budgets: dict[str, int] = Field(
+        default_factory=dict,
+        alias="TOOL_OUTPUT_TOKEN_BUDGETS",
+        description="Per-tool overrides of TOOL_OUTPUT_MAX_TOKENS, e.g. {\"list_tables\": 1500}",
+    )
+    tool_output_max_string_chars: int = Field(
+        default=200, ge=16, alias="TOOL_OUTPUT_MAX_STRING_CHARS"
+    )
+
+    llm_pricing: dict[str, dict[str, float]] = Field(
+        default_factory=dict,
+        alias="LLM_PRICING",
+        description="USD per million tokens by model: input, cached_input, output",
+    )
 
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
     log_json: bool = Field(default=True, alias="LOG_JSON")
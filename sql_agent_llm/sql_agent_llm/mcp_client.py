@@ -1,35 +1,72 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from contextlib import asynccontextmanager
-from time import perf_counter
+from collections import deque
+from contextlib import asynccontextmanager, suppress
+from datetime import timedelta
+from time import monotonic, perf_counter
 from typing import Any, AsyncIterator
+from uuid import uuid4
 
 import structlog
 from mcp.client.session import ClientSession
 from mcp.client.sse import sse_client
+from mcp.shared.exceptions import McpError
 from mcp import types
 
 from .config import Settings
-from .metrics import observe_tool_call
+from .metrics import (
+    observe_pool_wait,
+    observe_tool_call,
+    record_pool_reconnect,
+    set_pool_sessions,
+)
+from .tracing import add_phase, phase, request_meta
 
 logger = structlog.get_logger(__name__)
 
+# Logger name of the notifications in which the MCP server reports per-call timings.
+SERVER_TIMINGS_LOGGER = "mcp_server_sql.timings"
+
+_CANCEL_NOTIFY_TIMEOUT_SECONDS = 1.0
+# Time given to a pooled session's transport to shut down before its task is cancelled.
+_CLOSE_TIMEOUT_SECONDS = 5.0
+# Error code of the McpError raised when a request outlives the session read timeout.
+_REQUEST_TIMEOUT_CODE = 408
+
 
 class MCPToolError(RuntimeError):
     """Raised when an MCP tool call fails."""
 
 
 class MCPToolClient:
+    """MCP session wrapper whose tool calls may run concurrently.
+
+    Concurrent calls are multiplexed over the session by request id; at most
+    ``MCP_TOOL_CONCURRENCY`` are in flight at once. A pooled client serves one
+    agent run at a time, so this is a per-run cap.
+    """
+
     def __init__(self, settings: Settings) -> None:
         self._settings = settings
         self._session: ClientSession | None = None
         self._transport_cm: Any | None = None
+        self._call_limit = asyncio.Semaphore(settings.mcp_tool_concurrency)
+        self._server_timings: dict[str, dict[str, Any]] = {}
+        # Set when a request got no answer in time: the session is presumed dead.
+        self.timed_out = False
 
     async def __aenter__(self) -> "MCPToolClient":
         self._transport_cm = sse_client(self._settings.mcp_sse_url)
         read_stream, write_stream = await self._transport_cm.__aenter__()
-        self._session = ClientSession(read_stream, write_stream)
+        timeout = self._settings.mcp_request_timeout_seconds
+        self._session = ClientSession(
+            read_stream,
+            write_stream,
+            read_timeout_seconds=timedelta(seconds=timeout) if timeout else None,
+            logging_callback=self._on_log_message,
+        )
         await self._session.__aenter__()
         await self._session.initialize()
         logger.info("mcp_client_connected", url=self._settings.mcp_sse_url)
@@ -55,17 +92,88 @@ class MCPToolClient:
         return list(result.tools)
 
     async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> Any:
+        async with self._call_limit:
+            return await self._call_tool(name, arguments)
+
+    async def _call_tool(self, name: str, arguments: dict[str, Any] | None) -> Any:
         start = perf_counter()
         success = False
+        call_id = uuid4().hex
         try:
-            result = await self.session.call_tool(name, arguments or {})
+            with phase("mcp", span_name=f"mcp.call_tool {name}", tool=name):
+                result = await self._send_call_tool(name, arguments, call_id)
             if result.isError:
                 raise MCPToolError(f"Tool {name} reported error")
             parsed = _parse_tool_result(result)
             success = True
             return parsed
         finally:
-            observe_tool_call(name, perf_counter() - start, success=success)
+            elapsed = perf_counter() - start
+            observe_tool_call(name, elapsed, success=success)
+            self._record_server_timings(call_id, elapsed)
+
+    async def _send_call_tool(
+        self, name: str, arguments: dict[str, Any] | None, call_id: str
+    ) -> types.CallToolResult:
+        # ClientSession.call_tool cannot set _meta, which carries the trace context
+        # and the id the server echoes back with its timings.
+        params = types.CallToolRequestParams(
+            name=name,
+            arguments=arguments or {},
+            _meta={**request_meta(), "call_id": call_id},
+        )
+        # Private to the SDK: send_request takes this id before its first await
+        # (mcp <1.17, see pyproject.toml). Without it no cancellation is sent.
+        request_id = getattr(self.session, "_request_id", None)
+        if not isinstance(request_id, int):
+            request_id = None
+        try:
+            return await self.session.send_request(
+                types.ClientRequest(types.CallToolRequest(method="tools/call", params=params)),
+                types.CallToolResult,
+            )
+        except asyncio.CancelledError:
+            await self._notify_cancelled(request_id, name)
+            raise
+        except McpError as exc:
+            if exc.error.code == _REQUEST_TIMEOUT_CODE:
+                self.timed_out = True
+                await self._notify_cancelled(request_id, name)
+            raise
+
+    async def _notify_cancelled(self, request_id: int | None, name: str) -> None:
+        """Tell the server to stop a call this client gave up on (e.g. on an agent timeout)."""
+        if request_id is None:
+            logger.debug("mcp_cancel_notify_skipped", tool=name)
+            return
+        notification = types.CancelledNotification(
+            method="notifications/cancelled",
+            params=types.CancelledNotificationParams(requestId=request_id, reason="cancelled by client"),
+        )
+        try:
+            await asyncio.wait_for(
+                self.session.send_notification(types.ClientNotification(notification)),
+                _CANCEL_NOTIFY_TIMEOUT_SECONDS,
+            )
+        except Exception as exc:  # noqa: BLE001 - best effort, the call is already abandoned
+            logger.warning("mcp_cancel_notify_failed", tool=name, error=str(exc))
+
+    async def _on_log_message(self, params: types.LoggingMessageNotificationParams) -> None:
+        if params.logger == SERVER_TIMINGS_LOGGER and isinstance(params.data, dict):
+            call_id = params.data.get("call_id")
+            if call_id:
+                self._server_timings[call_id] = params.data
+
+    def _record_server_timings(self, call_id: str, elapsed: float) -> None:
+        # The server sends its timings before the response, on the same stream.
+        timings = self._server_timings.pop(call_id, None)
+        if timings is None:
+            return
+        tool_seconds = float(timings.get("tool_seconds", 0.0))
+        add_phase("tool", tool_seconds)
+        add_phase("mcp_transport", max(elapsed - tool_seconds, 0.0))
+        if timings.get("db_calls"):
+            add_phase("db", float(timings.get("db_seconds", 0.0)), count=int(timings["db_calls"]))
 
 
 def _parse_tool_result(result: types.CallToolResult) -> Any:
@@ -84,6 +192,13 @@ def _parse_tool_result(result: types.CallToolResult) -> Any:
     return parsed_texts
 
 
+def unwrap_result(result: Any) -> Any:
+    """Strip the ``{"result": ...}`` wrapper FastMCP puts around non-object tool results."""
+    if isinstance(result, dict) and set(result) == {"result"}:
+        return result["result"]
+    return result
+
+
 def _maybe_json(value: str) -> Any:
     try:
         return json.loads(value)
@@ -99,3 +214,159 @@ async def connect_mcp(settings: Settings) -> AsyncIterator[MCPToolClient]:
         yield client
     finally:
         await client.__aexit__(None, None, None)
+
+
+class _PooledConnection:
+    """MCP session owned by a dedicated task.
+
+    The SSE transport relies on anyio task groups which must be entered and exited
+    from the same task, so each pooled session lives in its own background task
+    and is shut down by signalling it rather than by calling ``__aexit__`` directly.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.client = MCPToolClient(settings)
+        self._ping_timeout = settings.mcp_ping_timeout_seconds
+        self.last_checked = monotonic()
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def open(self) -> None:
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self) -> None:
+        try:
+            async with self.client:
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as exc:  # noqa: BLE001 - surfaced through open()/alive
+            self._error = exc
+            logger.warning("mcp_pool_session_failed", error=str(exc))
+        finally:
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def ping(self) -> bool:
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.client.session.send_ping(), self._ping_timeout)
+        except Exception as exc:  # noqa: BLE001 - any failure means the session is unusable
+            logger.warning("mcp_pool_ping_failed", error=str(exc))
+            return False
+        self.last_checked = monotonic()
+        return True
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is None:
+            return
+        done, _ = await asyncio.wait((self._task,), timeout=_CLOSE_TIMEOUT_SECONDS)
+        if not done:
+            # The transport of a dead server may never finish shutting down.
+            self._task.cancel()
+        with suppress(Exception, asyncio.CancelledError):
+            await self._task
+
+
+class MCPClientPool:
+    """Bounded pool of long-lived MCP sessions shared across agent runs."""
+
+    def __init__(self, settings: Settings) -> None:
+        self._settings = settings
+        self._max_size = settings.mcp_pool_size
+        self._idle: deque[_PooledConnection] = deque()
+        self._in_use = 0
+        self._semaphore = asyncio.Semaphore(self._max_size)
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[MCPToolClient]:
+        start = perf_counter()
+        await self._semaphore.acquire()
+        waited = perf_counter() - start
+        observe_pool_wait(waited)
+        add_phase("mcp_pool_wait", waited)
+        try:
+            connection = await self._checkout()
+            self._in_use += 1
+            self._drained.clear()
+            self._report()
+            healthy = True
+            try:
+                yield connection.client
+            except BaseException:
+                healthy = False
+                raise
+            finally:
+                self._in_use -= 1
+                await self._checkin(connection, healthy=healthy)
+                if not self._in_use:
+                    self._drained.set()
+        finally:
+            self._semaphore.release()
+
+    async def close(self) -> None:
+        # Sessions still checked out come back to the idle queue before it is closed.
+        await self._drained.wait()
+        idle = list(self._idle)
+        self._idle.clear()
+        await asyncio.gather(*(connection.close() for connection in idle))
+        self._report()
+        logger.info("mcp_pool_closed", closed=len(idle))
+
+    async def _checkout(self) -> _PooledConnection:
+        interval = self._settings.mcp_pool_health_check_seconds
+        while self._idle:
+            connection = self._idle.popleft()
+            if not connection.alive:
+                record_pool_reconnect("disconnected")
+                await connection.close()
+                continue
+            if monotonic() - connection.last_checked >= interval and not await connection.ping():
+                record_pool_reconnect("health_check")
+                await connection.close()
+                continue
+            return connection
+        return await self._connect()
+
+    async def _checkin(self, connection: _PooledConnection, *, healthy: bool) -> None:
+        if not connection.alive:
+            record_pool_reconnect("disconnected")
+            await connection.close()
+        elif connection.client.timed_out:
+            record_pool_reconnect("timeout")
+            await connection.close()
+        else:
+            if not healthy:
+                # Force a ping on next checkout: the failure may have broken the transport.
+                connection.last_checked = float("-inf")
+            self._idle.append(connection)
+        self._report()
+
+    async def _connect(self) -> _PooledConnection:
+        attempts = self._settings.mcp_pool_connect_retries + 1
+        for attempt in range(1, attempts + 1):
+            connection = _PooledConnection(self._settings)
+            try:
+                await connection.open()
+                return connection
+            except Exception as exc:  # noqa: BLE001
+                await connection.close()
+                if attempt >= attempts:
+                    raise
+                logger.warning("mcp_pool_connect_retry", attempt=attempt, error=str(exc))
+                await asyncio.sleep(min(0.5 * 2 ** (attempt - 1), 5.0))
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    def _report(self) -> None:
+        set_pool_sessions(idle=len(self._idle), in_use=self._in_use)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import threading
+from typing import Any
 
 import structlog
-from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
 
 from .config import Settings
 
@@ -23,6 +24,68 @@ _TOOL_LATENCY = Histogram(
     "Latency of individual MCP tool calls",
     labelnames=("tool",),
 )
+_TOOL_STEP_LATENCY = Histogram(
+    "sql_agent_llm_tool_step_seconds",
+    "Wall time of an agent step running all of its tool calls concurrently",
+)
+_TOOL_STEP_CALLS = Histogram(
+    "sql_agent_llm_tool_step_calls",
+    "Number of tool calls issued in a single agent step",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+_RUN_TOKENS = Histogram(
+    "sql_agent_llm_run_tokens",
+    "Tokens used by an agent run, by kind (prompt includes cached)",
+    labelnames=("model", "kind"),
+    buckets=(500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000),
+)
+_RUN_LLM_CALLS = Histogram(
+    "sql_agent_llm_run_llm_calls",
+    "Chat model calls made by an agent run",
+    labelnames=("model",),
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 25, 40),
+)
+_RUN_ITERATIONS = Histogram(
+    "sql_agent_llm_run_iterations",
+    "ReAct iterations (model turns requesting tools) of an agent run",
+    labelnames=("model",),
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 25),
+)
+_RUN_COST = Histogram(
+    "sql_agent_llm_run_cost_usd",
+    "Estimated cost of an agent run, for models listed in LLM_PRICING",
+    labelnames=("model",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0),
+)
+_BUDGET_EXCEEDED = Counter(
+    "sql_agent_llm_budget_exceeded_total",
+    "Agent runs stopped early by a hard limit",
+    labelnames=("limit",),
+)
+_TOOL_OUTPUT_SHAPED = Counter(
+    "sql_agent_llm_tool_output_shaped_total",
+    "Tool results cut down to fit their token budget",
+    labelnames=("tool",),
+)
+_TOOL_OUTPUT_TOKENS_SAVED = Counter(
+    "sql_agent_llm_tool_output_tokens_saved_total",
+    "Estimated prompt tokens removed from tool results by shaping",
+    labelnames=("tool",),
+)
+_POOL_WAIT = Histogram(
+    "sql_agent_llm_mcp_pool_wait_seconds",
+    "Time spent waiting for a pooled MCP session",
+)
+_POOL_SESSIONS = Gauge(
+    "sql_agent_llm_mcp_pool_sessions",
+    "Pooled MCP sessions grouped by state",
+    labelnames=("state",),
+)
+_POOL_RECONNECTS = Counter(
+    "sql_agent_llm_mcp_pool_reconnects_total",
+    "MCP sessions discarded by the pool and replaced",
+    labelnames=("reason",),
+)
 
 _metrics_started = False
 _metrics_lock = threading.Lock()
@@ -49,3 +112,41 @@ def record_agent_request() -> None:
 def observe_tool_call(tool_name: str, seconds: float, *, success: bool) -> None:
     _TOOL_LATENCY.labels(tool=tool_name).observe(seconds)
     _TOOL_CALLS.labels(tool=tool_name, status="success" if success else "error").inc()
+
+
+def observe_tool_step(seconds: float, *, calls: int) -> None:
+    _TOOL_STEP_LATENCY.observe(seconds)
+    _TOOL_STEP_CALLS.observe(calls)
+
+
+def observe_run_usage(usage: dict[str, Any]) -> None:
+    model = usage["model"]
+    for kind in ("prompt", "completion", "cached"):
+        _RUN_TOKENS.labels(model=model, kind=kind).observe(usage[f"{kind}_tokens"])
+    _RUN_LLM_CALLS.labels(model=model).observe(usage["llm_calls"])
+    _RUN_ITERATIONS.labels(model=model).observe(usage["iterations"])
+    if usage["cost_usd"] is not None:
+        _RUN_COST.labels(model=model).observe(usage["cost_usd"])
+
+
+def record_budget_exceeded(limit: str) -> None:
+    _BUDGET_EXCEEDED.labels(limit=limit).inc()
+
+
+def record_tool_output_shaped(tool: str, saved_tokens: int) -> None:
+    _TOOL_OUTPUT_SHAPED.labels(tool=tool).inc()
+    if saved_tokens > 0:
+        _TOOL_OUTPUT_TOKENS_SAVED.labels(tool=tool).inc(saved_tokens)
+
+
+def observe_pool_wait(seconds: float) -> None:
+    _POOL_WAIT.observe(seconds)
+
+
+def set_pool_sessions(*, idle: int, in_use: int) -> None:
+    _POOL_SESSIONS.labels(state="idle").set(idle)
+    _POOL_SESSIONS.labels(state="in_use").set(in_use)
+
+
+def record_pool_reconnect(reason: str) -> None:
+    _POOL_RECONNECTS.labels(reason=reason).inc()
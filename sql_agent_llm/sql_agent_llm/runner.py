@@ -2,15 +2,20 @@ from __future__ import annotations
 
 import asyncio
 import os
-from typing import Any
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator
 
 import structlog
 
 from .agent.graph import AgentGraph
+from .agent.memory import open_checkpointer
+from .budget import enforce_budget
 from .config import Settings, get_settings
 from .logging_config import configure_logging
-from .metrics import launch_metrics_server, record_agent_request
-from .mcp_client import connect_mcp
+from .metrics import launch_metrics_server, observe_run_usage, record_agent_request
+from .mcp_client import MCPClientPool
+from .tracing import RunTimings, configure_tracing, trace_run
+from .usage import RunUsage, track_usage
 
 logger = structlog.get_logger(__name__)
 
@@ -20,19 +25,88 @@ class AgentRunner:
         self._settings = settings or get_settings()
         configure_logging(self._settings)
         launch_metrics_server(self._settings)
+        configure_tracing(self._settings)
         _configure_langsmith(self._settings)
+        self._pool = MCPClientPool(self._settings)
+        self._agent: AgentGraph | None = None
+        self._agent_lock = asyncio.Lock()
+        self._resources = AsyncExitStack()
 
     async def run_query(self, question: str, *, thread_id: str | None = None) -> dict[str, Any]:
         record_agent_request()
-        async with connect_mcp(self._settings) as client:
-            agent = AgentGraph(self._settings, client)
-            logger.info("agent_run_started", question=question)
-            result = await agent.run(question, thread_id=thread_id)
-            logger.info("agent_run_completed")
+        agent = await self._get_agent()
+        with (
+            trace_run(thread_id=thread_id) as timings,
+            track_usage(self._settings.openai_model) as usage,
+            enforce_budget(self._settings),
+        ):
+            async with self._pool.acquire() as client:
+                logger.info("agent_run_started", question=question)
+                result = await agent.run(question, client=client, thread_id=thread_id)
+            self._finish_run(result, timings, usage)
             return result
 
+    async def stream_query(
+        self, question: str, *, thread_id: str | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Stream agent progress events; the last event is ``result``.
+
+        The result carries the run's per-phase ``timings`` and token ``usage``,
+        plus ``budget_exceeded`` when a hard limit cut the run short.
+        """
+        record_agent_request()
+        agent = await self._get_agent()
+        with (
+            trace_run(thread_id=thread_id, streaming=True) as timings,
+            track_usage(self._settings.openai_model) as usage,
+            enforce_budget(self._settings),
+        ):
+            async with self._pool.acquire() as client:
+                logger.info("agent_run_started", question=question, streaming=True)
+                async for event in agent.stream(question, client=client, thread_id=thread_id):
+                    if event["event"] == "result":
+                        self._finish_run(event["data"], timings, usage)
+                    yield event
+
+    def _finish_run(self, result: dict[str, Any], timings: RunTimings, usage: RunUsage) -> None:
+        result["timings"] = timings.summary()
+        result["usage"] = usage.summary(self._settings.llm_pricing)
+        observe_run_usage(result["usage"])
+        logger.info(
+            "agent_run_completed",
+            seconds=result["timings"]["total_seconds"],
+            llm_calls=usage.llm_calls,
+            iterations=usage.iterations,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            budget_exceeded=(result.get("budget_exceeded") or {}).get("limit"),
+        )
+
+    async def aclose(self) -> None:
+        await self._pool.close()
+        await self._resources.aclose()
+        self._resources = AsyncExitStack()
+        self._agent = None
+
+    async def _get_agent(self) -> AgentGraph:
+        # The checkpointer opens async connections, so the graph is compiled on first use.
+        async with self._agent_lock:
+            if self._agent is None:
+                checkpointer = await self._resources.enter_async_context(
+                    open_checkpointer(self._settings)
+                )
+                self._agent = AgentGraph(self._settings, checkpointer=checkpointer)
+            return self._agent
+
     def run_query_sync(self, question: str, *, thread_id: str | None = None) -> dict[str, Any]:
-        return asyncio.run(self.run_query(question, thread_id=thread_id))
+        return asyncio.run(self._run_query_once(question, thread_id=thread_id))
+
+    async def _run_query_once(self, question: str, *, thread_id: str | None) -> dict[str, Any]:
+        # Pooled sessions are bound to the event loop, so release them before asyncio.run exits.
+        try:
+            return await self.run_query(question, thread_id=thread_id)
+        finally:
+            await self.aclose()
 
 
 def _configure_langsmith(settings: Settings) -> None:
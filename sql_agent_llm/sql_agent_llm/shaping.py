@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Sequence
+
+from .config import Settings
+from .mcp_client import unwrap_result
+from .metrics import record_tool_output_shaped
+
+# Rough average for JSON-heavy text with common tokenizers.
+_CHARS_PER_TOKEN = 4
+_ELLIPSIS = "…"
+_STAT_VALUE_MAX_CHARS = 40
+
+_HINTS = {
+    "list_tables": "narrow the listing with schema_filter, or use search_schema",
+    "search_schema": "lower top_k or use more specific keywords",
+    "describe_tables": "describe fewer tables per call",
+    "run_sql_query": "filter or aggregate in SQL, or use export_sql_query for the full result",
+}
+_DEFAULT_HINT = "ask for a narrower result"
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+
+class ToolOutputShaper:
+    """Fit tool results into a per-tool token budget before they reach the model.
+
+    Results within budget pass through untouched. Otherwise strings longer than
+    ``TOOL_OUTPUT_MAX_STRING_CHARS`` are elided; if that is not enough, SQL rows
+    are sampled evenly and every fetched row is summarized by per-column stats
+    (min, max, distinct count), while other lists keep their first items. A
+    ``more_available`` entry tells the model what was left out and how to get
+    it. The budget is approximate and a budget of 0 disables shaping.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._default_budget = settings.tool_output_max_tokens
+        self._budgets = settings.tool_output_token_budgets
+        self._max_string_chars = settings.tool_output_max_string_chars
+
+    def budget_for(self, tool: str) -> int:
+        return self._budgets.get(tool, self._default_budget)
+
+    def shape(self, tool: str, result: Any) -> str:
+        original = _dumps(result)
+        budget = self.budget_for(tool)
+        if not budget or estimate_tokens(original) <= budget:
+            return original
+        max_chars = budget * _CHARS_PER_TOKEN
+        value = _elide_strings(unwrap_result(result), self._max_string_chars)
+        if len(_dumps(value)) > max_chars:
+            if _is_table(value):
+                value = _fit_rows(value, max_chars, _HINTS.get(tool, _DEFAULT_HINT))
+            else:
+                value = _fit_items(value, max_chars, _HINTS.get(tool, _DEFAULT_HINT))
+        shaped = _dumps(value)
+        record_tool_output_shaped(tool, estimate_tokens(original) - estimate_tokens(shaped))
+        return shaped
+
+
+def _fit_rows(payload: dict[str, Any], max_chars: int, hint: str) -> dict[str, Any]:
+    """Keep every ``step``-th row of a run_sql_query payload, plus stats over all rows."""
+    columns = payload["columns"]
+    rows = _table_rows(payload)
+    base = {key: value for key, value in payload.items() if key not in ("rows", "values")}
+    base["column_stats"] = _column_stats(columns, rows)
+    available = max(max_chars - len(_dumps(base)), 1)
+    step = max(math.ceil(sum(len(_dumps(row)) + 1 for row in rows) / available), 1)
+    while True:
+        sample = rows[::step]
+        shaped = {**base, **_with_rows(payload, sample)}
+        shaped["more_available"] = {
+            "rows_shown": len(sample),
+            "rows_omitted": len(rows) - len(sample),
+            "sampling": f"1 row in {step}",
+            "hint": hint,
+        }
+        if len(sample) <= 1 or len(_dumps(shaped)) <= max_chars:
+            return shaped
+        step = max(step + 1, math.ceil(step * 1.2))
+
+
+def _fit_items(value: Any, max_chars: int, hint: str) -> Any:
+    """Keep the first items of the largest list in ``value`` (itself, or a top-level key)."""
+    if isinstance(value, list):
+        key, items = None, value
+    elif isinstance(value, dict):
+        lists = {key: item for key, item in value.items() if isinstance(item, list)}
+        if not lists:
+            return value
+        key = max(lists, key=lambda name: len(_dumps(lists[name])))
+        items = lists[key]
+    else:
+        return value
+    # Sized with the widest counts the marker can hold.
+    marker = {"items_shown": len(items), "items_omitted": len(items), "hint": hint}
+    if key is None:
+        overhead = len(_dumps({"items": [], "more_available": marker}))
+    else:
+        overhead = len(_dumps({**value, key: [], "more_available": marker}))
+    available = max_chars - overhead
+    kept = 0
+    size = 0
+    for item in items:
+        size += len(_dumps(item)) + 1
+        if size > available and kept:
+            break
+        kept += 1
+    marker = {"items_shown": kept, "items_omitted": len(items) - kept, "hint": hint}
+    if key is None:
+        return {"items": items[:kept], "more_available": marker}
+    return {**value, key: items[:kept], "more_available": marker}
+
+
+def _is_table(value: Any) -> bool:
+    return (
+        isinstance(value, dict)
+        and isinstance(value.get("columns"), list)
+        and (isinstance(value.get("rows"), list) or isinstance(value.get("values"), list))
+    )
+
+
+def _table_rows(payload: dict[str, Any]) -> list[list[Any]]:
+    columns = payload["columns"]
+    if "values" in payload:
+        return [list(row) for row in zip(*payload["values"])]
+    return [
+        [row.get(column) for column in columns] if isinstance(row, dict) else list(row)
+        for row in payload["rows"]
+    ]
+
+
+def _with_rows(payload: dict[str, Any], rows: list[list[Any]]) -> dict[str, Any]:
+    # Rows go back in the format the model asked for.
+    columns = payload["columns"]
+    if "values" in payload:
+        return {"values": [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]}
+    if payload["rows"] and isinstance(payload["rows"][0], dict):
+        return {"rows": [dict(zip(columns, row)) for row in rows]}
+    return {"rows": rows}
+
+
+def _column_stats(columns: Sequence[str], rows: list[list[Any]]) -> dict[str, dict[str, Any]]:
+    stats: dict[str, dict[str, Any]] = {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows if index < len(row) and row[index] is not None]
+        entry: dict[str, Any] = {"distinct": len({_dumps(value) for value in values})}
+        if len(values) < len(rows):
+            entry["nulls"] = len(rows) - len(values)
+        try:
+            low, high = min(values), max(values)
+        except (TypeError, ValueError):  # no values, or values that do not compare
+            pass
+        else:
+            entry["min"] = _elide(low, _STAT_VALUE_MAX_CHARS)
+            entry["max"] = _elide(high, _STAT_VALUE_MAX_CHARS)
+        stats[column] = entry
+    return stats
+
+
+def _elide_strings(value: Any, max_chars: int) -> Any:
+    if isinstance(value, dict):
+        return {key: _elide_strings(item, max_chars) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_elide_strings(item, max_chars) for item in value]
+    return _elide(value, max_chars)
+
+
+def _elide(value: Any, max_chars: int) -> Any:
+    if isinstance(value, str) and len(value) > max_chars:
+        return f"{value[:max_chars]}{_ELLIPSIS} (+{len(value) - max_chars} chars)"
+    return value
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
@@ -1,12 +1,35 @@
 from __future__ import annotations
 
 import json
-from typing import Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Literal
 
 from pydantic import BaseModel, Field
 from langchain_core.tools import StructuredTool
 
-from .mcp_client import MCPToolClient
+from .budget import charge_sql_rows
+from .mcp_client import MCPToolClient, unwrap_result
+from .shaping import ToolOutputShaper
+
+_ACTIVE_CLIENT: ContextVar[MCPToolClient | None] = ContextVar("mcp_active_client", default=None)
+
+
+@contextmanager
+def bind_client(client: MCPToolClient) -> Iterator[MCPToolClient]:
+    """Route tool calls made in the current context to ``client``."""
+    token = _ACTIVE_CLIENT.set(client)
+    try:
+        yield client
+    finally:
+        _ACTIVE_CLIENT.reset(token)
+
+
+def _active_client() -> MCPToolClient:
+    client = _ACTIVE_CLIENT.get()
+    if client is None:
+        raise RuntimeError("No MCP client bound to the current agent run")
+    return client
 
 
 class ListDatabasesInput(BaseModel):
@@ -14,7 +37,7 @@ class ListDatabasesInput(BaseModel):
 
 
 class ListTablesInput(BaseModel):
-    database: str = Field(..., description="Logical database identifier (postgres or mysql)")
+    database: str = Field(..., description="Logical database name as returned by list_databases")
     schema_filter: str | None = Field(
         default=None,
         description="Optional case-insensitive filter applied to schema.table name",
@@ -22,48 +45,149 @@ class ListTablesInput(BaseModel):
 
 
 class DescribeTableInput(BaseModel):
-    database: str = Field(..., description="Logical database identifier (postgres or mysql)")
+    database: str = Field(..., description="Logical database name as returned by list_databases")
     table: str = Field(..., description="Target table name")
     table_schema: str | None = Field(default=None, description="Optional schema name for the table")
 
 
+class TableReference(BaseModel):
+    table: str = Field(..., description="Target table name")
+    table_schema: str | None = Field(default=None, description="Optional schema name for the table")
+
+
+class DescribeTablesInput(BaseModel):
+    database: str = Field(..., description="Logical database name as returned by list_databases")
+    tables: list[TableReference] = Field(
+        ...,
+        min_length=1,
+        description="Tables to describe in a single round trip",
+    )
+
+
+class SearchSchemaInput(BaseModel):
+    database: str = Field(..., description="Logical database name as returned by list_databases")
+    query: str = Field(..., description="Keywords describing the data you need (entities, columns)")
+    top_k: int = Field(default=10, ge=1, le=50, description="Number of tables to return")
+
+
 class RunSqlQueryInput(BaseModel):
-    database: str = Field(..., description="Logical database identifier (postgres or mysql)")
+    database: str = Field(..., description="Logical database name as returned by list_databases")
     query: str = Field(..., description="Read-only SQL query to execute")
     limit: int | None = Field(
         default=100,
         ge=1,
         description="Optional cap on returned rows",
     )
+    result_format: Literal["records", "compact", "columnar"] = Field(
+        default="records",
+        description=(
+            "'records' returns each row as an object (default); 'compact' lists the columns"
+            " once and each row as an array; 'columnar' returns one array per column"
+        ),
+    )
+    max_value_chars: int | None = Field(
+        default=None,
+        ge=1,
+        description="Optionally cut string values longer than this many characters",
+    )
+    max_bytes: int | None = Field(
+        default=None,
+        ge=256,
+        description="Optional approximate size budget for the returned rows; extra rows are dropped",
+    )
+
+
+class ExportSqlQueryInput(BaseModel):
+    database: str = Field(..., description="Logical database name as returned by list_databases")
+    query: str = Field(..., description="Read-only SQL query whose full result should be exported")
+    export_format: Literal["csv", "parquet"] = Field(default="csv", description="Export file format")
+
+
+def build_tools(
+    client: MCPToolClient | None = None,
+    *,
+    shaper: ToolOutputShaper | None = None,
+) -> list[StructuredTool]:
+    """Build the agent tools.
+
+    When ``client`` is omitted the tools resolve the MCP client bound with
+    :func:`bind_client` at call time, so they can be shared across runs. With a
+    ``shaper``, results are fitted to its per-tool token budget before they are
+    handed to the model.
+    """
 
+    def _client() -> MCPToolClient:
+        return client if client is not None else _active_client()
+
+    def _render(tool: str, result: Any) -> str:
+        if shaper is None:
+            return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        return shaper.shape(tool, result)
 
-def build_tools(client: MCPToolClient) -> list[StructuredTool]:
     async def list_databases() -> str:
-        result = await client.call_tool("list_databases")
-        return json.dumps(result, ensure_ascii=False)
+        result = await _client().call_tool("list_databases")
+        return _render("list_databases", result)
 
     async def list_tables(database: str, schema_filter: str | None = None) -> str:
         payload: dict[str, Any] = {"database": database}
         if schema_filter:
             payload["schema_filter"] = schema_filter
-        result = await client.call_tool("list_tables", payload)
-        return json.dumps(result, ensure_ascii=False)
+        result = await _client().call_tool("list_tables", payload)
+        return _render("list_tables", result)
 
     async def describe_table(database: str, table: str, table_schema: str | None = None) -> str:
         payload: dict[str, Any] = {"database": database, "table": table}
         if table_schema:
             payload["schema"] = table_schema
-        result = await client.call_tool("describe_table", payload)
-        return json.dumps(result, ensure_ascii=False)
+        result = await _client().call_tool("describe_table", payload)
+        return _render("describe_table", result)
 
-    async def run_sql_query(database: str, query: str, limit: int | None = 100) -> str:
+    async def describe_tables(database: str, tables: list[TableReference | dict[str, Any]]) -> str:
+        refs = [TableReference.model_validate(ref) for ref in tables]
+        payload: dict[str, Any] = {
+            "database": database,
+            "tables": [
+                {"table": ref.table, **({"schema": ref.table_schema} if ref.table_schema else {})}
+                for ref in refs
+            ],
+        }
+        result = await _client().call_tool("describe_tables", payload)
+        return _render("describe_tables", result)
+
+    async def search_schema(database: str, query: str, top_k: int = 10) -> str:
+        payload: dict[str, Any] = {"database": database, "query": query, "top_k": top_k}
+        result = await _client().call_tool("search_schema", payload)
+        return _render("search_schema", result)
+
+    async def run_sql_query(
+        database: str,
+        query: str,
+        limit: int | None = 100,
+        result_format: str = "records",
+        max_value_chars: int | None = None,
+        max_bytes: int | None = None,
+    ) -> str:
         payload: dict[str, Any] = {
             "database": database,
             "query": query,
             "limit": limit,
+            "result_format": result_format,
+            "max_value_chars": max_value_chars,
+            "max_bytes": max_bytes,
         }
-        result = await client.call_tool("run_sql_query", payload)
-        return json.dumps(result, ensure_ascii=False)
+        result = await _client().call_tool("run_sql_query", payload)
+        charge_sql_rows(unwrap_result(result))
+        return _render("run_sql_query", result)
+
+    async def export_sql_query(database: str, query: str, export_format: str = "csv") -> str:
+        payload: dict[str, Any] = {
+            "database": database,
+            "query": query,
+            "export_format": export_format,
+        }
+        # Exported rows stay on the MCP server, so they are not charged to the run.
+        result = await _client().call_tool("export_sql_query", payload)
+        return _render("export_sql_query", result)
 
     return [
         StructuredTool.from_function(
@@ -86,10 +210,47 @@ def build_tools(client: MCPToolClient) -> list[StructuredTool]:
             description="Retrieve column metadata for a given table (optionally schema-qualified).",
             args_schema=DescribeTableInput,
         ),
+        StructuredTool.from_function(
+            coroutine=describe_tables,
+            name="describe_tables",
+            description=(
+                "Retrieve column metadata for several tables at once. Prefer this over"
+                " repeated describe_table calls when exploring more than one table."
+            ),
+            args_schema=DescribeTablesInput,
+        ),
+        StructuredTool.from_function(
+            coroutine=search_schema,
+            name="search_schema",
+            description=(
+                "Find the tables most relevant to a few keywords, with their columns. Prefer"
+                " this over list_tables when a database has many tables."
+            ),
+            args_schema=SearchSchemaInput,
+        ),
         StructuredTool.from_function(
             coroutine=run_sql_query,
             name="run_sql_query",
-            description="Execute a read-only SQL query via the MCP server and receive rows as JSON.",
+            description=(
+                "Execute a read-only SQL query via the MCP server and receive rows as JSON."
+                " By default 'rows' holds one object per row (records). Opt in to"
+                " result_format 'compact' (columns once, one array per row) or 'columnar'"
+                " (one array per column), and to max_value_chars / max_bytes, for large results."
+                " 'truncated' is true when the limit or the size budget cut off further rows;"
+                " 'truncated_values' counts shortened strings. Oversized results are sampled:"
+                " 'column_stats' then summarizes every fetched row and 'more_available'"
+                " says what was left out."
+            ),
             args_schema=RunSqlQueryInput,
         ),
+        StructuredTool.from_function(
+            coroutine=export_sql_query,
+            name="export_sql_query",
+            description=(
+                "Export the full result of a read-only SQL query to a CSV or Parquet file."
+                " Use it when the user needs thousands of rows: only the row count, a preview"
+                " and a download_path are returned."
+            ),
+            args_schema=ExportSqlQueryInput,
+        ),
     ]
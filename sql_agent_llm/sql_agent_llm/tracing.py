@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Iterator
+from uuid import UUID
+
+import structlog
+from langchain_core.callbacks import AsyncCallbackHandler
+from opentelemetry import context as otel_context
+from opentelemetry import propagate, trace
+from opentelemetry.trace import Span, Status, StatusCode
+
+from .config import Settings
+
+logger = structlog.get_logger(__name__)
+
+tracer = trace.get_tracer("sql_agent_llm")
+
+
+class RunTimings:
+    """Seconds spent and calls made per phase of one agent run.
+
+    Tool calls of a step run concurrently, so phases may overlap and their sum
+    can exceed ``total_seconds``.
+    """
+
+    def __init__(self) -> None:
+        self._started = perf_counter()
+        self._phases: dict[str, list[float]] = {}
+
+    def add(self, phase: str, seconds: float, *, count: int = 1) -> None:
+        entry = self._phases.setdefault(phase, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += count
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "total_seconds": round(perf_counter() - self._started, 4),
+            "phases": {
+                name: {"seconds": round(seconds, 4), "count": int(count)}
+                for name, (seconds, count) in self._phases.items()
+            },
+        }
+
+
+_CURRENT_RUN: ContextVar[RunTimings | None] = ContextVar("agent_run_timings", default=None)
+
+_tracing_configured = False
+_tracing_lock = threading.Lock()
+
+
+def configure_tracing(settings: Settings) -> None:
+    """Install an OpenTelemetry SDK exporter once per process.
+
+    With ``TRACING_EXPORTER=none`` spans stay no-ops; phase timings are collected
+    either way.
+    """
+    global _tracing_configured
+    with _tracing_lock:
+        if _tracing_configured or settings.tracing_exporter == "none":
+            return
+        try:
+            from opentelemetry.sdk.resources import Resource
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise RuntimeError("Tracing requires the 'tracing' extra (opentelemetry-sdk)") from exc
+        if settings.tracing_exporter == "otlp":
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError(
+                    "OTLP tracing requires the 'tracing' extra (opentelemetry-exporter-otlp-proto-http)"
+                ) from exc
+            exporter = OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+        else:
+            # One JSON document per line, appended to TRACING_FILE.
+            exporter = ConsoleSpanExporter(
+                out=open(settings.tracing_file, "a", encoding="utf-8"),  # noqa: SIM115 - lives with the process
+                formatter=lambda span: span.to_json(indent=None) + "\n",
+            )
+        provider = TracerProvider(
+            resource=Resource.create({"service.name": settings.tracing_service_name})
+        )
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+        trace.set_tracer_provider(provider)
+        _tracing_configured = True
+        logger.info(
+            "tracing_configured",
+            exporter=settings.tracing_exporter,
+            service=settings.tracing_service_name,
+        )
+
+
+@contextmanager
+def trace_run(**attributes: Any) -> Iterator[RunTimings]:
+    """Open the root span of an agent run and collect its phase timings."""
+    timings = RunTimings()
+    token = _CURRENT_RUN.set(timings)
+    try:
+        with tracer.start_as_current_span("agent.run", attributes=_attributes(attributes)):
+            yield timings
+    finally:
+        _CURRENT_RUN.reset(token)
+
+
+@contextmanager
+def phase(name: str, *, span_name: str | None = None, **attributes: Any) -> Iterator[Span]:
+    """Time a block as ``name`` in the current run, inside its own span."""
+    start = perf_counter()
+    try:
+        with tracer.start_as_current_span(span_name or name, attributes=_attributes(attributes)) as span:
+            yield span
+    finally:
+        add_phase(name, perf_counter() - start)
+
+
+def add_phase(name: str, seconds: float, *, count: int = 1) -> None:
+    timings = _CURRENT_RUN.get()
+    if timings is not None:
+        timings.add(name, seconds, count=count)
+
+
+def request_meta() -> dict[str, str]:
+    """W3C trace context of the current span, to send as MCP request ``_meta``."""
+    carrier: dict[str, str] = {}
+    propagate.inject(carrier)
+    return carrier
+
+
+class LLMTimingHandler(AsyncCallbackHandler):
+    """Callback timing each chat model call of a run as the ``llm`` phase.
+
+    Callbacks may fire outside the run's context, so the run timings and parent
+    span are captured when the handler is created.
+    """
+
+    def __init__(self, model: str) -> None:
+        self._model = model
+        self._timings = _CURRENT_RUN.get()
+        self._context = otel_context.get_current()
+        self._calls: dict[UUID, tuple[Span, float]] = {}
+
+    async def on_chat_model_start(
+        self, serialized: dict[str, Any], messages: list[list[Any]], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        span = tracer.start_span(
+            "llm.call",
+            context=self._context,
+            attributes={"gen_ai.request.model": self._model},
+        )
+        self._calls[run_id] = (span, perf_counter())
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    async def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, error=error)
+
+    def _finish(self, run_id: UUID, *, error: BaseException | None = None) -> None:
+        call = self._calls.pop(run_id, None)
+        if call is None:
+            return
+        span, start = call
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(Status(StatusCode.ERROR, str(error)))
+        span.end()
+        if self._timings is not None:
+            self._timings.add("llm", perf_counter() - start)
+
+
+def _attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    # OpenTelemetry rejects None attribute values.
+    return {key: value for key, value in attributes.items() if value is not None}
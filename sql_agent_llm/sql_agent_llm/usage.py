@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator, Mapping
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+_PER_MILLION = 1_000_000
+
+
+@dataclass
+class RunUsage:
+    """Tokens and model calls of one agent run.
+
+    ``prompt_tokens`` includes ``cached_tokens``, as reported by OpenAI. An
+    iteration is a model call that asked for tools, i.e. one ReAct loop turn.
+    """
+
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    llm_calls: int = 0
+    iterations: int = 0
+
+    def add(self, message: Any) -> None:
+        self.llm_calls += 1
+        if getattr(message, "tool_calls", None):
+            self.iterations += 1
+        usage = getattr(message, "usage_metadata", None)
+        if not usage:
+            return
+        self.prompt_tokens += usage.get("input_tokens", 0)
+        self.completion_tokens += usage.get("output_tokens", 0)
+        self.cached_tokens += (usage.get("input_token_details") or {}).get("cache_read") or 0
+
+    def cost_usd(self, pricing: Mapping[str, Mapping[str, float]]) -> float | None:
+        """Cost from per-million-token prices, or ``None`` when the model is not priced."""
+        prices = pricing.get(self.model)
+        if not prices:
+            return None
+        input_price = prices.get("input", 0.0)
+        cached_price = prices.get("cached_input", input_price)
+        cost = (
+            (self.prompt_tokens - self.cached_tokens) * input_price
+            + self.cached_tokens * cached_price
+            + self.completion_tokens * prices.get("output", 0.0)
+        )
+        return round(cost / _PER_MILLION, 6)
+
+    def summary(self, pricing: Mapping[str, Mapping[str, float]]) -> dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "llm_calls": self.llm_calls,
+            "iterations": self.iterations,
+            "cost_usd": self.cost_usd(pricing),
+        }
+
+
+_CURRENT_USAGE: ContextVar[RunUsage | None] = ContextVar("agent_run_usage", default=None)
+
+
+@contextmanager
+def track_usage(model: str) -> Iterator[RunUsage]:
+    usage = RunUsage(model=model)
+    token = _CURRENT_USAGE.set(usage)
+    try:
+        yield usage
+    finally:
+        _CURRENT_USAGE.reset(token)
+
+
+def current_usage() -> RunUsage | None:
+    return _CURRENT_USAGE.get()
+
+
+class UsageCallbackHandler(AsyncCallbackHandler):
+    """Callback adding the usage metadata of every chat model response to the run."""
+
+    def __init__(self) -> None:
+        self._usage = current_usage()
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if self._usage is None:
+            return
+        for generations in response.generations:
+            for generation in generations[:1]:
+                self._usage.add(getattr(generation, "message", None))
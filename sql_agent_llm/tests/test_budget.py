@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from sql_agent_llm.agent import graph as graph_module
+from sql_agent_llm.budget import BudgetExceededError, RunBudget, enforce_budget
+from sql_agent_llm.config import Settings
+from sql_agent_llm.tools import build_tools
+from sql_agent_llm.usage import RunUsage, track_usage
+
+
+def _settings(**overrides: Any) -> Settings:
+    values: dict[str, Any] = {
+        "OPENAI_API_KEY": "test",
+        "MCP_SERVER_URL": "http://localhost:1",
+        "AGENT_TIMEOUT_SECONDS": 0,
+        "AGENT_MAX_TOKENS": 0,
+        "AGENT_MAX_SQL_ROWS": 0,
+    }
+    values.update(overrides)
+    return Settings(_env_file=None, **values)
+
+
+def test_iterations_up_to_the_limit_are_allowed() -> None:
+    budget = RunBudget(_settings(AGENT_MAX_ITERATIONS=3))
+    for _ in range(3):
+        budget.charge_iteration()
+    with pytest.raises(BudgetExceededError) as excinfo:
+        budget.charge_iteration()
+    assert excinfo.value.limit == "iterations"
+
+
+def test_zero_disables_a_limit() -> None:
+    budget = RunBudget(_settings(AGENT_MAX_ITERATIONS=0))
+    for _ in range(100):
+        budget.charge_iteration()
+    budget.charge_sql_rows(10**9)
+    budget.check(RunUsage(model="m", prompt_tokens=10**9))
+
+
+def test_tokens_and_rows_are_checked_against_their_limits() -> None:
+    budget = RunBudget(_settings(AGENT_MAX_TOKENS=100, AGENT_MAX_SQL_ROWS=10))
+    budget.check(RunUsage(model="m", prompt_tokens=90, completion_tokens=10))
+    with pytest.raises(BudgetExceededError) as excinfo:
+        budget.check(RunUsage(model="m", prompt_tokens=91, completion_tokens=10))
+    assert excinfo.value.limit == "tokens"
+    budget.charge_sql_rows(11)
+    with pytest.raises(BudgetExceededError) as excinfo:
+        budget.check(None)
+    assert excinfo.value.limit == "sql_rows"
+
+
+def test_only_rows_returned_to_the_model_are_charged() -> None:
+    class ExportClient:
+        async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> Any:
+            if name == "export_sql_query":
+                return {"export_id": "e1", "row_count": 250_000, "preview": []}
+            return {"result": {"columns": ["value"], "rows": [[1], [2]], "row_count": 2}}
+
+    tools = {tool.name: tool for tool in build_tools(ExportClient())}
+    settings = _settings(AGENT_MAX_SQL_ROWS=100_000)
+
+    async def call() -> RunBudget:
+        with enforce_budget(settings) as budget:
+            await tools["export_sql_query"].ainvoke({"database": "db", "query": "SELECT * FROM big"})
+            await tools["run_sql_query"].ainvoke({"database": "db", "query": "SELECT 1"})
+            return budget
+
+    budget = asyncio.run(call())
+    assert budget.sql_rows == 2
+    budget.check(None)
+
+
+class _ScriptedModel(BaseChatModel):
+    """Asks for ``tool_turns`` SQL queries, then answers."""
+
+    tool_turns: int
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "_ScriptedModel":
+        return self
+
+    def _generate(self, *args: Any, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    async def _agenerate(self, messages: Any, stop: Any = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        if self.calls > self.tool_turns:
+            message = AIMessage(content="final answer")
+        else:
+            call = {"name": "run_sql_query", "args": {"database": "db", "query": "SELECT 1"}, "id": f"call-{self.calls}"}
+            message = AIMessage(content="", tool_calls=[call])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class _FakeClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def call_tool(self, name: str, arguments: dict[str, Any] | None = None) -> Any:
+        self.calls += 1
+        return {"columns": ["value"], "rows": [{"value": 1}], "row_count": 1, "truncated": False}
+
+
+async def _run(tool_turns: int, max_iterations: int, *, stream: bool) -> tuple[dict[str, Any], int]:
+    settings = _settings(AGENT_MAX_ITERATIONS=max_iterations)
+    agent = graph_module.AgentGraph(settings)
+    client = _FakeClient()
+    with track_usage("m"), enforce_budget(settings):
+        if stream:
+            events = [event async for event in agent.stream("question?", client=client)]
+            result = events[-1]["data"]
+        else:
+            result = await agent.run("question?", client=client)
+    return result, client.calls
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_run_using_exactly_the_iteration_limit_answers(monkeypatch: pytest.MonkeyPatch, stream: bool) -> None:
+    monkeypatch.setattr(graph_module, "ChatOpenAI", lambda **kwargs: _ScriptedModel(tool_turns=3))
+    result, tool_calls = asyncio.run(_run(3, 3, stream=stream))
+    assert "budget_exceeded" not in result
+    assert result["messages"][-1].content == "final answer"
+    assert tool_calls == 3
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_tool_turn_past_the_limit_is_refused(monkeypatch: pytest.MonkeyPatch, stream: bool) -> None:
+    monkeypatch.setattr(graph_module, "ChatOpenAI", lambda **kwargs: _ScriptedModel(tool_turns=4))
+    result, tool_calls = asyncio.run(_run(4, 3, stream=stream))
+    assert result["budget_exceeded"]["limit"] == "iterations"
+    assert tool_calls == 3
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+from mcp import types
+
+from sql_agent_llm.config import Settings
+from sql_agent_llm.mcp_client import MCPClientPool, MCPToolClient, _PooledConnection
+
+
+class _HangingSession:
+    def __init__(self) -> None:
+        self._request_id = 7
+        self.notifications: list[Any] = []
+
+    async def send_request(self, request: Any, result_type: Any) -> Any:
+        await asyncio.sleep(10)
+
+    async def send_notification(self, notification: Any) -> None:
+        self.notifications.append(notification.root)
+
+
+def _settings(**overrides: Any) -> Settings:
+    values: dict[str, Any] = {"OPENAI_API_KEY": "test", "MCP_SERVER_URL": "http://localhost:1"}
+    values.update(overrides)
+    return Settings(_env_file=None, **values)
+
+
+def _client() -> tuple[MCPToolClient, _HangingSession]:
+    client = MCPToolClient(_settings())
+    session = _HangingSession()
+    client._session = session  # type: ignore[assignment]
+    return client, session
+
+
+def test_abandoned_tool_call_notifies_the_server() -> None:
+    client, session = _client()
+
+    async def scenario() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.call_tool("run_sql_query", {"query": "SELECT 1"}), 0.01)
+
+    asyncio.run(scenario())
+    [notification] = session.notifications
+    assert isinstance(notification, types.CancelledNotification)
+    assert notification.params.requestId == 7
+
+
+def test_cancellation_is_skipped_when_the_request_id_is_unknown() -> None:
+    client, session = _client()
+    del session._request_id
+
+    async def scenario() -> None:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.call_tool("run_sql_query", {"query": "SELECT 1"}), 0.01)
+
+    asyncio.run(scenario())
+    assert session.notifications == []
+
+
+def test_unanswered_ping_marks_the_session_dead() -> None:
+    connection = _PooledConnection(_settings(MCP_PING_TIMEOUT_SECONDS=0.01))
+    connection.client._session = _HangingSession()  # type: ignore[assignment]
+
+    async def scenario() -> bool:
+        connection._task = asyncio.create_task(asyncio.sleep(10))
+        try:
+            return await connection.ping()
+        finally:
+            connection._task.cancel()
+
+    assert asyncio.run(scenario()) is False
+
+
+class _FakeConnection:
+    def __init__(self, client: MCPToolClient) -> None:
+        self.client = client
+        self.alive = True
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_timed_out_session_is_replaced_on_checkin() -> None:
+    pool = MCPClientPool(_settings())
+    connections: list[_FakeConnection] = []
+
+    async def connect() -> _FakeConnection:
+        connection = _FakeConnection(MCPToolClient(pool._settings))
+        connections.append(connection)
+        return connection
+
+    pool._connect = connect  # type: ignore[method-assign]
+
+    async def scenario() -> None:
+        async with pool.acquire() as client:
+            client.timed_out = True
+        async with pool.acquire():
+            pass
+
+    asyncio.run(scenario())
+    assert len(connections) == 2
+    assert connections[0].closed
+
+
+def test_close_waits_for_checked_out_sessions() -> None:
+    pool = MCPClientPool(_settings())
+    connection = _FakeConnection(MCPToolClient(pool._settings))
+
+    async def connect() -> _FakeConnection:
+        return connection
+
+    pool._connect = connect  # type: ignore[method-assign]
+    events: list[str] = []
+
+    async def scenario() -> None:
+        async def run() -> None:
+            async with pool.acquire():
+                await asyncio.sleep(0.05)
+                events.append("run finished")
+
+        task = asyncio.create_task(run())
+        await asyncio.sleep(0.01)
+        await pool.close()
+        events.append(f"closed={connection.closed}")
+        await task
+
+    asyncio.run(scenario())
+    assert events == ["run finished", "closed=True"]
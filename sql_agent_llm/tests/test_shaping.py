@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from sql_agent_llm.config import Settings
+from sql_agent_llm.shaping import ToolOutputShaper, _column_stats, _elide, estimate_tokens
+
+
+def _shaper(**overrides: Any) -> ToolOutputShaper:
+    values: dict[str, Any] = {
+        "OPENAI_API_KEY": "test",
+        "MCP_SERVER_URL": "http://localhost:1",
+        "TOOL_OUTPUT_MAX_TOKENS": 200,
+        "TOOL_OUTPUT_MAX_STRING_CHARS": 20,
+    }
+    values.update(overrides)
+    return ToolOutputShaper(Settings(_env_file=None, **values))
+
+
+def _table(rows: int, *, result_format: str = "records") -> dict[str, Any]:
+    columns = ["id", "name"]
+    data = [[index, f"customer {index}"] for index in range(rows)]
+    if result_format == "records":
+        return {"columns": columns, "rows": [dict(zip(columns, row)) for row in data]}
+    if result_format == "compact":
+        return {"columns": columns, "rows": data}
+    return {"columns": columns, "values": [list(values) for values in zip(*data)]}
+
+
+def test_result_within_budget_is_unchanged() -> None:
+    result = {"result": _table(3)}
+    assert json.loads(_shaper().shape("run_sql_query", result)) == result
+
+
+def test_zero_budget_disables_shaping() -> None:
+    result = _table(500)
+    assert json.loads(_shaper(TOOL_OUTPUT_MAX_TOKENS=0).shape("run_sql_query", result)) == result
+
+
+def test_per_tool_budget_overrides_the_default() -> None:
+    shaper = _shaper(TOOL_OUTPUT_TOKEN_BUDGETS={"list_tables": 50})
+    assert shaper.budget_for("list_tables") == 50
+    assert shaper.budget_for("run_sql_query") == 200
+
+
+@pytest.mark.parametrize("result_format", ["records", "compact", "columnar"])
+def test_rows_are_sampled_into_the_budget(result_format: str) -> None:
+    result = {"result": _table(500, result_format=result_format)}
+    shaped_text = _shaper().shape("run_sql_query", result)
+    shaped = json.loads(shaped_text)
+    assert estimate_tokens(shaped_text) <= 200
+    more = shaped["more_available"]
+    assert more["rows_shown"] + more["rows_omitted"] == 500
+    assert shaped["column_stats"]["id"] == {"distinct": 500, "min": 0, "max": 499}
+    if result_format == "columnar":
+        assert len(shaped["values"][0]) == more["rows_shown"]
+    else:
+        assert len(shaped["rows"]) == more["rows_shown"]
+        first = shaped["rows"][0]
+        assert isinstance(first, dict) if result_format == "records" else isinstance(first, list)
+
+
+def test_long_strings_are_elided_first() -> None:
+    result = {"columns": ["note"], "rows": [{"note": "x" * 2000}]}
+    shaped = json.loads(_shaper().shape("run_sql_query", result))
+    assert shaped["rows"][0]["note"] == f"{'x' * 20}… (+1980 chars)"
+    assert "more_available" not in shaped
+
+
+def test_other_lists_keep_their_first_items() -> None:
+    tables = [{"table_schema": "public", "table_name": f"table_{index}"} for index in range(200)]
+    shaped_text = _shaper().shape("list_tables", {"result": tables})
+    shaped = json.loads(shaped_text)
+    assert estimate_tokens(shaped_text) <= 200
+    assert shaped["items"] == tables[: shaped["more_available"]["items_shown"]]
+    assert shaped["more_available"]["items_omitted"] == 200 - len(shaped["items"])
+    assert "search_schema" in shaped["more_available"]["hint"]
+
+
+def test_column_stats_count_nulls_and_skip_incomparable_values() -> None:
+    stats = _column_stats(["a", "b"], [[1, "x"], [None, 2], [3, "y"]])
+    assert stats["a"] == {"distinct": 2, "nulls": 1, "min": 1, "max": 3}
+    assert stats["b"] == {"distinct": 3}
+
+
+def test_elide_only_touches_long_strings() -> None:
+    assert _elide("abcdef", 3) == "abc… (+3 chars)"
+    assert _elide("abc", 3) == "abc"
+    assert _elide(123456, 3) == 123456
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from sql_agent_llm.tools import build_tools
+
+
+def test_run_sql_query_tool_documents_the_records_default() -> None:
+    tool = {tool.name: tool for tool in build_tools()}["run_sql_query"]
+    assert tool.args_schema.model_fields["result_format"].default == "records"
+    assert tool.args_schema.model_fields["max_value_chars"].default is None
+    assert tool.args_schema.model_fields["max_bytes"].default is None
+    assert "one object per row (records)" in tool.description